@@ -0,0 +1,149 @@
+import math
+import numpy as np
+from .RRT import RRT
+from .DistanceMap import DistanceMap
+from .PathSmoothing import Shortcut_Path, Remove_Colinear, Resample_Path
+
+#.. occupancy pyramid - level l is the map max-pooled by Factor^l (a coarse cell is an obstacle if any of its cells is),
+#   so a coarse cell that is free is free at every finer level
+#   cell i of level l covers the cells [i * Scale, (i + 1) * Scale) of level 0, its centre at (i + 0.5) * Scale - 0.5
+def Max_Pool(Map, Factor) :
+    H, W = Map.shape
+    Ht, Wt = -(-H // Factor) * Factor, -(-W // Factor) * Factor
+    if (Ht, Wt) != (H, W) :
+        # padded with free cells, the cells outside the map are out of bounds for the planners anyway
+        Pad = np.zeros((Ht, Wt), dtype=Map.dtype)
+        Pad[:H, :W] = Map
+        Map = Pad
+    # maximum over the Factor x Factor strided views (much faster than a max over reshaped axes)
+    Pool = Map[::Factor, ::Factor].copy()
+    for i in range(Factor) :
+        for j in range(Factor) :
+            np.maximum(Pool, Map[i::Factor, j::Factor], out=Pool)
+    return Pool
+
+class MapPyramid:
+
+    def __init__(self, Map, numLevels=4, Factor=2) :
+        self.Factor = Factor
+        self.Levels = [np.asarray(Map)]
+        for l in range(1, numLevels) :
+            self.Levels.append(Max_Pool(self.Levels[-1], Factor))
+        self.Scales = [Factor ** l for l in range(numLevels)]
+
+    # (...,2) points [x, y] of level 0 -> cell of level l
+    def To_Level(self, pts, l) :
+        return np.floor(np.round(np.asarray(pts, dtype=np.float64)) / self.Scales[l])
+
+    # (...,2) points [x, y] of level l -> level 0 (cell centres)
+    def From_Level(self, pts, l) :
+        return (np.asarray(pts, dtype=np.float64) + 0.5) * self.Scales[l] - 0.5
+
+#.. coarse-to-fine planning - the planner runs on level Level of the pyramid, its path is shortcut there, then refined at
+#   full resolution only in windows around it : the path is cut into pieces of at most ChunkLen cells, every piece is
+#   checked in its own window (bounding box + Width cells) & replanned there with RRT-Connect if it is not free
+#   Planner(Map, Start, Goal) -> (path_x, path_y) in the cells of the Map it is given (default : RRT of Mode)
+#   the full map is only planned on if no level has a path or the refinement fails
+class CoarseToFine:
+
+    def __init__(self, Level=3, Width=None, ChunkLen=256, Mode='connect', MaxIter=None, Factor=2) :
+        self.Level = Level
+        self.Factor = Factor
+        self.Width = 2 * Factor ** Level if Width is None else Width
+        self.ChunkLen = ChunkLen
+        self.Mode = Mode
+        self.MaxIter = MaxIter
+        # pyramid of the last map (rebuilt only for another map object, e.g. a new OccupancyMap version)
+        self.MapRef = None
+        self.Pyramid = None
+        # result of the last plan
+        self.Success = False
+        self.CoarsePath = None
+        self.numReplan = 0
+
+    def Default_Planner(self, Map, Start, Goal) :
+        planner = RRT()
+        path_x, path_y = planner.PathPlanning(Map, Start, Goal, Mode=self.Mode, MaxIter=self.MaxIter)
+        if not planner.Success :
+            return np.array([]), np.array([])
+        return path_x, path_y
+
+    def Get_Pyramid(self, Map) :
+        if self.Pyramid is None or Map is not self.MapRef or len(self.Pyramid.Levels) <= self.Level :
+            self.Pyramid = MapPyramid(Map, self.Level + 1, self.Factor)
+            self.MapRef = Map
+        return self.Pyramid
+
+    def Plan(self, Map, Start, Goal, Planner=None) :
+        Planner = self.Default_Planner if Planner is None else Planner
+        Start = np.ravel(Start).astype(np.float64)
+        Goal = np.ravel(Goal).astype(np.float64)
+        self.Success = False
+        self.numReplan = 0
+
+        ##.. Coarse plan - the cells of Start & Goal freed, their obstacles are dealt with by the refinement
+        #    a level whose pooling closed every passage is retried one level finer
+        Pyramid = self.Get_Pyramid(Map)
+        for Level in range(self.Level, 0, -1) :
+            Coarse = Pyramid.Levels[Level].copy()
+            Start_c, Goal_c = Pyramid.To_Level(Start, Level), Pyramid.To_Level(Goal, Level)
+            Coarse[int(Start_c[1]), int(Start_c[0])] = 0
+            Coarse[int(Goal_c[1]), int(Goal_c[0])] = 0
+            path_x, path_y = Planner(Coarse, Start_c, Goal_c)
+            if len(path_x) > 0 :
+                break
+            print("Coarse-to-Fine : no path on level", Level)
+        if len(path_x) == 0 :
+            return self.Plan_Full(Map, Start, Goal, Planner)
+        # ends of the coarse path tied to the cells of Start & Goal (not every mode returns them), repeated points dropped
+        path = np.vstack([Start_c[None, :], np.stack([path_x, path_y], axis=1), Goal_c[None, :]])
+        path = path[np.concatenate([[True], np.any(np.diff(path, axis=0) != 0, axis=1)])]
+        path = Shortcut_Path(path, DistanceMap(Coarse))
+        path = Pyramid.From_Level(path, Level)
+        path[0], path[-1] = Start, Goal
+        self.CoarsePath = path
+
+        ##.. Refinement at full resolution
+        path = self.Refine(np.asarray(Map), path)
+        if path is None :
+            print("Coarse-to-Fine : refinement failed")
+            return self.Plan_Full(Map, Start, Goal, Planner)
+        self.Success = True
+        return path[:, 0].copy(), path[:, 1].copy()
+
+    def Plan_Full(self, Map, Start, Goal, Planner) :
+        print("Coarse-to-Fine : planning on the full map")
+        path_x, path_y = Planner(Map, Start, Goal)
+        self.Success = len(path_x) > 0
+        return path_x, path_y
+
+    # pieces of at most ChunkLen, the interior points on obstacle cells dropped - refined path or None
+    def Refine(self, Map, path) :
+        H, W = Map.shape
+        pts = Resample_Path(path, self.ChunkLen)
+        ix = np.clip(np.round(pts[1:-1, 0]).astype(np.int64), 0, W - 1)
+        iy = np.clip(np.round(pts[1:-1, 1]).astype(np.int64), 0, H - 1)
+        pts = np.vstack([pts[:1], pts[1:-1][Map[iy, ix] == 0], pts[-1:]])
+
+        out = [pts[:1]]
+        for a, b in zip(pts[:-1], pts[1:]) :
+            x0 = max(int(math.floor(min(a[0], b[0]))) - self.Width, 0)
+            y0 = max(int(math.floor(min(a[1], b[1]))) - self.Width, 0)
+            x1 = min(int(math.ceil(max(a[0], b[0]))) + self.Width + 1, W)
+            y1 = min(int(math.ceil(max(a[1], b[1]))) + self.Width + 1, H)
+            # window framed by obstacle cells - the obstacles outside are never closer than the frame, so the
+            # clearances inside stay conservative
+            Window = np.pad(Map[y0:y1, x0:x1], 1, constant_values=1)
+            DistMap = DistanceMap(Window)
+            off = np.array([x0 - 1, y0 - 1], dtype=np.float64)
+            if not DistMap.Check_Segment(a - off, b - off) :
+                out.append(b[None, :])
+                continue
+            local = RRT()
+            px, py = local.PathPlanning_Connect(Window, a - off, b - off, MaxIter=self.MaxIter)
+            if not local.Success :
+                return None
+            self.numReplan = self.numReplan + 1
+            piece = Shortcut_Path(np.stack([px, py], axis=1), DistMap) + off
+            out.append(piece[1:])
+        return Remove_Colinear(np.vstack(out))
@@ -0,0 +1,94 @@
+import numpy as np
+
+#.. path post-processing - (N,2) paths [x, y] in map cells, collision checked on a DistanceMap
+
+# greedy shortcut - from each kept point jump to the farthest point reachable in a straight free line
+# (all candidate segments of a point checked in one batch)
+def Shortcut_Path(path, DistMap, Margin=None) :
+    path = np.asarray(path, dtype=np.float64)
+    if len(path) <= 2 :
+        return path.copy()
+    keep = [0]
+    i = 0
+    while i < len(path) - 1 :
+        cand = np.arange(i + 1, len(path))
+        free = ~DistMap.Check_Segments(np.repeat(path[i][None, :], len(cand), axis=0), path[cand], Margin)
+        # the next point is always kept, even if its own segment is flagged (path as planned)
+        j = int(cand[np.nonzero(free)[0][-1]]) if free.any() else i + 1
+        keep.append(j)
+        i = j
+    return path[keep]
+
+# drop interior points whose distance to the line through their kept neighbours is below Tol
+def Remove_Colinear(path, Tol=1e-3) :
+    path = np.asarray(path, dtype=np.float64)
+    if len(path) <= 2 :
+        return path.copy()
+    keep = [0]
+    for i in range(1, len(path) - 1) :
+        a, b, c = path[keep[-1]], path[i], path[i + 1]
+        ac = c - a
+        len_ac = np.sqrt(ac[0] * ac[0] + ac[1] * ac[1])
+        cross = ac[0] * (b[1] - a[1]) - ac[1] * (b[0] - a[0])
+        # b on the segment a-c (not a turn back)
+        if len_ac > 0 and abs(cross) / len_ac < Tol and np.dot(b - a, ac) >= 0 and np.dot(c - b, ac) >= 0 :
+            continue
+        keep.append(i)
+    keep.append(len(path) - 1)
+    return path[keep]
+
+# points at most Spacing apart along the path - polyline (corners kept), or centripetal Catmull-Rom spline through the points
+def Resample_Path(path, Spacing, Spline=False) :
+    path = np.asarray(path, dtype=np.float64)
+    if len(path) < 2 :
+        return path.copy()
+    if Spline and len(path) > 2 :
+        # dense spline samples, then even arc length steps along them
+        P = np.vstack([2 * path[0] - path[1], path, 2 * path[-1] - path[-2]])
+        segLen = np.sqrt(np.sum(np.diff(path, axis=0) ** 2, axis=1))
+        numDense = np.maximum(np.ceil(segLen / (0.25 * Spacing)).astype(np.int64), 1)
+        dense = [path[:1]]
+        for i in range(len(path) - 1) :
+            u = np.arange(1, numDense[i] + 1) / numDense[i]
+            dense.append(Catmull_Rom(P[i], P[i + 1], P[i + 2], P[i + 3], u))
+        dense = np.vstack(dense)
+        seg = np.sqrt(np.sum(np.diff(dense, axis=0) ** 2, axis=1))
+        S = np.concatenate([[0.], np.cumsum(seg)])
+        s = np.linspace(0, S[-1], max(int(np.ceil(S[-1] / Spacing)), 1) + 1)
+        return np.stack([np.interp(s, S, dense[:, 0]), np.interp(s, S, dense[:, 1])], axis=1)
+    # every segment split evenly, so the corners stay waypoints
+    seg = np.sqrt(np.sum(np.diff(path, axis=0) ** 2, axis=1))
+    numSplit = np.maximum(np.ceil(seg / Spacing).astype(np.int64), 1)
+    i_seg = np.repeat(np.arange(len(seg)), numSplit)
+    u = (np.arange(np.sum(numSplit)) - np.repeat(np.cumsum(numSplit) - numSplit, numSplit)) / numSplit[i_seg]
+    return np.vstack([path[i_seg] + (path[i_seg + 1] - path[i_seg]) * u[:, None], path[-1:]])
+
+# centripetal Catmull-Rom between p1 & p2 at u in [0, 1]
+def Catmull_Rom(p0, p1, p2, p3, u) :
+    t0 = 0.
+    t1 = t0 + max(np.linalg.norm(p1 - p0), 1e-9) ** 0.5
+    t2 = t1 + max(np.linalg.norm(p2 - p1), 1e-9) ** 0.5
+    t3 = t2 + max(np.linalg.norm(p3 - p2), 1e-9) ** 0.5
+    t = (t1 + (t2 - t1) * u)[:, None]
+    A1 = (t1 - t) / (t1 - t0) * p0 + (t - t0) / (t1 - t0) * p1
+    A2 = (t2 - t) / (t2 - t1) * p1 + (t - t1) / (t2 - t1) * p2
+    A3 = (t3 - t) / (t3 - t2) * p2 + (t - t2) / (t3 - t2) * p3
+    B1 = (t2 - t) / (t2 - t0) * A1 + (t - t0) / (t2 - t0) * A2
+    B2 = (t3 - t) / (t3 - t1) * A2 + (t - t1) / (t3 - t1) * A3
+    return (t2 - t) / (t2 - t1) * B1 + (t - t1) / (t2 - t1) * B2
+
+# shortcut -> colinear removal -> optional resampling
+# Margin is the clearance kept by the shortcuts, the spline may eat into it but is dropped if it reaches an obstacle
+def Post_Process(path_x, path_y, DistMap, Spacing=None, Spline=False, Margin=None) :
+    path = np.stack([np.ravel(path_x), np.ravel(path_y)], axis=1).astype(np.float64)
+    if len(path) == 0 :
+        return np.array([]), np.array([])
+    path = Shortcut_Path(path, DistMap, Margin)
+    path = Remove_Colinear(path)
+    if Spacing is not None :
+        out = Resample_Path(path, Spacing, Spline)
+        if Spline and DistMap.Check_Segments(out[:-1], out[1:], 0.).any() :
+            print("Path Post-Process : spline in collision, polyline resampled")
+            out = Resample_Path(path, Spacing, False)
+        path = out
+    return path[:, 0].copy(), path[:, 1].copy()
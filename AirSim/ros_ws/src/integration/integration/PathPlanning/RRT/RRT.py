@@ -1,31 +1,49 @@
-import matplotlib.pyplot as plt
 import numpy as np
-import collections
 import math
-from .collision_check import collision_check as colli
-from dataclasses import dataclass
+from .DistanceMap import DistanceMap
+from .Tree import Tree
 import time
 # from array import array
 # import random
 
-# @dataclass
-#class Tree:
-#    coord:[9999999,9999999]
-#    cost:9999999
-#    parent:9999999
-    # def __init__(self):
-    #     self.coord = np.array([-9999999,-9999999])
-    #     self.cost = 9999999
-    #     self.parent = 9999999
-
 class RRT:
 
-    def PathPlanning(self, Map, Start, Goal) :
+    def __init__(self) :
+        # result of the last plan - path reaches the goal or not, iterations used, tree size
+        self.Success = False
+        self.N_Iter = 0
+        self.numNodes = 0
+        # distance transform of the last map, for post-processing the path
+        self.DistMap = None
+        # anytime search - its generator, tree & goal connections, best path cost
+        self.Steps = iter(())
+        self.Nodes = None
+        self.GoalParents = []
+        self.Goal = None
+        self.C_Best = math.inf
+
+    # Mode : 'rrt'      - first feasible path (default)
+    #        'rrtstar'  - rewiring within a radius, path cost improved until the budget runs out
+    #        'informed' - rrtstar, sampling restricted to the ellipse of the best path after the first solution
+    #        'connect'  - RRT-Connect, trees from both ends greedily connected, empty path on failure
+    def PathPlanning(self, Map, Start, Goal, Mode='rrt', MaxIter=None, TimeBudget=None) :
+        if Mode in ('rrtstar', 'informed') :
+            return self.PathPlanning_Star(Map, Start, Goal, Informed=(Mode == 'informed'), MaxIter=MaxIter, TimeBudget=TimeBudget)
+        if Mode == 'connect' :
+            return self.PathPlanning_Connect(Map, Start, Goal, MaxIter=MaxIter, TimeBudget=TimeBudget)
+        if Mode != 'rrt' :
+            print("Default Flag : RRT Mode")
+        return self.PathPlanning_RRT(Map, Start, Goal, MaxIter=MaxIter, TimeBudget=TimeBudget)
+
+    def PathPlanning_RRT(self, Map, Start, Goal, MaxIter=None, TimeBudget=None) :
+
+        MaxIter = 100000 if MaxIter is None else MaxIter
+        t_start = time.perf_counter()
 
         N_grid = len(Map)
 
-        Start = Start.astype(np.float)
-        Goal = Goal.astype(np.float)
+        Start = np.ravel(Start).astype(np.float64)
+        Goal = np.ravel(Goal).astype(np.float64)
 
 
         # User Parameter
@@ -33,17 +51,16 @@ class RRT:
         Search_Margin = 0
 
         ##.. Algorithm Initialize
-        q_start = np.array([Start, 0, 0], dtype=object)       # Coord, Cost, Parent
-        q_goal = np.array([Goal, 0, 0], dtype=object)
+        # distance transform of the map, once per plan
+        DistMap = DistanceMap(Map)
+        self.DistMap = DistMap
 
-        idx_nodes = 1
+        # tree - start node twice (root & its first copy), as the planner always did
+        nodes = Tree(Dim=2, Capacity=4096, CellSize=4 * step_size)
+        nodes.Add_Node(Start, 0, 0)
+        nodes.Add_Node(Start, 0, 0)
+        idx_last = 1
 
-        # nodes = collections.namedtuple('Tree', ['coord', 'cost', 'parent'])
-        # nodes = np.array([[999999,99999], 99999, 99999])
-        # nodes = np.vstack(q_start)
-        nodes = q_start
-        nodes = np.vstack([nodes, q_start])
-        # np.vstack([q_start, q_goal])
         ##.. Algorithm Start
 
         flag_end = 0
@@ -52,106 +69,317 @@ class RRT:
             # Set Searghing Area
             Search_Area_min = Goal - Search_Margin
             Search_Area_max = Goal + Search_Margin
-            q_rand = Search_Area_min + (Search_Area_max-Search_Area_min) * np.random.uniform(0,1,[2,1])
+            q_rand = Search_Area_min + (Search_Area_max-Search_Area_min) * np.random.uniform(0,1,[2,1]).ravel()
 
             # Pick the closest node from existing list to branch out from
-            dist_list = []
-            for i in range(0, idx_nodes+1) :
-                dist = np.linalg.norm(nodes[i][0] - q_rand)
-                if (i == 0) :
-                    dist_list = [dist]
-                else:
-                    dist_list.append(dist)
-
-
-            # if (idx_nodes==0) :
-            #     val = dist_list
-            #     idx = 0
-            #     # q_near = nodes[idx]
-            #     # new_coord = q_near + (q_rand - q_near) / val * step_size
-            #     # q_near.coord = nodes.coord[idx]
-            # else :
-            val = min(dist_list)
-            idx = dist_list.index(val)
-
-            q_near = nodes[idx]
-            # q_new = Tree()
-            # q_new = collections.namedtuple('Tree', ['coord', 'cost', 'parent'])
-            new_coord = q_near[0] + (q_rand - q_near[0]) / val * step_size
-
-
-
+            idx, val = nodes.Nearest(q_rand)
+            q_near = nodes.Coord[idx]
+            new_coord = q_near + (q_rand - q_near) / val * step_size
 
             # Collision Check
-            flag_collision = colli.collision_check(Map, q_near[0], new_coord)
-            #print(q_near[0], new_coord)
-
-            # flag_collision = 0
+            flag_collision = DistMap.Check_Segment(q_near, new_coord)
 
             # Add to Tree
             if (flag_collision == 0):
                 Search_Margin = 0
-                new_cost = nodes[idx][1] + np.linalg.norm(new_coord - q_near[0])
-                new_parent = idx
-                q_new = np.array([new_coord, new_cost, new_parent], dtype=object)
-                # print(nodes[0])
-
-                nodes = np.vstack([nodes, q_new])
-                # nodes = list(zip(nodes, q_new))
-                # nodes.append(q_new)
-                # print(nodes[0])
+                new_cost = nodes.Cost[idx] + np.linalg.norm(new_coord - q_near)
+                idx_last = nodes.Add_Node(new_coord, new_cost, idx)
 
-                Goal_Dist = np.linalg.norm(new_coord - q_goal[0])
-
-                idx_nodes = idx_nodes + 1
+                Goal_Dist = np.linalg.norm(new_coord - Goal)
 
                 if (Goal_Dist < step_size) :
                     flag_end = 1
-                    nodes = np.vstack([nodes, q_goal])
-                    idx_nodes = idx_nodes + 1
             else:
                 Search_Margin = Search_Margin + N_grid/100
 
                 if Search_Margin >= N_grid :
                     Search_Margin = N_grid
             N_Iter = N_Iter + 1
-            if N_Iter > 100000 :
+            if N_Iter > MaxIter :
                 
                 break
-            # plt.imshow(Map, cmap='hot')  # , interpolation='none')
-            # plt.plot(new_coord[0], new_coord[1], 'b.')
-            # plt.plot(Start[0], Start[1], 'ro')
-            # plt.plot(Goal[0], Goal[1], 'bo')
-            # plt.show()
-            # print(nodes[idx_nodes])
-
-        flag_merge = 0
-        idx = 0
-        idx_parent = idx_nodes-1
-        path_x_inv = np.array([])
-        path_y_inv = np.array([])
-        while(flag_merge == 0):
-            path_x_inv = np.append(path_x_inv, nodes[idx_parent][0][0])
-            path_y_inv = np.append(path_y_inv, nodes[idx_parent][0][1])
-            # path_x = [path_x,nodes[idx_parent][0][0]]
-            # path_y = [path_x,nodes[idx_parent][0][1]]
-            # path_y[idx] = nodes[idx_parent][0][1]
-            idx_parent = nodes[idx_parent][2]
-            idx = idx + 1
-
-            if idx_parent == 0 :
-                flag_merge = 1
-
-        path_x = np.array([])
-        path_y = np.array([])
-        for i in range(0,idx-2):
-            path_x = np.append(path_x, path_x_inv[idx-i-1])
-            path_y = np.append(path_y, path_y_inv[idx-i-1])
-
+            if TimeBudget is not None and time.perf_counter() - t_start > TimeBudget :
+                break
 
+        self.Success = (flag_end == 1)
+        self.N_Iter = N_Iter
+        self.numNodes = len(nodes)
 
+        # branch of the last node back to the child of the start, the two nodes next to the goal left out
+        branch = nodes.Get_Branch(idx_last, Stop=0)
+        path = nodes.Coord[branch[2:][::-1]]
+        path_x = path[:, 0].copy()
+        path_y = path[:, 1].copy()
 
         # path_x = np.linspace(Start[0], Goal[0], 10)
         # path_y = np.linspace(Start[1], Goal[1], 10)
 
         return path_x, path_y
+
+    def PathPlanning_Star(self, Map, Start, Goal, Informed=False, MaxIter=None, TimeBudget=None, StepSize=None, GoalBias=0.05) :
+        self.Start_Plan(Map, Start, Goal, Mode=('informed' if Informed else 'rrtstar'), MaxIter=MaxIter, StepSize=StepSize, GoalBias=GoalBias)
+        self.Step(math.inf if TimeBudget is None else TimeBudget)
+        return self.Best_Path()
+
+    ##.. anytime planning - the rrtstar / informed search as a generator advanced in time slices,
+    #    the best path so far available at any point
+    def Plan(self, Map, Start, Goal, Budget, Mode='informed', MaxIter=None) :
+        self.Start_Plan(Map, Start, Goal, Mode=Mode, MaxIter=MaxIter)
+        self.Step(Budget)
+        return self.Best_Path()
+
+    def Start_Plan(self, Map, Start, Goal, Mode='informed', MaxIter=None, StepSize=None, GoalBias=0.05) :
+        if Mode not in ('rrtstar', 'informed') :
+            print("Default Flag : RRT Anytime Mode")
+            Mode = 'informed'
+        self.Steps = self.Star_Steps(Map, Start, Goal, Informed=(Mode == 'informed'), MaxIter=MaxIter, StepSize=StepSize, GoalBias=GoalBias)
+
+    # advance the search for TimeSlice [s] (or until the first solution), False once its iterations are used up
+    def Step(self, TimeSlice, StopOnSuccess=False) :
+        t_start = time.perf_counter()
+        for c_best in self.Steps :
+            if time.perf_counter() - t_start > TimeSlice or (StopOnSuccess and self.Success) :
+                return True
+        return False
+
+    def Best_Cost(self) :
+        return self.C_Best
+
+    # best branch to the goal, or to the node closest to it when there is no solution yet
+    def Best_Path(self) :
+        nodes, Goal = self.Nodes, self.Goal
+        if nodes is None :
+            return np.array([]), np.array([])
+        if len(self.GoalParents) > 0 :
+            goal_cost = nodes.Cost[self.GoalParents] + np.sqrt(np.sum((nodes.Coord[self.GoalParents] - Goal) ** 2, axis=1))
+            idx_last = self.GoalParents[int(np.argmin(goal_cost))]
+            path = np.vstack([nodes.Coord[nodes.Get_Branch(idx_last)[::-1]], Goal])
+        else:
+            idx_last, val = nodes.Nearest(Goal)
+            path = nodes.Coord[nodes.Get_Branch(idx_last)[::-1]]
+        path_x = path[:, 0].copy()
+        path_y = path[:, 1].copy()
+
+        return path_x, path_y
+
+    # one iteration per step, yields the best path cost (inf before the first solution)
+    # Resume : continue on the tree & distance map of the last search (Map unused)
+    def Star_Steps(self, Map, Start, Goal, Informed=False, MaxIter=None, StepSize=None, GoalBias=0.05, Resume=False) :
+
+        # samples over the whole map (also non-square) [x, y]
+        Height, Width = (self.DistMap.Height, self.DistMap.Width) if Resume else np.shape(Map)[:2]
+        MapMax = np.array([Width - 1, Height - 1], dtype=np.float64)
+        MaxIter = 5000 if MaxIter is None else MaxIter
+
+        Start = np.ravel(Start).astype(np.float64)
+        Goal = np.ravel(Goal).astype(np.float64)
+
+        # User Parameter - steering step & rewiring radius gamma * sqrt(log(n) / n), capped at 3 steps
+        c_min = np.linalg.norm(Goal - Start)
+        step_size = c_min / 50 if StepSize is None else StepSize
+        gamma = 2 * math.sqrt(1.5 * Width * Height / math.pi)
+
+        # informed sampling frame - ellipse with foci Start & Goal, major axis along Start -> Goal
+        center = 0.5 * (Start + Goal)
+        theta = math.atan2(Goal[1] - Start[1], Goal[0] - Start[0])
+        Rot = np.array([[math.cos(theta), -math.sin(theta)], [math.sin(theta), math.cos(theta)]])
+
+        ##.. Algorithm Initialize
+        self.Start, self.Informed, self.StepSize, self.GoalBias = Start, Informed, step_size, GoalBias
+        if Resume :
+            DistMap, nodes, goal_parents, c_best = self.DistMap, self.Nodes, self.GoalParents, self.C_Best
+        else:
+            DistMap = DistanceMap(Map)
+            self.DistMap = DistMap
+            nodes = Tree(Dim=2, Capacity=4096, CellSize=step_size)
+            nodes.Add_Node(Start, 0, -1)
+            # nodes connected to the goal & the best path cost through them
+            goal_parents = []
+            c_best = math.inf
+            self.Nodes, self.GoalParents, self.Goal = nodes, goal_parents, Goal
+            self.Success = False
+            self.C_Best = c_best
+
+        ##.. Algorithm Start
+        for N_Iter in range(MaxIter) :
+            self.N_Iter = N_Iter
+            self.numNodes = len(nodes)
+            yield c_best
+
+            # Sample
+            if Informed and c_best < math.inf :
+                r_major = 0.5 * c_best
+                r_minor = 0.5 * math.sqrt(max(c_best * c_best - c_min * c_min, 0.))
+                rho = math.sqrt(np.random.uniform(0, 1))
+                phi = np.random.uniform(0, 2 * math.pi)
+                q_rand = center + Rot @ np.array([r_major * rho * math.cos(phi), r_minor * rho * math.sin(phi)])
+                q_rand = np.clip(q_rand, 0, MapMax)
+            elif np.random.uniform(0, 1) < GoalBias :
+                q_rand = Goal.copy()
+            else:
+                q_rand = np.random.uniform(0, 1, 2) * MapMax
+
+            # Steer from the nearest node
+            idx, val = nodes.Nearest(q_rand)
+            q_near = nodes.Coord[idx]
+            if val <= 0 :
+                continue
+            new_coord = q_near + (q_rand - q_near) * min(step_size / val, 1.)
+
+            # Collision check of the steered edge & the edges from the near nodes in one batch
+            radius = min(gamma * math.sqrt(math.log(len(nodes) + 1) / (len(nodes) + 1)), 3 * step_size)
+            near = nodes.Near(new_coord, radius)
+            near = near[near != idx]
+            cand = np.append(idx, near)
+            free = ~DistMap.Check_Segments(nodes.Coord[cand], np.repeat(new_coord[None, :], len(cand), axis=0))
+            if not free[0] :
+                continue
+
+            # Choose the parent of least cost among the near nodes reachable without collision
+            dist = np.sqrt(np.sum((nodes.Coord[cand] - new_coord) ** 2, axis=1))
+            cost = nodes.Cost[cand] + dist
+            i_best = int(np.argmin(np.where(free, cost, math.inf)))
+            new_cost = cost[i_best]
+            idx_new = nodes.Add_Node(new_coord, new_cost, int(cand[i_best]))
+
+            # Rewire the near nodes through the new node when it is cheaper
+            for i_n in np.nonzero(free[1:] & (new_cost + dist[1:] < nodes.Cost[near]))[0] :
+                nodes.Rewire(int(near[i_n]), idx_new, new_cost + dist[1 + i_n])
+
+            # Goal connection
+            if np.linalg.norm(Goal - new_coord) < step_size and not DistMap.Check_Segment(new_coord, Goal) :
+                goal_parents.append(idx_new)
+            if len(goal_parents) > 0 :
+                goal_cost = nodes.Cost[goal_parents] + np.sqrt(np.sum((nodes.Coord[goal_parents] - Goal) ** 2, axis=1))
+                c_best = float(np.min(goal_cost))
+                self.Success = True
+                self.C_Best = c_best
+
+        self.N_Iter = MaxIter
+        self.numNodes = len(nodes)
+
+    ##.. incremental replanning - new obstacles (Cells [x, y] / Circles [x, y, r] in map cells) added to the last
+    #    rrtstar / informed search : distance map updated around them, tree edges now in collision removed with
+    #    their subtrees, then the search resumed on what is left until it reaches the goal again (or Budget [s])
+    def Replan(self, Cells=None, Circles=None, Budget=1.0, MaxIter=None, Pad=256) :
+        if self.Nodes is None :
+            print("RRT Replan : no search tree to repair")
+            return np.array([]), np.array([])
+        box = self.DistMap.Update(Cells=Cells, Circles=Circles, Pad=Pad)
+        if box is None :
+            return self.Best_Path()
+        x0, y0, x1, y1 = box
+        nodes = self.Nodes
+        n = len(nodes)
+
+        # edges (parent -> node) with a bounding box reaching the changed cells, checked in one batch
+        idx = np.nonzero(nodes.Parent[:n] >= 0)[0]
+        A, B = nodes.Coord[nodes.Parent[idx]], nodes.Coord[idx]
+        lo, hi = np.minimum(A, B) - 1, np.maximum(A, B) + 1
+        near = (hi[:, 0] >= x0) & (lo[:, 0] <= x1) & (hi[:, 1] >= y0) & (lo[:, 1] <= y1)
+        flag = np.zeros(n, dtype=bool)
+        flag[idx[near]] = self.DistMap.Check_Segments(A[near], B[near])
+        remap = nodes.Prune(flag)
+
+        # goal connections kept if their node survived & the last edge is still free
+        goal_parents = remap[np.array(self.GoalParents, dtype=np.int64)]
+        goal_parents = goal_parents[goal_parents >= 0]
+        if len(goal_parents) > 0 :
+            goal_parents = goal_parents[~self.DistMap.Check_Segments(nodes.Coord[goal_parents], np.repeat(self.Goal[None, :], len(goal_parents), axis=0))]
+        self.GoalParents[:] = [int(i) for i in goal_parents]
+        if len(goal_parents) > 0 :
+            self.C_Best = float(np.min(nodes.Cost[goal_parents] + np.sqrt(np.sum((nodes.Coord[goal_parents] - self.Goal) ** 2, axis=1))))
+        else:
+            self.C_Best = math.inf
+        self.Success = len(goal_parents) > 0
+        print("RRT Replan :", int(np.sum(remap < 0)), "of", n, "nodes removed")
+
+        self.Steps = self.Star_Steps(None, self.Start, self.Goal, Informed=self.Informed, MaxIter=MaxIter, StepSize=self.StepSize, GoalBias=self.GoalBias, Resume=True)
+        self.Step(Budget, StopOnSuccess=True)
+        return self.Best_Path()
+
+    def PathPlanning_Connect(self, Map, Start, Goal, MaxIter=None, TimeBudget=None, StepSize=None) :
+
+        # samples over the whole map (also non-square windows) [x, y]
+        MapMax = np.array([np.shape(Map)[1] - 1, np.shape(Map)[0] - 1], dtype=np.float64)
+        MaxIter = 20000 if MaxIter is None else MaxIter
+        t_start = time.perf_counter()
+
+        Start = np.ravel(Start).astype(np.float64)
+        Goal = np.ravel(Goal).astype(np.float64)
+
+        # User Parameter
+        step_size = np.linalg.norm(Goal - Start) / 50 if StepSize is None else StepSize
+
+        ##.. Algorithm Initialize
+        DistMap = DistanceMap(Map)
+        self.DistMap = DistMap
+        self.Success = False
+        self.N_Iter = 0
+        self.numNodes = 0
+        if DistMap.Check_Point(Start) or DistMap.Check_Point(Goal) :
+            print("RRT Connect : Start or Goal in collision")
+            return np.array([]), np.array([])
+
+        # tree A grows toward the samples, tree B tries to connect to the new node of A, then they swap
+        tree_a = Tree(Dim=2, Capacity=4096, CellSize=step_size)
+        tree_b = Tree(Dim=2, Capacity=4096, CellSize=step_size)
+        tree_a.Add_Node(Start, 0, -1)
+        tree_b.Add_Node(Goal, 0, -1)
+        flag_swap = False
+
+        ##.. Algorithm Start
+        for N_Iter in range(MaxIter) :
+            if TimeBudget is not None and time.perf_counter() - t_start > TimeBudget :
+                break
+
+            # Extend A one step toward a sample
+            q_rand = np.random.uniform(0, 1, 2) * MapMax
+            idx_a = self.Extend(tree_a, DistMap, q_rand, step_size, 1)
+            if idx_a >= 0 :
+                # Connect B toward the new node as far as it is free
+                q_new = tree_a.Coord[idx_a]
+                idx_b = self.Extend(tree_b, DistMap, q_new, step_size, None)
+                if idx_b >= 0 and np.array_equal(tree_b.Coord[idx_b], q_new) :
+                    self.Success = True
+                    break
+            tree_a, tree_b = tree_b, tree_a
+            flag_swap = not flag_swap
+        self.N_Iter = N_Iter + 1
+        self.numNodes = len(tree_a) + len(tree_b)
+
+        if not self.Success :
+            print("RRT Connect : no path found in", self.N_Iter, "iterations")
+            return np.array([]), np.array([])
+
+        # branch of A from its root to the meeting node, then branch of B back to its root (meeting node once)
+        path = np.vstack([tree_a.Coord[tree_a.Get_Branch(idx_a)[::-1]], tree_b.Coord[tree_b.Get_Branch(idx_b)[1:]]])
+        if flag_swap :
+            path = path[::-1]
+        path_x = path[:, 0].copy()
+        path_y = path[:, 1].copy()
+
+        return path_x, path_y
+
+    # grow tree from its nearest node toward q by steps of step_size, at most numStep steps (None : until q)
+    # every step is collision checked in one batch and the free prefix is added, last added node returned (-1 : none)
+    def Extend(self, nodes, DistMap, q, step_size, numStep) :
+        idx, val = nodes.Nearest(q)
+        q_near = nodes.Coord[idx]
+        if val <= 0 :
+            return -1
+        numStep = int(math.ceil(val / step_size)) if numStep is None else min(numStep, int(math.ceil(val / step_size)))
+        t = np.minimum(np.arange(numStep + 1) * step_size / val, 1.)
+        pts = q_near + (q - q_near) * t[:, None]
+        # a step reaching q ends exactly on it (the connect test compares the coordinates)
+        if t[-1] == 1. :
+            pts[-1] = q
+        coll = DistMap.Check_Segments(pts[:-1], pts[1:])
+        numFree = int(np.argmax(coll)) if coll.any() else numStep
+        # cost of every step is its length (the last one can be shorter than step_size)
+        seg_len = np.sqrt(np.sum(np.diff(pts, axis=0) ** 2, axis=1))
+        idx_last = -1
+        for i in range(1, numFree + 1) :
+            idx_last = nodes.Add_Node(pts[i], nodes.Cost[idx] + seg_len[i - 1], idx)
+            idx = idx_last
+        return idx_last
@@ -0,0 +1,109 @@
+import time
+import threading
+import numpy as np
+
+#.. repaired path - never modified after it is published
+class ReplanResult:
+
+    def __init__(self, seq, path_x, path_y, Success, Cost, N_Iter, numCircles, calcTime) :
+        self.seq = seq
+        self.path_x = path_x
+        self.path_y = path_y
+        self.Success = Success
+        self.Cost = Cost
+        self.N_Iter = N_Iter
+        self.numCircles = numCircles
+        self.calcTime = calcTime
+
+#.. background tree repair - new obstacles (Circles [x, y, r] in map cells) published to the shared occupancy map & applied
+#   to the search tree of Planner (RRT.Replan) on a worker thread, so the executor never waits on the map write or the search
+#   input : pending circles, the ones posted while a repair runs are merged into the next one (none is lost)
+#   output : latest result, read once
+#   Lock is held while the worker uses the planner - the executor only touches it (refine steps, distance map reads, the
+#   post-processing of a result) after a non-blocking acquire
+class Replanner:
+
+    def __init__(self, Planner, OccMap=None) :
+        self.Planner = Planner
+        self.OccMap = OccMap
+        self.Lock = threading.Lock()
+
+        # input - pending circles & the settings of the latest post (swapped under SlotLock)
+        self.Pending = []
+        self.Budget = 1.0
+        self.MaxIter = None
+        self.SlotLock = threading.Lock()
+        self.Wakeup = threading.Event()
+
+        # output
+        self.Result = None
+        self.seq = 0
+        self.ReadSeq = 0
+
+        self.numPosted = 0
+        self.numSolved = 0
+        self.Running = False
+        self.Thread = None
+
+    def Start(self) :
+        if self.Running :
+            return
+        self.Running = True
+        self.Thread = threading.Thread(target=self.Run, name="RRT_Replanner", daemon=True)
+        self.Thread.start()
+
+    def Stop(self, timeout=1.) :
+        self.Running = False
+        self.Wakeup.set()
+        if self.Thread is not None :
+            self.Thread.join(timeout)
+
+    # called from the executor thread - never blocks on a running repair
+    def Post(self, Circles, Budget=1.0, MaxIter=None) :
+        Circles = np.reshape(np.array(Circles, dtype=np.float64), (-1, 3))
+        with self.SlotLock :
+            self.Pending.append(Circles)
+            self.Budget, self.MaxIter = Budget, MaxIter
+            self.numPosted = self.numPosted + 1
+        self.Wakeup.set()
+
+    # before a new plan on the planner - waits for a running repair, then drops the pending circles & the unread result
+    def Clear(self) :
+        with self.Lock :
+            with self.SlotLock :
+                self.Pending = []
+            self.ReadSeq = self.seq
+
+    # called from the executor thread - latest unread result or None
+    def Get_Result(self) :
+        res = self.Result
+        if res is None or res.seq == self.ReadSeq :
+            return None
+        self.ReadSeq = res.seq
+        return res
+
+    def Run(self) :
+        while self.Running :
+            self.Wakeup.wait(0.1)
+            self.Wakeup.clear()
+            with self.SlotLock :
+                Pending, self.Pending = self.Pending, []
+                Budget, MaxIter = self.Budget, self.MaxIter
+            if len(Pending) == 0 :
+                continue
+            Circles = np.concatenate(Pending, axis=0)
+
+            t0 = time.perf_counter()
+            with self.Lock :
+                try:
+                    if self.OccMap is not None :
+                        self.OccMap.Update(Circles=Circles)
+                    path_x, path_y = self.Planner.Replan(Circles=Circles, Budget=Budget, MaxIter=MaxIter)
+                except Exception as e :
+                    print("RRT Replanner : repair failed,", e)
+                    continue
+                Success, Cost, N_Iter = self.Planner.Success, self.Planner.Best_Cost(), self.Planner.N_Iter
+
+            self.seq = self.seq + 1
+            self.Result = ReplanResult(self.seq, path_x, path_y, Success, Cost, N_Iter, len(Circles), time.perf_counter() - t0)
+            self.numSolved = self.numSolved + 1
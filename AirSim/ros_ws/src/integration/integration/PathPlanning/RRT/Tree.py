@@ -0,0 +1,101 @@
+import numpy as np
+from .GridIndex import GridIndex
+
+#.. RRT tree - coordinates, parent index & cost of every node in preallocated arrays
+#   capacity doubles when full, so adding a node is amortized O(1) instead of a copy of the whole tree
+#   with a CellSize, nodes are also kept in a grid index for the nearest / near queries
+class Tree:
+
+    def __init__(self, Dim=2, Capacity=1024, CellSize=None) :
+        self.Coord = np.empty((Capacity, Dim), dtype=np.float64)
+        self.Parent = np.empty(Capacity, dtype=np.int64)
+        self.Cost = np.empty(Capacity, dtype=np.float64)
+        self.numNodes = 0
+        self.Index = GridIndex(CellSize) if CellSize is not None else None
+
+    def __len__(self) :
+        return self.numNodes
+
+    def Grow(self, Capacity) :
+        n = self.numNodes
+        Coord = np.empty((Capacity, self.Coord.shape[1]), dtype=np.float64)
+        Parent = np.empty(Capacity, dtype=np.int64)
+        Cost = np.empty(Capacity, dtype=np.float64)
+        Coord[:n] = self.Coord[:n]
+        Parent[:n] = self.Parent[:n]
+        Cost[:n] = self.Cost[:n]
+        self.Coord, self.Parent, self.Cost = Coord, Parent, Cost
+
+    def Add_Node(self, coord, cost, parent) :
+        if self.numNodes == len(self.Cost) :
+            self.Grow(2 * len(self.Cost))
+        idx = self.numNodes
+        self.Coord[idx] = np.ravel(coord)
+        self.Cost[idx] = cost
+        self.Parent[idx] = parent
+        self.numNodes = idx + 1
+        if self.Index is not None :
+            self.Index.Insert(idx, self.Coord[idx])
+        return idx
+
+    # nearest node (first one on ties) & its distance
+    def Nearest(self, q) :
+        q = np.ravel(q)
+        if self.Index is not None :
+            return self.Index.Nearest(q, self.Coord, self.numNodes)
+        diff = self.Coord[:self.numNodes] - q
+        dist = np.sqrt(np.sum(diff * diff, axis=1))
+        idx = int(np.argmin(dist))
+        return idx, dist[idx]
+
+    # nodes within radius of q
+    def Near(self, q, radius) :
+        q = np.ravel(q)
+        if self.Index is not None :
+            return self.Index.Near(q, radius, self.Coord)
+        diff = self.Coord[:self.numNodes] - q
+        return np.nonzero(np.sum(diff * diff, axis=1) <= radius * radius)[0]
+
+    # move idx under a new parent with a new cost, the subtree of idx follows by the same cost change
+    def Rewire(self, idx, parent, cost) :
+        delta = cost - self.Cost[idx]
+        self.Parent[idx] = parent
+        self.Cost[idx] = cost
+        front = np.array([idx])
+        while len(front) > 0 :
+            front = np.nonzero(np.isin(self.Parent[:self.numNodes], front))[0]
+            self.Cost[front] = self.Cost[front] + delta
+
+    # remove the flagged nodes with their subtrees, the others renumbered in order - old -> new index returned (-1 : removed)
+    def Prune(self, flag) :
+        n = self.numNodes
+        parent = self.Parent[:n]
+        has_parent = parent >= 0
+        flag = np.array(flag, dtype=bool)
+        while True :
+            spread = flag.copy()
+            spread[has_parent] |= flag[parent[has_parent]]
+            if np.array_equal(spread, flag) :
+                break
+            flag = spread
+        keep = np.nonzero(~flag)[0]
+        remap = np.full(n, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        Parent = parent[keep]
+        self.Parent[:len(keep)] = np.where(Parent >= 0, remap[np.maximum(Parent, 0)], Parent)
+        self.Coord[:len(keep)] = self.Coord[keep]
+        self.Cost[:len(keep)] = self.Cost[keep]
+        self.numNodes = len(keep)
+        if self.Index is not None :
+            self.Index = GridIndex(self.Index.CellSize)
+            for i in range(self.numNodes) :
+                self.Index.Insert(i, self.Coord[i])
+        return remap
+
+    # node indices from idx back to the root (parent < 0) or to the node whose parent is Stop
+    def Get_Branch(self, idx, Stop=-1) :
+        branch = [idx]
+        while self.Parent[idx] >= 0 and self.Parent[idx] != Stop :
+            idx = int(self.Parent[idx])
+            branch.append(idx)
+        return branch
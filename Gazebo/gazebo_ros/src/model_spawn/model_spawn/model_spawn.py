@@ -20,7 +20,9 @@ class ModelSpawnClass(Node):
         # Init Grid Map
         self.MapWidth = int(5000)
         self.MapHeight = int(5000)
-        self.GridMap = np.full((self.MapWidth, self.MapHeight,3), 255, np.uint8)
+        # single channel occupancy grid (1 = obstacle), published to the planners as OccupancyMap files
+        self.GridMap = np.zeros((self.MapWidth, self.MapHeight), np.uint8)
+        self.GridMapPath = "/root/ros_ws/src/integration/integration/PathPlanning/Map/occupancy.npy"
 
         # init Publisher
         self.FireSpawnPublihsher = self.create_publisher(Image, 'MakeFire', 20)
@@ -146,7 +148,7 @@ class ModelSpawnClass(Node):
 
     # Out Obstacle Spawn
     def KnownObsSpawn(self):
-        Color = (0, 0, 0)
+        Color = 1
         for i in range(0, self.KnownObsNum - 1):
             index = random.randint(1,3) - 1
             self.KnownObsIndex[i] = index + 1
@@ -167,12 +169,23 @@ class ModelSpawnClass(Node):
             Radius = int(Temp / 2 * 20)
             cv2.circle(self.GridMap, Center, Radius, Color, -1)
 
-        cv2.rotate(self.GridMap, cv2.ROTATE_180)
-        cv2.flip(self.GridMap,1)
-
-        cv2.cvtColor(self.GridMap, cv2.COLOR_BGR2GRAY)
-        cv2.threshold(self.GridMap, 150, 255, cv2.THRESH_BINARY)
-        cv2.imwrite("/root/ros_ws/src/integration/integration/PathPlanning/Map/test.png",self.GridMap)
+        self.PublishGridMap()
+
+    # Grid Map -> planner frame (Map[y][x] : transpose of the drawn grid, as test.png after flip & 90 deg CW rotation)
+    # written next to the old file & swapped in, then the version bumped - readers re-attach on a new version
+    def PublishGridMap(self):
+        VersionPath = self.GridMapPath + ".version"
+        try:
+            with open(VersionPath, 'r') as f:
+                Version = int(f.read().strip() or 0) + 1
+        except (OSError, ValueError):
+            Version = 1
+        with open(self.GridMapPath + ".tmp", 'wb') as f:
+            np.save(f, np.ascontiguousarray(self.GridMap.T))
+        os.replace(self.GridMapPath + ".tmp", self.GridMapPath)
+        with open(VersionPath + ".tmp", 'w') as f:
+            f.write(str(Version))
+        os.replace(VersionPath + ".tmp", VersionPath)
 
 
     ## Client
@@ -0,0 +1,69 @@
+# pulbic libs.
+import sys
+import json
+import argparse
+import numpy as np
+
+# private libs.
+from .Guid_MPPI import Get_MPPI_Engine
+from .PathIndex import PathIndex
+from .MPPI_Scenario import Set_Scenario, Load_Scenarios, Scenarios_Default
+
+#.. replay each scenario in float64 (reference) & the test precision with the same seed
+#   float32 is a cuda mode - the cpu engine runs float64 for any Precision, so it only checks the harness there
+#   nan_mismatch : samples diverged (nan cost) in one precision only - their attitude command sits on the edge of the
+#   arcsin domain (|AccCmd_x| ~ |AccCmd| cos(phi)), where rounding decides whether the sample survives
+def Check_Precision(listScenario, Backend='cuda', Precision='float32'):
+    Engine      =   Get_MPPI_Engine(Backend)
+    err_stk, err_u1, err_u2, numNaN =   [], [], [], 0
+    for scenario in listScenario:
+        out     =   {}
+        Index   =   PathIndex([scenario['WPs']])
+        for prec in ['float64', Precision]:
+            MPPIParams, GCUParams, WPs, Pos, Vn, AngEuler, Seed =   Set_Scenario(scenario, prec)
+            du1, du2    =   Engine.Rollout(MPPIParams, GCUParams, WPs, Pos, Vn, AngEuler, MPPIParams.u1_MPPI, MPPIParams.u2_MPPI, Seed, Index=Index)
+            out[prec]   =   (Engine.Get_Cost()[0], MPPIParams.u1_MPPI + du1, MPPIParams.u2_MPPI + du2)
+        stk_ref, u1_ref, u2_ref =   out['float64']
+        stk, u1, u2             =   out[Precision]
+
+        # trajectory cost - relative error over the samples finite in both, diverged-sample mismatches counted apart
+        flagFinite  =   np.isfinite(stk_ref) & np.isfinite(stk)
+        numNaN      =   numNaN + int(np.sum(np.isfinite(stk_ref) != np.isfinite(stk)))
+        err_stk.append(np.max(np.abs(stk[flagFinite] - stk_ref[flagFinite])/np.maximum(np.abs(stk_ref[flagFinite]), 1e-12)) if flagFinite.any() else 0.)
+        err_u1.append(np.max(np.abs(u1 - u1_ref)))
+        err_u2.append(np.max(np.abs(u2 - u2_ref)))
+
+    def Stats(arr):
+        return {'mean': float(np.mean(arr)), 'p99': float(np.percentile(arr, 99)), 'max': float(np.max(arr))}
+    return {
+        'Backend'       :   type(Engine).__name__,
+        'Precision'     :   Precision,
+        'numScenario'   :   len(listScenario),
+        'stk_rel_err'   :   Stats(err_stk),
+        'u1_abs_err'    :   Stats(err_u1),
+        'u2_abs_err'    :   Stats(err_u2),
+        'nan_mismatch'  :   numNaN,
+    }
+
+def main(args=None):
+    parser  =   argparse.ArgumentParser(description='MPPI reduced-precision accuracy against the float64 reference')
+    parser.add_argument('--backend', default='cuda', choices=['auto', 'cuda', 'cpu'])
+    parser.add_argument('--precision', default='float32', choices=['float32', 'float64'])
+    parser.add_argument('--record', nargs='*', default=[], help='.npz recordings from MPPI.Save_Record (default : synthetic scenarios)')
+    parser.add_argument('--json', default=None, help='write the report to this file')
+    opts    =   parser.parse_args(args)
+
+    listScenario    =   []
+    for fileName in opts.record:
+        listScenario    =   listScenario + Load_Scenarios(fileName)
+    if len(listScenario) == 0:
+        listScenario    =   Scenarios_Default()
+
+    res     =   Check_Precision(listScenario, opts.backend, opts.precision)
+    print(json.dumps(res, indent=2))
+    if opts.json is not None:
+        with open(opts.json, 'w') as f:
+            json.dump(res, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,201 @@
+# pulbic libs.
+import sys
+import time
+import json
+import argparse
+import numpy as np
+
+# private libs.
+from .Guid_MPPI import MPPI
+from .PathIndex import PathIndex
+from .MPPI_Scenario import Scenario_Default, Scenario_LongPath, Scenarios_Default, Set_Scenario, Load_Scenarios
+
+#.. cold (first call after construction) vs. warm (steady state) latency
+def Bench_MPPI_Latency(Backend='auto', numCalls=50):
+    GCUParams, WPs, Pos, Vn, AngEuler   =   Scenario_Default()
+    Index       =   PathIndex([WPs])
+
+    t0          =   time.perf_counter()
+    solver      =   MPPI(Backend)
+    t_init      =   time.perf_counter() - t0
+
+    t0          =   time.perf_counter()
+    solver.Guid_MPPI(GCUParams, WPs, Pos, Vn, AngEuler, Index=Index)
+    t_cold      =   time.perf_counter() - t0
+
+    t_warm      =   np.zeros(numCalls)
+    for i in range(numCalls):
+        t0          =   time.perf_counter()
+        solver.Guid_MPPI(GCUParams, WPs, Pos, Vn, AngEuler, Index=Index)
+        t_warm[i]   =   time.perf_counter() - t0
+
+    return {
+        'Backend'   :   type(solver.Engine).__name__,
+        'init'      :   t_init,
+        'cold'      :   t_cold,
+        'warm_mean' :   float(np.mean(t_warm)),
+        'warm_p50'  :   float(np.percentile(t_warm, 50)),
+        'warm_max'  :   float(np.max(t_warm)),
+    }
+
+#.. recorded horizon resampled to N steps - edge values hold past the recorded end
+def Resize_Horizon(MPPIParams, N):
+    numRec      =   len(MPPIParams.u1_MPPI)
+    idx         =   np.minimum(np.arange(N), numRec - 1)
+    MPPIParams.u1_MPPI      =   MPPIParams.u1_MPPI[idx]
+    MPPIParams.u2_MPPI      =   MPPIParams.u2_MPPI[idx]
+    MPPIParams.est_delAccn  =   np.reshape(MPPIParams.est_delAccn, (-1, 3))[np.minimum(idx, len(MPPIParams.est_delAccn) - 1)]
+    MPPIParams.N            =   N
+    return MPPIParams
+
+#.. one (backend, precision, K, N) point - latency of every solve, then cost over repeated solves of the same state
+def Bench_MPPI_Config(listScenario, Backend='cpu', Precision='float64', K=256, N=50, numCalls=20, numIter=10):
+    solver      =   MPPI(Backend)
+    t_solve     =   []
+    listCost    =   []
+    for scenario in listScenario:
+        MPPIParams, GCUParams, WPs, Pos, Vn, AngEuler, Seed =   Set_Scenario(scenario, Precision)
+        MPPIParams.K    =   K
+        MPPIParams      =   Resize_Horizon(MPPIParams, N)
+        Index           =   PathIndex([WPs])
+        # warm up - first call compiles / allocates
+        solver.Guid_MPPI(GCUParams, WPs, Pos, Vn, AngEuler, Seed, MPPIParams, Index)
+        for i_c in range(numCalls):
+            t0          =   time.perf_counter()
+            solver.Guid_MPPI(GCUParams, WPs, Pos, Vn, AngEuler, Seed + i_c, MPPIParams, Index)
+            t_solve.append(time.perf_counter() - t0)
+
+        # cost convergence - the solved sequence is fed back without shifting, best & mean finite cost per iteration
+        cost        =   np.zeros((numIter, 2))
+        for i_i in range(numIter):
+            _, MPPIParams.u1_MPPI, MPPIParams.u2_MPPI   =   solver.Guid_MPPI(GCUParams, WPs, Pos, Vn, AngEuler, Seed + i_i, MPPIParams, Index)
+            stk         =   solver.Engine.Get_Cost()[0]
+            stk         =   stk[np.isfinite(stk)]
+            cost[i_i]   =   [np.min(stk), np.mean(stk)] if len(stk) > 0 else [np.nan, np.nan]
+        listCost.append(cost/cost[0])
+
+    t_solve     =   np.array(t_solve)
+    cost        =   np.nanmean(np.array(listCost), axis=0)
+    return {
+        'Backend'       :   type(solver.Engine).__name__,
+        'Precision'     :   Precision,
+        'K'             :   K,
+        'N'             :   N,
+        'numScenario'   :   len(listScenario),
+        'numCalls'      :   len(t_solve),
+        'latency_p50'   :   float(np.percentile(t_solve, 50)),
+        'latency_p99'   :   float(np.percentile(t_solve, 99)),
+        'latency_mean'  :   float(np.mean(t_solve)),
+        'rollouts_per_s':   float(K*len(t_solve)/np.sum(t_solve)),
+        'cost_min'      :   cost[:, 0].tolist(),
+        'cost_mean'     :   cost[:, 1].tolist(),
+    }
+
+#.. long path regression - solve latency with the vehicle at several points of a numWPs path against the designed path,
+#   & the distance to the path of K diverged (nan) & far samples (one rollout step) - fails if the long path is more than
+#   MaxRatio x slower or a query takes more than MaxQuery [s]
+def Check_LongPath(Backend='cpu', numWPs=5000, numCalls=10, MaxRatio=3., MaxQuery=0.05):
+    solver      =   MPPI(Backend)
+    K           =   solver.MPPIParams.K
+
+    def Latency(GCUParams, WPs, Pos, Vn, AngEuler):
+        Index       =   PathIndex([WPs])
+        solver.Guid_MPPI(GCUParams, WPs, Pos, Vn, AngEuler, 0, Index=Index)
+        t_solve     =   np.zeros(numCalls)
+        for i_c in range(numCalls):
+            t0          =   time.perf_counter()
+            solver.Guid_MPPI(GCUParams, WPs, Pos, Vn, AngEuler, i_c, Index=Index)
+            t_solve[i_c]    =   time.perf_counter() - t0
+        return float(np.percentile(t_solve, 50))
+
+    t_ref       =   Latency(*Scenario_Default())
+    t_long      =   [Latency(*Scenario_LongPath(numWPs, int(frac*(numWPs - 1)))) for frac in [0., 0.5, 0.9]]
+
+    _, WPs, Pos, _, _   =   Scenario_LongPath(numWPs, numWPs//2)
+    Index       =   PathIndex([WPs])
+    t_query     =   {}
+    for name, Posn in [('nan', np.full((K, 3), np.nan)), ('far', Pos + np.array([1e4, 1e4, 0.]) + np.zeros((K, 3)))]:
+        t0          =   time.perf_counter()
+        Index.Dist_ToPath(Posn, numWPs//2, 0, numWPs - 1)
+        t_query['dist_' + name]     =   time.perf_counter() - t0
+
+    return {
+        'Backend'       :   type(solver.Engine).__name__,
+        'numWPs'        :   numWPs,
+        'latency_ref'   :   t_ref,
+        'latency_long'  :   t_long,
+        'query'         :   t_query,
+        'pass'          :   bool(max(t_long) <= MaxRatio*t_ref and max(t_query.values()) <= MaxQuery),
+    }
+
+#.. sweep over backends ('cpu', 'cuda', 'cuda:float32', ...), K & N - unavailable backends are reported & skipped
+#   as is cpu in float32 (the cpu engine runs float64 for any Precision)
+def Bench_MPPI_Suite(listScenario, listBackend=['cpu'], listK=[256], listN=[50], numCalls=20, numIter=10):
+    results     =   []
+    for spec in listBackend:
+        Backend, _, Precision   =   spec.partition(':')
+        Precision   =   Precision or 'float64'
+        for K in listK:
+            for N in listN:
+                if Backend == 'cpu' and Precision != 'float64':
+                    results.append({'Backend': Backend, 'Precision': Precision, 'K': K, 'N': N, 'skipped': 'float32 is cuda only'})
+                    continue
+                try:
+                    res     =   Bench_MPPI_Config(listScenario, Backend, Precision, K, N, numCalls, numIter)
+                except Exception as e:
+                    res     =   {'Backend': Backend, 'Precision': Precision, 'K': K, 'N': N, 'skipped': repr(e)}
+                results.append(res)
+    return results
+
+def main(args=None):
+    parser  =   argparse.ArgumentParser(description='MPPI solve latency - cold vs. warm calls, or an offline sweep with --suite')
+    parser.add_argument('--backend', default='auto', choices=['auto', 'cuda', 'cpu'])
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--suite', action='store_true', help='sweep backends, K & N over recorded / synthetic scenarios')
+    parser.add_argument('--backends', nargs='+', default=['cpu', 'cuda', 'cuda:float32'], help='backend[:precision], e.g. cpu cuda cuda:float32 (float32 : cuda only)')
+    parser.add_argument('--K', nargs='+', type=int, default=[256])
+    parser.add_argument('--N', nargs='+', type=int, default=[50])
+    parser.add_argument('--iters', type=int, default=10, help='repeated solves per scenario for the cost convergence')
+    parser.add_argument('--scenarios', type=int, default=5, help='synthetic scenarios when no recording is given')
+    parser.add_argument('--record', nargs='*', default=[], help='.npz recordings from MPPI.Save_Record')
+    parser.add_argument('--json', default=None, help='write the results to this file')
+    parser.add_argument('--long-path', type=int, default=0, metavar='numWPs', help='regression check on a path of numWPs way points (e.g. 5000), exit code 1 on failure')
+    opts    =   parser.parse_args(args)
+
+    if opts.long_path > 0:
+        res     =   Check_LongPath(opts.backend, opts.long_path, opts.calls)
+        print("MPPI backend :", res['Backend'], ", way points :", res['numWPs'])
+        print("p50 solve time [ms] : designed path", round(res['latency_ref']*1000., 3), ", long path", [round(t*1000., 3) for t in res['latency_long']])
+        print("distance queries [ms] :", {name: round(t*1000., 3) for name, t in res['query'].items()})
+        print("long path check :", "pass" if res['pass'] else "FAIL")
+        results =   [res]
+    elif not opts.suite:
+        res     =   Bench_MPPI_Latency(opts.backend, opts.calls)
+        print("MPPI backend :", res['Backend'])
+        print("init. (compile) time [ms] :", round(res['init']*1000., 3))
+        print("cold call time [ms]       :", round(res['cold']*1000., 3))
+        print("warm call time [ms]       : mean", round(res['warm_mean']*1000., 3), \
+            ", p50", round(res['warm_p50']*1000., 3), ", max", round(res['warm_max']*1000., 3))
+        results =   [res]
+    else:
+        listScenario    =   []
+        for fileName in opts.record:
+            listScenario    =   listScenario + Load_Scenarios(fileName)
+        if len(listScenario) == 0:
+            listScenario    =   Scenarios_Default(opts.scenarios)
+
+        results =   Bench_MPPI_Suite(listScenario, opts.backends, opts.K, opts.N, opts.calls, opts.iters)
+        for res in results:
+            if 'skipped' in res:
+                print("%s:%s K %d N %d : skipped (%s)" % (res['Backend'], res['Precision'], res['K'], res['N'], res['skipped']))
+                continue
+            print("%s:%s K %d N %d : p50 %.3f ms, p99 %.3f ms, %.0f rollouts/s, best cost x%.3f after %d solves" % (res['Backend'], res['Precision'], \
+                res['K'], res['N'], res['latency_p50']*1000., res['latency_p99']*1000., res['rollouts_per_s'], res['cost_min'][-1], len(res['cost_min'])))
+
+    if opts.json is not None:
+        with open(opts.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(res.get('pass', True) for res in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
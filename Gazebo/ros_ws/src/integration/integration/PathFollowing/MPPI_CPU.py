@@ -0,0 +1,294 @@
+# pulbic libs.
+import numpy as np
+from math import pi
+
+# private libs.
+from .ParamsOffBoardCtrl import DataMPPI, DataGCU
+from .MPPI_RNG import Gen_Noise_Batch
+from .PathIndex import PathIndex
+
+#.. batched (K,3) helpers - same math as the __device__ functions of MPPI_CUDA
+def Norm3(vec):
+    return np.sqrt(vec[..., 0]*vec[..., 0] + vec[..., 1]*vec[..., 1] + vec[..., 2]*vec[..., 2])
+
+def Get_Vec2AzimElev(vec):
+    azim    =   np.arctan2(vec[..., 1], vec[..., 0])
+    elev    =   np.arctan2(-vec[..., 2], np.sqrt(vec[..., 0]*vec[..., 0] + vec[..., 1]*vec[..., 1]))
+    return azim, elev
+
+def Get_Euler2DCM(AngEuler):
+    spsi    =   np.sin(AngEuler[..., 2])
+    cpsi    =   np.cos(AngEuler[..., 2])
+    sthe    =   np.sin(AngEuler[..., 1])
+    cthe    =   np.cos(AngEuler[..., 1])
+    sphi    =   np.sin(AngEuler[..., 0])
+    cphi    =   np.cos(AngEuler[..., 0])
+
+    DCM             =   np.empty(AngEuler.shape + (3,))
+    DCM[..., 0, 0]  =   cpsi * cthe
+    DCM[..., 1, 0]  =   cpsi * sthe * sphi - spsi * cphi
+    DCM[..., 2, 0]  =   cpsi * sthe * cphi + spsi * sphi
+
+    DCM[..., 0, 1]  =   spsi * cthe
+    DCM[..., 1, 1]  =   spsi * sthe * sphi + cpsi * cphi
+    DCM[..., 2, 1]  =   spsi * sthe * cphi - cpsi * sphi
+
+    DCM[..., 0, 2]  =   -sthe
+    DCM[..., 1, 2]  =   cthe * sphi
+    DCM[..., 2, 2]  =   cthe * cphi
+    return DCM
+
+def Mul_Mat33Vec3(Mat, Vec):
+    return np.einsum('...ij,...j->...i', Mat, Vec)
+
+def Mul_Mat33TVec3(Mat, Vec):
+    return np.einsum('...ji,...j->...i', Mat, Vec)
+
+def GetAngleSndCosLaw(len1, len2, len3):
+    # no clamp, nan -> 0. as in the kernel
+    ang3    =   np.arccos((len1*len1 + len2*len2 - len3*len3)/(2*len1*len2))
+    return np.where(np.isnan(ang3), 0., ang3)
+
+#.. virtual target & way point functions - WP indices into the concatenated WPs, lastWP per sample
+def Calc_tgPos_direct(Posn, prevWPidx, WPs, lastWP, lookAheadDist, tgPosn, Index):
+    minval      =   0.00001
+    prevWP      =   WPs[prevWPidx]
+    nextWP      =   WPs[np.minimum(prevWPidx + 1, lastWP)]
+
+    # triangle lengths
+    vec3        =   nextWP - prevWP
+    len1        =   np.maximum(Norm3(prevWP - Posn), minval)
+    len2        =   np.maximum(Norm3(nextWP - Posn), minval)
+    len3        =   np.maximum(Norm3(vec3), minval)
+    ang2        =   GetAngleSndCosLaw(len1, len3, len2)
+    ang1        =   GetAngleSndCosLaw(len2, len3, len1)
+
+    # distance to path & closest position on path
+    dist        =   len1*np.sin(ang2)
+    cosangle    =   np.maximum(0., np.cos(ang2))
+    closestPos  =   prevWP + vec3/len3[:, None]*(len1*cosangle)[:, None]
+    flag2       =   ang2 > 0.5*pi
+    dist        =   np.where(flag2, len1, dist)
+    closestPos  =   np.where(flag2[:, None], prevWP, closestPos)
+    flag1       =   ang1 > 0.5*pi
+    dist        =   np.where(flag1, len2, dist)
+    closestPos  =   np.where(flag1[:, None], nextWP, closestPos)
+
+    # target position - arc length search along the path index
+    return Index.LookAhead(prevWPidx, closestPos, dist, lookAheadDist, lastWP, tgPosn)
+
+#.. distance to the path - segments around the nearest way point of a backward scan from prevWPidx
+def Calc_dist2Path(Posn, prevWPidx, Index, firstWP, lastWP):
+    return Index.Dist_ToPath(Posn, prevWPidx, firstWP, lastWP)
+
+#.. min-cost normalized softmax weights over the last axis, diverged (non-finite) samples get zero weight
+def Calc_Weights(stk, lamb):
+    flagFinite  =   np.isfinite(stk)
+    minCost     =   np.min(np.where(flagFinite, stk, np.inf), axis=-1, keepdims=True)
+    minCost     =   np.where(np.isfinite(minCost), minCost, 0.)
+    return np.where(flagFinite, np.exp(-(np.where(flagFinite, stk, minCost) - minCost)/lamb), 0.)
+
+#.. weighted perturbations per step - same reduction as the Weighting kernel, stk (...,K) & delta_u (...,N,K)
+def Calc_WeightedUpdate(stk, delta_u, lamb):
+    w           =   Calc_Weights(stk, lamb)
+    den         =   np.sum(w, axis=-1)[..., None]
+    num         =   np.einsum('...nk,...k->...n', delta_u, w)
+    return np.where(den > 0., num/np.where(den > 0., den, 1.), 0.)
+
+#.. vectorized rollout engine - all V*K samples as one batch
+#   float64 only - MPPIParams.Precision applies to MPPI_CUDA
+class MPPI_CPU():
+    def __init__(self) -> None:
+        self.stk    =   None
+        self.noise  =   None
+        pass
+
+    #.. single vehicle
+    def Rollout(self, MPPIParams:DataMPPI, GCUParams:DataGCU, WPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, Seed, Stream=0, Index=None):
+        du1, du2    =   self.Rollout_Batch(MPPIParams, [GCUParams], [WPs], [Pos], [Vn], [AngEuler], [u1_MPPI], [u2_MPPI], Seed, Stream, Index)
+        return du1[0], du2[0]
+
+    #.. V vehicles in one pass - states (V,3), controls (V,N), one GCUParams & WP list per vehicle
+    #   Index : PathIndex of listWPs built when the path changed (None : built for this call)
+    def Rollout_Batch(self, MPPIParams:DataMPPI, listGCUParams, listWPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, Seed, Stream=0, Index=None):
+        # perturbations - same seeded stream as the Noise kernel, generated as one batch
+        V                   =   len(listGCUParams)
+        delta_u1, delta_u2  =   Gen_Noise_Batch(Seed, V, MPPIParams.N, MPPIParams.K, MPPIParams.var1, MPPIParams.var2, Stream)
+
+        with np.errstate(all='ignore'):
+            stk         =   self.Calc_stk(MPPIParams, listGCUParams, listWPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, delta_u1, delta_u2, Index)
+
+            # weighting & reduction
+            du1         =   Calc_WeightedUpdate(stk, delta_u1, MPPIParams.lamb1)
+            du2         =   Calc_WeightedUpdate(stk, delta_u2, MPPIParams.lamb2)
+
+        self.stk    =   stk
+        self.noise  =   (delta_u1, delta_u2)
+        return du1, du2
+
+    def Get_Cost(self):
+        # sample costs (V,K) of the last rollout
+        return self.stk.copy()
+
+    def Get_Noise(self):
+        # perturbations (V,N,K) of the last rollout
+        return self.noise[0].copy(), self.noise[1].copy()
+
+    def Calc_stk(self, MPPIParams:DataMPPI, listGCUParams, listWPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, delta_u1, delta_u2, Index=None):
+        # MPPI params.
+        V               =   len(listGCUParams)
+        K               =   MPPIParams.K
+        N               =   MPPIParams.N
+        M               =   V*K
+        dt              =   MPPIParams.dt_MPPI
+
+        # way points - concatenated path index, first & last WP index per sample
+        if Index is None:
+            Index       =   PathIndex(listWPs)
+        WPs             =   Index.WPs
+        firstWP         =   np.repeat(Index.firstWP, K)
+        lastWP          =   np.repeat(Index.lastWP, K)
+
+        # model & scenario params - one value per sample
+        def Param(name):
+            return np.repeat(np.array([getattr(GCUParams, name) for GCUParams in listGCUParams], dtype=np.float64), K, axis=0)
+        Kgain_PG        =   Param('Kgain_guidPursuit')
+        tau_control     =   Param('tau_control')
+        Mass            =   Param('Mass')
+        throttle_Hover  =   Param('throttle_Hover')
+        g0              =   Param('g0')
+        AccLim          =   Param('AccLim')
+        Kp              =   Param('Kp_vel')
+        Ki              =   Param('Ki_vel')
+        Kd              =   Param('Kd_vel')
+        CD0_md          =   Param('CD_model')
+        Sref            =   Param('Sref')
+        rho             =   Param('rho')
+        W1              =   Param('W1_cost')
+        W2              =   Param('W2_cost')
+
+        # init. states
+        Posn            =   np.repeat(np.reshape(Pos, (V, 3)).astype(np.float64), K, axis=0)
+        Vn              =   np.repeat(np.reshape(Vn, (V, 3)).astype(np.float64), K, axis=0)
+        AngEuler        =   np.repeat(np.reshape(AngEuler, (V, 3)).astype(np.float64), K, axis=0)
+        cI_B            =   Get_Euler2DCM(AngEuler)
+        Vb              =   Mul_Mat33Vec3(cI_B, Vn)
+        prevWPidx       =   firstWP + Param('prevWPidx').astype(np.int64)
+        tgPosn          =   np.zeros((M, 3))
+        int_err_spd     =   np.zeros(M)
+        prev_err_spd    =   np.zeros(M)
+        stk             =   np.zeros(M)
+        active          =   np.ones(M, dtype=bool)
+        u1_MPPI         =   np.reshape(u1_MPPI, (V, N))
+        u2_MPPI         =   np.reshape(u2_MPPI, (V, N))
+
+        # main loop
+        for i_n in range(N):
+        #.. MPPI input
+            desSpd          =   (u1_MPPI[:, i_n, None] + delta_u1[:, i_n]).ravel()
+            lookAheadDist   =   (u2_MPPI[:, i_n, None] + delta_u2[:, i_n]).ravel()
+            reachDist       =   lookAheadDist
+
+        #.. Target info
+            tgPosn          =   Calc_tgPos_direct(Posn, prevWPidx, WPs, lastWP, lookAheadDist, tgPosn, Index)
+
+        #.. Kinematics
+            relPosn             =   tgPosn - Posn
+            LOSazim, LOSelev    =   Get_Vec2AzimElev(relPosn)
+            relDist             =   np.maximum(Norm3(relPosn), 0.001)
+            tgo                 =   relDist / np.maximum(Norm3(Vn), 0.1)
+
+        #.. Check way points
+            nextWP          =   WPs[np.minimum(prevWPidx + 1, lastWP)]
+            flagReach       =   active & (reachDist >= Norm3(nextWP - Posn))
+            prevWPidx       =   prevWPidx + flagReach
+            active          =   active & (prevWPidx != lastWP)        # WP ends
+            if not active.any():
+                break
+
+        #.. PS guidance
+            psi, gam        =   Get_Vec2AzimElev(Vn)
+            err_psi         =   LOSazim - psi
+            err_gam         =   LOSelev - gam
+            err_psi         =   np.arctan2(np.sin(err_psi), np.cos(err_psi))
+            err_gam         =   np.arctan2(np.sin(err_gam), np.cos(err_gam))
+            Spd             =   Norm3(Vn)
+            AccCmdw         =   np.zeros((M, 3))
+            AccCmdw[:, 1]   =   np.clip(Kgain_PG * Spd * err_psi/tgo * np.cos(gam), -AccLim, AccLim)
+            AccCmdw[:, 2]   =   np.clip(- Kgain_PG * Spd * err_gam/tgo, -AccLim, AccLim)
+
+        #.. Speed Controller
+            desSpd_weight   =   0.5
+            desSpd_min      =   desSpd * 0.5
+            magAccCmdLat    =   Norm3(AccCmdw)
+            desSpd_penalty  =   np.maximum(desSpd - desSpd_weight*magAccCmdLat, desSpd_min)
+            err_spd         =   desSpd_penalty - Spd
+            int_err_new     =   int_err_spd + err_spd * dt
+            derr_spd        =   np.where(prev_err_spd != 0., (err_spd - prev_err_spd)/dt, 0.)
+            AccCmdw[:, 0]   =   Kp * err_spd + Ki * int_err_new + Kd * derr_spd
+            int_err_spd     =   np.where(active, int_err_new, int_err_spd)
+            prev_err_spd    =   np.where(active, err_spd, prev_err_spd)
+
+        #.. Calc. AccCmdn
+            angI2W          =   np.stack([np.zeros(M), -gam, psi], axis=1)
+            cI_W            =   Get_Euler2DCM(angI2W)
+            AccCmdn         =   Mul_Mat33TVec3(cI_W, AccCmdw)
+
+            qbar            =   0.5 * rho * Spd * Spd
+            AccAdy_n        =   cI_W[:, 0, :] * (-qbar*Sref*CD0_md / Mass)[:, None]
+            AccAdy_b        =   Mul_Mat33Vec3(cI_B, AccAdy_n)
+            Fady_b          =   AccAdy_b * Mass[:, None]
+
+        #.. AccCmdn all & limit
+            AccCmdn_w_tot   =   np.clip(AccCmdn - AccAdy_n, -AccLim[:, None], AccLim[:, None])
+
+        #.. AccCmd to Attitude Control Cmd.
+            totalAccCmdn        =   AccCmdn_w_tot.copy()
+            totalAccCmdn[:, 2]  =   totalAccCmdn[:, 2] - g0
+            magAccCmd           =   Norm3(totalAccCmdn)
+            cpsi, spsi          =   np.cos(LOSazim), np.sin(LOSazim)
+            AccCmdn_R3_x        =   cpsi*totalAccCmdn[:, 0] + spsi*totalAccCmdn[:, 1]
+            AccCmdn_R3_y        =   -spsi*totalAccCmdn[:, 0] + cpsi*totalAccCmdn[:, 1]
+            phi                 =   np.arcsin(AccCmdn_R3_y/magAccCmd)
+            theta               =   np.arcsin(-AccCmdn_R3_x/np.cos(phi)/magAccCmd)
+            AngEuler_Cmd        =   np.stack([phi, theta, LOSazim], axis=1)
+            ThrottleCmd         =   np.minimum(magAccCmd/g0*throttle_Hover, 1.)
+            Fcmd_b              =   np.zeros((M, 3))
+            Fcmd_b[:, 2]        =   -ThrottleCmd / throttle_Hover * g0 * Mass
+
+        #.. Yaw continuity
+            AngEuler_Cmd[:, 2]  =   np.where(AngEuler[:, 2] - AngEuler_Cmd[:, 2] < -200. / 57.3, AngEuler_Cmd[:, 2] - 2*pi, AngEuler_Cmd[:, 2])
+            AngEuler_Cmd[:, 2]  =   np.where(AngEuler[:, 2] - AngEuler_Cmd[:, 2] > 200. / 57.3, AngEuler_Cmd[:, 2] + 2*pi, AngEuler_Cmd[:, 2])
+
+        #.. Dynamics_p6dof
+            Fb_tot          =   Fady_b + Fcmd_b
+            accb            =   Fb_tot / Mass[:, None]
+            gb              =   cI_B[:, :, 2] * g0[:, None]
+            dot_AngEuler    =   (AngEuler_Cmd - AngEuler) / tau_control
+            sphi, cphi      =   np.sin(AngEuler[:, 0]), np.cos(AngEuler[:, 0])
+            sthe, cthe      =   np.sin(AngEuler[:, 1]), np.cos(AngEuler[:, 1])
+            Wb              =   np.stack([
+                dot_AngEuler[:, 0] - sthe*dot_AngEuler[:, 2],
+                cphi*dot_AngEuler[:, 1] + sphi*cthe*dot_AngEuler[:, 2],
+                -sphi*dot_AngEuler[:, 1] + cphi*cthe*dot_AngEuler[:, 2]], axis=1)
+            dot_Vb          =   -np.cross(Wb, Vb) + gb + accb
+            dot_Posn        =   Mul_Mat33TVec3(cI_B, Vb)
+
+        #.. integration - euler
+            AngEuler_new    =   AngEuler + dot_AngEuler * dt
+            AngEuler_new    =   np.arctan2(np.sin(AngEuler_new), np.cos(AngEuler_new))
+            Vb              =   np.where(active[:, None], Vb + dot_Vb * dt, Vb)
+            AngEuler        =   np.where(active[:, None], AngEuler_new, AngEuler)
+            Posn            =   np.where(active[:, None], Posn + dot_Posn * dt, Posn)
+            cI_B            =   Get_Euler2DCM(AngEuler)
+            Vn              =   Mul_Mat33TVec3(cI_B, Vb)
+
+        #.. calc. cost
+            dist2Path       =   Calc_dist2Path(Posn, prevWPidx, Index, firstWP, lastWP)
+            c_d2p           =   dist2Path * dist2Path
+            ThrustCmd       =   Norm3(Fb_tot) * throttle_Hover / (Mass * g0)
+            c_ctrl_e        =   ThrustCmd*ThrustCmd
+            c_Spd           =   1/np.maximum(Spd, 0.1)
+            stk             =   np.where(active, stk + W1*c_d2p + W2*c_ctrl_e*c_Spd, stk)
+
+        return stk.reshape(V, K)
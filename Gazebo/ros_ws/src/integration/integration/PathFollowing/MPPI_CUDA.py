@@ -0,0 +1,1047 @@
+# pulbic libs.
+import re
+import math as m
+import numpy as np
+import atexit
+import pycuda.driver as cuda
+from pycuda.compiler import SourceModule
+
+# private libs.
+from .ParamsOffBoardCtrl import DataMPPI, DataGCU
+from .MPPI_RNG import Split_Seed
+from .PathIndex import PathIndex
+
+#.. MPPI rollout kernel - one thread per (sample, vehicle)
+KernelMainCuda  =   """
+// calculation functions
+__device__ void GetAngleSndCosLaw(double len1, double len2, double len3, double *ang3);
+__device__ void GetEuclideanNorm(double vec[3], double *res);
+__device__ void Get_Vec2AzimElev(double vec[3], double *azim, double *elev);
+__device__ void Get_Euler2DCM(double AngEuler[3], double DCM[3][3]);
+__device__ void Get_invDCM(double DCM_in[3][3], double DCM_out[3][3]);
+__device__ void Mul_Mat33Vec3(double Mat[3][3], double Vec_in[3], double Vec_out[3]);
+__device__ void VecCross(double x[3], double y[3], double res[3]);
+__device__ void Get_invM33(double M33[3][3], double invM33[3][3]);
+
+// virtual targets & way point functions
+__device__ void CheckWayPoint(double Posn[3], int *prevWPidx, double *arrWPsNED, int numWPs, double reachDist, int *check);
+__device__ void Calc_tgPos_direct(double Posn[3], int prevWPidx, double *arrWPsNED, double *arrPathS, int numWPs, double lookAheadDist, double tgPosn[3]);
+__device__ void Seg_Closest(double Posn[3], double *arrWPsNED, int seg, double closest[3], double *dist);
+__device__ void Calc_dist2Path(double Posn[3], int prevWPidx, double *arrWPsNED, int numWPs, double *dist);
+
+// quadrotor module functions
+__device__ void Kinematics(double tgPosn[3], double tgVn[3], double Posn[3], double Vn[3], double *LOSazim, double *LOSelev, double dLOSvec[3], double *relDist, double *tgo);
+__device__ void Guid_pursuit(double Kgain_PG, double tgo, double LOSazim, double LOSelev, double Vn[3], double AccLim, double AccCmdw[3]);
+__device__ void SpdCtrller(double Kp, double Ki, double Kd, double *int_err_spd, double *prev_err_spd, double dt, double Vn[3], double desSpd, double *AccCmdXw);
+__device__ void AccCmdToCtrlCmd(double AccCmdn[3], double psi_FPA, double throttle_Hover, double mass, double g, double AngEuler_Cmd[3], double Fcmd_b[3]);
+__device__ void Dynamics_p6dof(double Fb_tot[3], double g0, double tau_ctrl[3], double AngEuler_Cmd[3], double AngEuler[3], double Vb[3], double cI_B[3][3], double Mass, double dot_AngEuler[3], double dot_Vb[3], double dot_Posn[3]);
+__device__ void Integration_Euler(double Vb[3], double AngEuler[3], double Pos[3], double dot_Vb[3], double dot_AngEuler[3], double dot_Pos[3], double dt);
+
+// main function
+__global__ void mainCuda(int* arr_intMPPI, double* arr_u1_MPPI, double* arr_delta_u1, double* arr_u2_MPPI, double* arr_delta_u2, double* arr_stk, double *arr_delAccn, int* arrWPParams, double *arrWPsNED, double *arrDistParams, double *arrModelParams, double *arrInitStates, \
+    double *arrPathS)
+{
+    double pi   =   acos(-1.);
+
+    // parallel GPU core index - sample (x), vehicle (y)
+    int idx     =   threadIdx.x + blockIdx.x*blockDim.x;
+    int i_v     =   blockIdx.y;
+    
+    // MPPI params.
+    int K               =   arr_intMPPI[0];
+    int N               =   arr_intMPPI[1];
+    if(idx >= K) return;
+
+    // vehicle slices - WP params are (prevWPidx, numWPs, WP offset) per vehicle
+    arr_u1_MPPI     +=  i_v*N;
+    arr_u2_MPPI     +=  i_v*N;
+    arr_delta_u1    +=  i_v*N*K;
+    arr_delta_u2    +=  i_v*N*K;
+    arr_stk         +=  i_v*K;
+    arr_delAccn     +=  i_v*N*3;
+    arrWPParams     +=  i_v*3;
+    int WPoffset    =   arrWPParams[2];
+    arrWPsNED       +=  WPoffset*3;
+    arrPathS        +=  WPoffset;
+    arrDistParams   +=  i_v*2;
+    arrModelParams  +=  i_v*18;
+    arrInitStates   +=  i_v*9;
+
+    // way points
+    double reachDist    =   arrDistParams[0];
+    int prevWPidx       =   arrWPParams[0];
+    int numWPs          =   arrWPParams[1];
+    
+    // virtual target
+    double lookAheadDist=   arrDistParams[1];
+    double tgPosn[3]    =   { 0., };
+    double tgVn[3]      =   { 0., };
+
+    // GCU params
+    double desSpd       =   arrModelParams[1];
+    double Kgain_PG     =   arrModelParams[2];
+    double tau_control[3]   =   {arrModelParams[3], arrModelParams[4], arrModelParams[5]};
+    double Mass         =   arrModelParams[6];
+    double throttle_Hover   =   arrModelParams[7];
+    double g0           =   arrModelParams[8];
+    double AccLim       =   arrModelParams[9];
+    double Kp           =   arrModelParams[10];
+    double Ki           =   arrModelParams[11];
+    double Kd           =   arrModelParams[12];
+    double CD0_md       =   arrModelParams[13];
+    double Sref         =   arrModelParams[14];
+    double rho          =   arrModelParams[15];
+    double W1           =   arrModelParams[16];
+    double W2           =   arrModelParams[17];
+
+    // init. states
+    double Posn[3]      =   {arrInitStates[0], arrInitStates[1], arrInitStates[2]};
+    double Vn[3]        =   {arrInitStates[3], arrInitStates[4], arrInitStates[5]};
+    double AngEuler[3]      =   {arrInitStates[6], arrInitStates[7], arrInitStates[8]};
+    double cI_B[3][3]   =   { 0., };
+    Get_Euler2DCM(AngEuler, cI_B);
+    double Vb[3]        =   { 0., } ;
+    Mul_Mat33Vec3(cI_B, Vn, Vb);
+    double cB_I[3][3]   =   { 0., };
+    Get_invDCM(cI_B, cB_I);
+
+    // main loop
+    double dt           =   arrModelParams[0];
+    double int_err_spd  =   0.;
+    double prev_err_spd =   0.;
+    for(int i_n = 0; i_n < N; i_n++)
+    {
+    //.. MPPI input
+        //Kgain_PG            =   arr_u1_MPPI[i_n] + arr_delta_u1[idx + K*i_n];
+        desSpd              =   arr_u1_MPPI[i_n] + arr_delta_u1[idx + K*i_n];
+        lookAheadDist       =   arr_u2_MPPI[i_n] + arr_delta_u2[idx + K*i_n];
+        reachDist           =   lookAheadDist;
+
+    //.. Target info
+        Calc_tgPos_direct(Posn, prevWPidx, arrWPsNED, arrPathS, numWPs, lookAheadDist, tgPosn);
+
+    //.. Kinematics
+        double LOSazim      =   0.;
+        double LOSelev      =   0.;
+        double dLOSvec[3]   =   {0.,};
+        double relDist      =   0.;
+        double tgo          =   0.;
+        Kinematics(tgPosn, tgVn, Posn, Vn, &LOSazim, &LOSelev, dLOSvec, &relDist, &tgo);
+
+    //.. Check way points
+        int checkWP =   0;
+        CheckWayPoint(Posn, &prevWPidx, arrWPsNED, numWPs, reachDist, &checkWP);
+        if(checkWP == 2)   //  WP ends
+        {
+            break;
+        }
+        
+    //.. PS guidance
+        double AccCmdw[3]   =   { 0., };
+        Guid_pursuit(Kgain_PG, tgo, LOSazim, LOSelev, Vn, AccLim, AccCmdw);
+        
+    //.. MPPI guidance
+        //double accCmdYw     =   arr_u1_MPPI[i_n] + arr_delta_u1[idx + K*i_n];
+        //double accCmdZw     =   arr_u2_MPPI[i_n] + arr_delta_u2[idx + K*i_n];
+        
+    // Speed Controller
+        // temp. params
+        double desSpd_weight    =   0.5;
+        double desSpd_min       =   desSpd * 0.5;
+
+        double magAccCmdLat     =   0.;
+        GetEuclideanNorm(AccCmdw, &magAccCmdLat);
+        double desSpd_penalty  =   max(desSpd - desSpd_weight*magAccCmdLat, desSpd_min);
+        double AccCmdXw     =   0.;
+        SpdCtrller(Kp, Ki, Kd, &int_err_spd, &prev_err_spd, dt, Vn, desSpd_penalty, &AccCmdXw);
+        AccCmdw[0]          =   AccCmdXw;
+
+    //.. Calc. AccCmdn
+        double psi          =   0;
+        double gam          =   0;
+        Get_Vec2AzimElev(Vn, &psi, &gam);
+        double angI2W[3]    =   { 0., -gam, psi };
+        double cI_W[3][3]   =   { 0., };
+        double cW_I[3][3]   =   { 0., };
+        Get_Euler2DCM(angI2W, cI_W);
+        Get_invDCM(cI_W, cW_I);
+        double AccCmdn[3]   =   { 0., };
+        Mul_Mat33Vec3(cW_I, AccCmdw, AccCmdn);
+
+        // temp. params.
+        double Spd      =   0.;            
+        GetEuclideanNorm(Vn, &Spd);
+        double qbar     =   0.5 * rho * Spd * Spd;
+        double AccAdy_w[3]  =   { -qbar*Sref*CD0_md / Mass, 0., 0. };
+        double AccAdy_n[3]  =   { 0., };
+        double AccAdy_b[3]  =   { 0., };
+        Mul_Mat33Vec3(cW_I, AccAdy_w, AccAdy_n);            
+        Mul_Mat33Vec3(cI_B, AccAdy_n, AccAdy_b);
+        double Fady_b[3]    =   {AccAdy_b[0] * Mass, AccAdy_b[1] * Mass, AccAdy_b[2] * Mass};
+
+    //.. AccCmdn all
+        double AccCmdn_w_tot[3]  =   { 0., };
+        for(int i_a = 0; i_a < 3; i_a++)
+        {
+            AccCmdn_w_tot[i_a]  =   AccCmdn[i_a] - AccAdy_n[i_a];
+        }
+    //.. limit
+        for(int i =0; i<3; i++)
+        {
+            AccCmdn_w_tot[i]    =   min(AccCmdn_w_tot[i], AccLim);
+            AccCmdn_w_tot[i]    =   max(AccCmdn_w_tot[i], -AccLim);
+        }
+
+
+    //.. AccCmd to Attitude Control Cmd.
+        double AngEuler_Cmd[3]  =   { 0., };
+        double Fcmd_b[3]        =   {0.,};
+        AccCmdToCtrlCmd(AccCmdn_w_tot, LOSazim, throttle_Hover, Mass, g0, AngEuler_Cmd, Fcmd_b);
+
+    //.. Yaw continuity
+        if(AngEuler[2] - AngEuler_Cmd[2] < -200. / 57.3)
+        {
+            AngEuler_Cmd[2] = AngEuler_Cmd[2] - 2*pi;
+        }
+        if(AngEuler[2] - AngEuler_Cmd[2] > 200. / 57.3)
+        {
+            AngEuler_Cmd[2] = AngEuler_Cmd[2] + 2*pi;
+        }
+
+    //.. Dynamics
+        
+        double Fb_tot[3]    =   { Fady_b[0] + Fcmd_b[0], Fady_b[1] + Fcmd_b[1], Fady_b[2] + Fcmd_b[2] };
+        double dot_AngEuler[3]  =   { 0., };
+        double dot_Vb[3]    =   { 0., };
+        double dot_Posn[3]  =   { 0., };
+
+        Dynamics_p6dof(Fb_tot, g0, tau_control, AngEuler_Cmd, AngEuler, Vb, cI_B, Mass, dot_AngEuler, dot_Vb, dot_Posn);
+
+        double accb[3]      =   { Fb_tot[0]/Mass, Fb_tot[1]/Mass, Fb_tot[2]/Mass };
+        double acci[3]    =   { 0., };
+        Mul_Mat33Vec3(cB_I, accb, acci);
+        double accw[3]    =   { 0., };
+        Mul_Mat33Vec3(cI_W, acci, accw);
+
+    //.. integration - euler
+        Integration_Euler(Vb, AngEuler, Posn, dot_Vb, dot_AngEuler, dot_Posn, dt);
+        Get_Euler2DCM(AngEuler, cI_B);
+        double cB_I[3][3]   =   { 0., };
+        double Vn_new[3]    =   { 0., };
+        Get_invDCM(cI_B, cB_I);
+        Mul_Mat33Vec3(cB_I, Vb, Vn_new);
+        for(int i_v = 0; i_v < 3; i_v++)
+        {
+            Vn[i_v] = Vn_new[i_v];
+        }
+
+    //.. calc. cost
+        double HE1 =   LOSazim - AngEuler[2];
+        HE1    =   abs(atan2(sin(HE1),cos(HE1)));
+        double HE2 =   LOSelev - AngEuler[1];
+        HE2    =   abs(atan2(sin(HE2),cos(HE2)));
+
+    //.. calc. dist. 2 path - segments around the nearest way point of a backward scan from prevWPidx
+        double dist2Path    =   0.;
+        Calc_dist2Path(Posn, prevWPidx, arrWPsNED, numWPs, &dist2Path);
+        
+        //double c_d2p        =   max(0., dist2Path - 0.1);
+        double c_d2p        =   dist2Path * dist2Path;
+                
+        double totalFbCmd   =   0.;
+        GetEuclideanNorm(Fb_tot, &totalFbCmd);
+        double ThrustHover  =   throttle_Hover / (Mass * g0); 
+        double ThrustCmd    =   totalFbCmd * ThrustHover;
+        double c_ctrl_e     =   ThrustCmd*ThrustCmd;
+        double c_Spd        =   1/max(Spd, 0.1);
+        arr_stk[idx]        =   arr_stk[idx] + W1*c_d2p + W2*c_ctrl_e*c_Spd;
+    }
+}
+
+// calculation functions
+__device__ void GetAngleSndCosLaw(double len1, double len2, double len3, double *ang3)
+{
+    double cosAng3  =   (len1*len1+len2*len2-len3*len3)/(2*len1*len2);
+    ang3[0]         =   acos(cosAng3);
+}
+__device__ void GetEuclideanNorm(double vec[3], double *res)
+{
+    double temp     =   0;
+    for(int i = 0; i < 3; i++)
+    {
+        temp    =   temp + vec[i]*vec[i];
+    }
+    res[0]  =   sqrt(temp);
+}
+__device__ void Get_Vec2AzimElev(double vec[3], double *azim, double *elev)
+{
+    azim[0]     =   atan2(vec[1], vec[0]);
+    double len  =   sqrt(vec[0]*vec[0] + vec[1]*vec[1]);
+    elev[0]     =   atan2(-vec[2], len);
+}
+__device__ void Get_Euler2DCM(double AngEuler[3], double DCM[3][3])
+{
+    double spsi     =   sin( AngEuler[2] );
+    double cpsi     =   cos( AngEuler[2] );
+    double sthe     =   sin( AngEuler[1] );
+    double cthe     =   cos( AngEuler[1] );
+    double sphi     =   sin( AngEuler[0] );
+    double cphi     =   cos( AngEuler[0] );
+
+    DCM[0][0]       =   cpsi * cthe ;
+    DCM[1][0]       =   cpsi * sthe * sphi - spsi * cphi ;
+    DCM[2][0]       =   cpsi * sthe * cphi + spsi * sphi ;
+    
+    DCM[0][1]       =   spsi * cthe ;
+    DCM[1][1]       =   spsi * sthe * sphi + cpsi * cphi ;
+    DCM[2][1]       =   spsi * sthe * cphi - cpsi * sphi ;
+    
+    DCM[0][2]       =   -sthe ;
+    DCM[1][2]       =   cthe * sphi ;
+    DCM[2][2]       =   cthe * cphi ;
+}
+__device__ void Get_invDCM(double DCM_in[3][3], double DCM_out[3][3])
+{
+    DCM_out[0][0]   =   DCM_in[0][0];
+    DCM_out[0][1]   =   DCM_in[1][0];
+    DCM_out[0][2]   =   DCM_in[2][0];
+    DCM_out[1][0]   =   DCM_in[0][1];
+    DCM_out[1][1]   =   DCM_in[1][1];
+    DCM_out[1][2]   =   DCM_in[2][1];
+    DCM_out[2][0]   =   DCM_in[0][2];
+    DCM_out[2][1]   =   DCM_in[1][2];
+    DCM_out[2][2]   =   DCM_in[2][2];
+}
+__device__ void Mul_Mat33Vec3(double Mat[3][3], double Vec_in[3], double Vec_out[3])
+{
+    for(int i_r = 0; i_r < 3; i_r++)
+    {
+        for(int i_c = 0; i_c < 3; i_c ++)
+        {
+            Vec_out[i_r]    =   Vec_out[i_r] + Mat[i_r][i_c]*Vec_in[i_c];
+        }
+    }
+}
+__device__ void VecCross(double x[3], double y[3], double res[3])
+{
+    res[0] = x[1] * y[2] - x[2] * y[1];
+    res[1] = -(x[0] * y[2] - x[2] * y[0]);
+    res[2] = x[0] * y[1] - x[1] * y[0];
+}
+__device__ void Get_invM33(double M33[3][3], double invM33[3][3])
+{
+//..3x3 Matrix Inverse
+    double det_M33 = 0.;
+    det_M33 = det_M33 + M33[0][0] * M33[1][1] * M33[2][2];
+    det_M33 = det_M33 + M33[0][1] * M33[1][2] * M33[2][0];
+    det_M33 = det_M33 + M33[0][2] * M33[1][0] * M33[2][1];
+    det_M33 = det_M33 - M33[0][0] * M33[1][2] * M33[2][1];
+    det_M33 = det_M33 - M33[0][1] * M33[1][0] * M33[2][2];
+    det_M33 = det_M33 - M33[0][2] * M33[1][1] * M33[2][0];
+    // coding rule
+    if (fabs(det_M33) < 1e-308)
+    {
+        det_M33 = 1e-308;
+    }
+    else
+    {
+        // coding rule
+    }
+    invM33[0][0] = (M33[1][1] * M33[2][2] - M33[1][2] * M33[2][1]) / det_M33;
+    invM33[0][1] = (M33[2][1] * M33[0][2] - M33[2][2] * M33[0][1]) / det_M33;
+    invM33[0][2] = (M33[0][1] * M33[1][2] - M33[0][2] * M33[1][1]) / det_M33;
+    invM33[1][0] = (M33[1][2] * M33[2][0] - M33[1][0] * M33[2][2]) / det_M33;
+    invM33[1][1] = (M33[2][2] * M33[0][0] - M33[2][0] * M33[0][2]) / det_M33;
+    invM33[1][2] = (M33[0][2] * M33[1][0] - M33[0][0] * M33[1][2]) / det_M33;
+    invM33[2][0] = (M33[1][0] * M33[2][1] - M33[1][1] * M33[2][0]) / det_M33;
+    invM33[2][1] = (M33[2][0] * M33[0][1] - M33[0][0] * M33[2][1]) / det_M33;
+    invM33[2][2] = (M33[0][0] * M33[1][1] - M33[0][1] * M33[1][0]) / det_M33;
+}
+// virtual targets & way points functions
+__device__ void CheckWayPoint(double Posn[3], int *prevWPidx, double *arrWPsNED, int numWPs, double reachDist, int *check)
+{
+    // get ext WP
+    double nextWP[3]    =   {0.,};
+    for(int i = 0; i < 3; i++)
+    {
+        nextWP[i]   =   arrWPsNED[prevWPidx[0]*3 + i + 3];
+    }
+
+    // get distance to next WP
+    double relPosToNextWP[3]=   {nextWP[0] - Posn[0], nextWP[1] - Posn[1], nextWP[2] - Posn[2]};
+    double distToNextWP     =   0.;
+    GetEuclideanNorm(relPosToNextWP, &distToNextWP);
+
+    // check way point, 0 : nothing changes, 1 : wp changes, 2 : wp ends
+    check[0]    =   0;
+    if(reachDist >= distToNextWP)
+    {
+        prevWPidx[0]   =   prevWPidx[0] + 1;
+        check[0]    =   1;
+    }
+    if(prevWPidx[0] == numWPs - 1)
+    {
+        check[0]    =   2;
+    }
+}
+__device__ void Seg_Closest(double Posn[3], double *arrWPsNED, int seg, double closest[3], double *dist)
+{
+    // projection onto segment seg, clamped to its end points
+    double vec[3]   =   { 0., };
+    double len2     =   0.;
+    double dotRel   =   0.;
+    for(int i = 0; i < 3; i++)
+    {
+        vec[i]  =   arrWPsNED[seg*3 + i + 3] - arrWPsNED[seg*3 + i];
+        len2    =   len2 + vec[i]*vec[i];
+        dotRel  =   dotRel + (Posn[i] - arrWPsNED[seg*3 + i])*vec[i];
+    }
+    double t        =   (len2 > 0.) ? min(max(dotRel/len2, 0.), 1.) : 0.;
+    double diff[3]  =   { 0., };
+    for(int i = 0; i < 3; i++)
+    {
+        closest[i]  =   arrWPsNED[seg*3 + i] + t*vec[i];
+        diff[i]     =   Posn[i] - closest[i];
+    }
+    GetEuclideanNorm(diff, dist);
+}
+__device__ void Calc_dist2Path(double Posn[3], int prevWPidx, double *arrWPsNED, int numWPs, double *dist)
+{
+    double closest[3]   =   { 0., };
+    if(!(isfinite(Posn[0]) && isfinite(Posn[1]) && isfinite(Posn[2])))
+    {
+        // diverged sample - dropped by the weighting, no scan
+        dist[0]     =   Posn[0] + Posn[1] + Posn[2];
+        return;
+    }
+
+    // nearest way point - backward scan from prevWPidx, stops at the first WP farther than the one after it
+    int nearWPidx       =   0;
+    double vec2WP[3]    =   { 0., };
+    double d2WP         =   10000.;
+    for(int i_wpidx = 0; i_wpidx < prevWPidx + 1; i_wpidx++)
+    {
+        nearWPidx   =   prevWPidx - i_wpidx;
+        for(int i_wp = 0; i_wp < 3; i_wp++) vec2WP[i_wp] = arrWPsNED[nearWPidx*3 + i_wp] - Posn[i_wp];
+        double d2WP_tmp     =   0.;
+        GetEuclideanNorm(vec2WP, &d2WP_tmp);
+        if (d2WP_tmp > d2WP)
+        {
+            break;
+        }
+        d2WP    =   d2WP_tmp;
+    }
+
+    // the 3 segments between WP nearWPidx-1 & nearWPidx+2, a degenerate one (both ends clipped) is the distance to that WP
+    int maxWPidx        =   numWPs - 1;
+    double dist2Path    =   10000.;
+    for(int i_wpidx = 0; i_wpidx < 3; i_wpidx++)
+    {
+        int seg     =   min(max(nearWPidx - 1 + i_wpidx, 0), maxWPidx);
+        int segEnd  =   min(max(nearWPidx + i_wpidx, 0), maxWPidx);
+        double d2p  =   0.;
+        if (seg == segEnd)
+        {
+            for(int i_wp = 0; i_wp < 3; i_wp++) vec2WP[i_wp] = arrWPsNED[seg*3 + i_wp] - Posn[i_wp];
+            GetEuclideanNorm(vec2WP, &d2p);
+        }
+        else
+        {
+            Seg_Closest(Posn, arrWPsNED, seg, closest, &d2p);
+        }
+        dist2Path   =   min(dist2Path, d2p);
+    }
+    dist[0]     =   dist2Path;
+}
+__device__ void Calc_tgPos_direct(double Posn[3], int prevWPidx, double *arrWPsNED, double *arrPathS, int numWPs, double lookAheadDist, double tgPosn[3])
+{
+    double minval   =   0.00001;        
+    double prevWP[3]    =   {0.,};
+    double nextWP[3]    =   {0.,};
+    for(int i = 0; i < 3; i++)
+    {
+        prevWP[i]   =   arrWPsNED[prevWPidx*3 + i];
+        nextWP[i]   =   arrWPsNED[prevWPidx*3 + i + 3];
+    }
+
+    // trangle lengths
+    double vec1[3]  =   {prevWP[0] - Posn[0], prevWP[1] - Posn[1], prevWP[2] - Posn[2]};
+    double vec2[3]  =   {nextWP[0] - Posn[0], nextWP[1] - Posn[1], nextWP[2] - Posn[2]};
+    double vec3[3]  =   {nextWP[0] - prevWP[0], nextWP[1] - prevWP[1], nextWP[2] - prevWP[2]};
+    double len1     =   0.;
+    double len2     =   0.;
+    double len3     =   0.;
+    GetEuclideanNorm(vec1, &len1);
+    GetEuclideanNorm(vec2, &len2);
+    GetEuclideanNorm(vec3, &len3);
+    len1    =   max(len1, minval);
+    len2    =   max(len2, minval);
+    len3    =   max(len3, minval);
+
+    // get angle
+    double ang2     =   0.;
+    double ang1     =   0.;
+    GetAngleSndCosLaw(len1, len3, len2, &ang2);
+    GetAngleSndCosLaw(len2, len3, len1, &ang1);
+    if(isnan(ang2))
+    {
+        ang2    =   0.;
+    }
+    if(isnan(ang1))
+    {
+        ang1    =   0.;
+    }
+    
+    // distance to path
+    double distToPath   =   len1*sin(ang2);
+    double cosangle     =   max(0., cos(ang2));
+
+    // closePosOnPath
+    double unitVecWP1ToWP2[3]   =   {vec3[0]/len3, vec3[1]/len3 , vec3[2]/len3};
+    double closestPosOnPath[3]  =   {0., 0., 0.};
+    closestPosOnPath[0]         =   prevWP[0] + unitVecWP1ToWP2[0]*len1*cosangle;
+    closestPosOnPath[1]         =   prevWP[1] + unitVecWP1ToWP2[1]*len1*cosangle;
+    closestPosOnPath[2]         =   prevWP[2] + unitVecWP1ToWP2[2]*len1*cosangle;
+
+    double pi   =   acos(-1.);
+    if(ang2 > 0.5*pi)
+    {
+        distToPath = len1;
+        for(int i_pos = 0; i_pos < 3; i_pos ++)
+        {
+            closestPosOnPath[i_pos] =   prevWP[i_pos];
+        }
+    }
+    if(ang1 > 0.5*pi)
+    {
+        distToPath = len2;
+        for(int i_pos = 0; i_pos < 3; i_pos ++)
+        {
+            closestPosOnPath[i_pos] =   nextWP[i_pos];
+        }
+    }
+
+    // target position
+    if(distToPath >= lookAheadDist)
+    {
+        for(int i = 0; i < 3; i++)
+        {
+            tgPosn[i]     =   closestPosOnPath[i];
+        }
+
+    }
+    else if(prevWPidx < numWPs - 1)
+    {
+        // look ahead by arc length - S[j] - S[i] is the path length between WP i & j
+        int lastWP      =   numWPs - 1;
+        int p1          =   prevWPidx + 1;
+        double vec1[3]  =   { 0., };
+        double len1     =   0.;
+        for(int i_pos = 0; i_pos < 3; i_pos++) vec1[i_pos] = arrWPsNED[p1*3 + i_pos] - closestPosOnPath[i_pos];
+        GetEuclideanNorm(vec1, &len1);
+        double base     =   distToPath + len1;
+        if(base > lookAheadDist)
+        {
+            // reached on the way to the next WP
+            for(int i_pos = 0;  i_pos < 3; i_pos++)
+            {
+                tgPosn[i_pos] =   arrWPsNED[p1*3 + i_pos] - (base - lookAheadDist)*vec1[i_pos]/len1;
+            }
+        }
+        else
+        {
+            // reached on a later segment - first WP j with base + S[j] - S[p1] > lookAheadDist, binary search
+            double thr  =   lookAheadDist - base + arrPathS[p1];
+            int lo      =   p1 + 1;
+            int hi      =   lastWP + 1;
+            while(lo < hi)
+            {
+                int mid =   (lo + hi)/2;
+                if(arrPathS[mid] > thr) hi = mid;
+                else lo = mid + 1;
+            }
+            if(lo <= lastWP)
+            {
+                double sumDist      =   base + arrPathS[lo] - arrPathS[p1];
+                double vec12[3]     =   { 0., };
+                double dist12       =   0.;
+                for(int i_pos = 0;  i_pos < 3; i_pos++) vec12[i_pos] = arrWPsNED[lo*3 + i_pos] - arrWPsNED[lo*3 + i_pos - 3];
+                GetEuclideanNorm(vec12, &dist12);
+                for(int i_pos = 0;  i_pos < 3; i_pos++)
+                {
+                    tgPosn[i_pos] =   arrWPsNED[lo*3 + i_pos] - (sumDist - lookAheadDist)*vec12[i_pos]/dist12;
+                }
+            }
+            else if(p1 == lastWP)
+            {
+                // path ends inside the look ahead distance
+                for(int i_pos = 0;  i_pos < 3; i_pos++)
+                {
+                    tgPosn[i_pos] =   arrWPsNED[p1*3 + i_pos];
+                }
+            }
+        }
+    }
+}
+
+// quadrotor module functions
+__device__ void Kinematics(double tgPosn[3], double tgVn[3], double Posn[3], double Vn[3], double *LOSazim, double *LOSelev, double dLOSvec[3], double *relDist, double *tgo)
+{
+//.. azim, elev
+    double relPosn[3]   =   {tgPosn[0] - Posn[0], tgPosn[1] - Posn[1], tgPosn[2] - Posn[2]};
+    double azim     =   0;
+    double elev     =   0;
+    Get_Vec2AzimElev(relPosn, &azim, &elev);
+    LOSazim[0]     =   azim;
+    LOSelev[0]     =   elev;
+//.. relDist & tgo
+    double relDist_ =   0.;
+    double Spd =   0.;            
+    GetEuclideanNorm(relPosn, &relDist_);
+    GetEuclideanNorm(Vn, &Spd);
+    relDist_        =   max(relDist_, 0.001);
+    Spd             =   max(Spd, 0.1);
+    relDist[0]      =   relDist_;
+    tgo[0]          =   relDist_ / Spd;
+//.. dLOSvec
+    double relVn[3]     =   {tgVn[0] - Vn[0], tgVn[1] - Vn[1], tgVn[2] - Vn[2]};
+    double Pos_X_V[3]   =   { 0., };
+    VecCross(relPosn, relVn, Pos_X_V);
+    for(int i = 0; i < 3; i++)
+    {
+        dLOSvec[i]  =   Pos_X_V[i]/relDist_/relDist_;
+    }
+}
+__device__ void Guid_pursuit(double Kgain_PG, double tgo, double LOSazim, double LOSelev, double Vn[3], double AccLim, double AccCmdw[3])
+{
+//.. lead angle
+    double psi = 0.;
+    double gam = 0.;
+    Get_Vec2AzimElev(Vn, &psi, &gam);
+    double err_psi = LOSazim - psi;
+    double err_gam = LOSelev - gam;
+    err_psi     =   atan2(sin(err_psi), cos(err_psi));
+    err_gam     =   atan2(sin(err_gam), cos(err_gam));
+    double Spd = 0.;
+    GetEuclideanNorm(Vn, &Spd);
+//.. calc. acc. cmd.
+    AccCmdw[1]       =   Kgain_PG * Spd * err_psi/tgo * cos(gam);
+    AccCmdw[2]       =   - Kgain_PG * Spd * err_gam/tgo;
+//.. limit
+    for(int i =1; i<3; i++)
+    {
+        AccCmdw[i]  =   min(AccCmdw[i], AccLim);
+        AccCmdw[i]  =   max(AccCmdw[i], -AccLim);
+    }
+}
+__device__ void SpdCtrller(double Kp, double Ki, double Kd, double *int_err_spd, double *prev_err_spd, double dt, double Vn[3], double desSpd, double *AccCmdXw)
+{
+    double Spd       =   0.;
+    GetEuclideanNorm(Vn, &Spd);
+    double err_spd      =   desSpd - Spd;
+    int_err_spd[0]      =   int_err_spd[0] + err_spd * dt;
+    double derr_spd     =   0.;
+    if(prev_err_spd[0] != 0.)
+    {
+        derr_spd     =   (err_spd - prev_err_spd[0])/dt;
+    }
+    prev_err_spd[0] =   err_spd;
+    AccCmdXw[0]     =   Kp * err_spd + Ki * int_err_spd[0] + Kd * derr_spd;
+}
+__device__ void AccCmdToCtrlCmd(double AccCmdn[3], double psi_FPA, double throttle_Hover, double mass, double g, double AngEuler_Cmd[3], double Fcmd_b[3])
+{
+    double totalAccCmdn[3]  =   { 0., };
+    for(int i_a = 0; i_a < 3; i_a++)
+    {
+        totalAccCmdn[i_a]   =   AccCmdn[i_a];
+    }
+    totalAccCmdn[2]     =   totalAccCmdn[2] - g;
+    double magAccCmd    =   0.;
+    GetEuclideanNorm(totalAccCmdn, &magAccCmd);
+    double FPAeuler[3]      =   { 0., 0., psi_FPA };
+    double mat_R3[3][3]     =   { 0., };
+    Get_Euler2DCM(FPAeuler, mat_R3);
+    double AccCmdn_R3[3]     =   { 0., };            
+    Mul_Mat33Vec3(mat_R3, totalAccCmdn, AccCmdn_R3);
+    double phi          =   asin(AccCmdn_R3[1]/magAccCmd);
+    double theta        =   asin(-AccCmdn_R3[0]/cos(phi)/magAccCmd);
+    double psi          =   FPAeuler[2];
+    AngEuler_Cmd[0]     =   phi;
+    AngEuler_Cmd[1]     =   theta;
+    AngEuler_Cmd[2]     =   psi;
+
+    double magAccCmd_g  =   magAccCmd/g;
+    double ThrottleCmd  =   min(magAccCmd_g*throttle_Hover, 1.);
+    double AccCmdb[3]   =   {0., 0., -ThrottleCmd / throttle_Hover * g};
+    Fcmd_b[2]    =   AccCmdb[2] * mass;
+}
+__device__ void Dynamics_p6dof(double Fb_tot[3], double g0, double tau_ctrl[3], double AngEuler_Cmd[3], double AngEuler[3], double Vb[3], double cI_B[3][3], double Mass, double dot_AngEuler[3], double dot_Vb[3], double dot_Posn[3])
+{
+//.. Specific Force  
+    double accb[3]      =   { Fb_tot[0]/Mass, Fb_tot[1]/Mass, Fb_tot[2]/Mass };
+
+//.. Getting Gravitational Acceleration in Inertia Frame
+    double gn[3]        =   { 0., 0., g0 };
+    double gb[3]        =   { 0., };
+    Mul_Mat33Vec3(cI_B, gn, gb);
+
+//.. Determining Kinematic Relationship beween Euler Angle and Body Rate
+    double cthe            =   cos( AngEuler[1] ) ;
+    double tthe            =   tan( AngEuler[1] ) ;
+    double sphi            =   sin( AngEuler[0] ) ;
+    double cphi            =   cos( AngEuler[0] ) ;
+    double sthe            =   sin( AngEuler[1] ) ;
+    double cMat[3][3]       =   {0.,};
+    cMat[0][0]       =   1.0   ;
+    cMat[0][1]       =   sphi * tthe   ;
+    cMat[0][2]       =   cphi * tthe   ;
+    cMat[1][1]       =   cphi   ;
+    cMat[1][2]       =   -sphi   ;
+    cMat[2][1]       =   sphi / cthe  ;
+    cMat[2][2]       =   cphi / cthe  ;
+
+//.. Computing Dynamics - psuedo 6dof
+    for(int i_d = 0; i_d < 3; i_d++)
+    {
+        dot_AngEuler[i_d]   =   (1./tau_ctrl[i_d])*(AngEuler_Cmd[i_d] - AngEuler[i_d]);
+    }       
+    double cMat_inv[3][3]   =   {0.,};
+    double Wb[3]    = {0.,};
+    Get_invM33(cMat, cMat_inv);;
+    Mul_Mat33Vec3(cMat_inv, dot_AngEuler, Wb);
+    double Wb_X_Vb[3]   = {0.,};
+    VecCross(Wb, Vb, Wb_X_Vb);
+    for(int i_d = 0; i_d < 3; i_d++)
+    {
+        dot_Vb[i_d]         =   -Wb_X_Vb[i_d] + gb[i_d] + accb[i_d];
+    }
+    double Vn[3]       =   {0.,};
+    double cB_I[3][3]   =   { 0., };
+    Get_invDCM(cI_B, cB_I);
+    Mul_Mat33Vec3(cB_I, Vb, Vn);
+    for(int i_d = 0; i_d < 3; i_d++)
+    {
+        dot_Posn[i_d]       =   Vn[i_d];
+    }
+}
+__device__ void Integration_Euler(double Vb[3], double AngEuler[3], double Pos[3], double dot_Vb[3], double dot_AngEuler[3], double dot_Pos[3], double dt)
+{
+    for(int i = 0; i < 3; i++)
+    {
+        Vb[i]       =   Vb[i] + dot_Vb[i] * dt;
+        AngEuler[i] =   AngEuler[i] + dot_AngEuler[i] * dt;
+        AngEuler[i] =   atan2(sin(AngEuler[i]), cos(AngEuler[i]));
+        Pos[i]      =   Pos[i] + dot_Pos[i] * dt;
+    }
+}
+"""
+
+#.. MPPI noise kernel - counter-based Philox4x32-10, counter (sample, step, stream + vehicle, 0), key = per-call seed
+KernelNoise     =   """
+__device__ void philox4x32_10(unsigned int ctr[4], unsigned int k0, unsigned int k1)
+{
+    for(int r = 0; r < 10; r++)
+    {
+        unsigned long long p0   =   (unsigned long long)0xD2511F53u * ctr[0];
+        unsigned long long p1   =   (unsigned long long)0xCD9E8D57u * ctr[2];
+        unsigned int c1         =   ctr[1];
+        unsigned int c3         =   ctr[3];
+        ctr[0]  =   (unsigned int)(p1 >> 32) ^ c1 ^ k0;
+        ctr[1]  =   (unsigned int)p1;
+        ctr[2]  =   (unsigned int)(p0 >> 32) ^ c3 ^ k1;
+        ctr[3]  =   (unsigned int)p0;
+        k0      +=  0x9E3779B9u;
+        k1      +=  0xBB67AE85u;
+    }
+}
+
+__global__ void Noise(double var1, double var2, unsigned int k0, unsigned int k1, unsigned int stream, int K, int N, double *arr_delta_u1, double *arr_delta_u2)
+{
+    int idx     =   threadIdx.x + blockIdx.x * blockDim.x;
+    int i_n     =   blockIdx.y;
+    int i_v     =   blockIdx.z;
+    if(idx >= K || i_n >= N) return;
+    arr_delta_u1    +=  i_v*N*K;
+    arr_delta_u2    +=  i_v*N*K;
+
+    unsigned int ctr[4] =   {(unsigned int)idx, (unsigned int)i_n, stream + (unsigned int)i_v, 0u};
+    philox4x32_10(ctr, k0, k1);
+
+    // Box-Muller - one normal pair per (sample, step), first for u1 & second for u2
+    const double inv32  =   2.3283064365386963e-10;
+    double r    =   sqrt(-2.*log(((double)ctr[0] + 0.5)*inv32));
+    double th   =   2.*3.141592653589793*(((double)ctr[1] + 0.5)*inv32);
+    arr_delta_u1[idx + K*i_n]   =   var1*r*cos(th);
+    arr_delta_u2[idx + K*i_n]   =   var2*r*sin(th);
+}
+"""
+
+#.. MPPI weighting kernel - one block per (step, vehicle), min-cost normalized softmax & weighted update reduced on the device
+KernelWeighting =   """
+__global__ void Weighting(double *arr_stk, double *arr_delta_u1, double *arr_delta_u2, double lamb1, double lamb2, int K, double *arr_du1, double *arr_du2)
+{
+    // vehicle slices
+    int i_v     =   blockIdx.y;
+    arr_stk         +=  i_v*K;
+    arr_delta_u1    +=  i_v*gridDim.x*K;
+    arr_delta_u2    +=  i_v*gridDim.x*K;
+    arr_du1         +=  i_v*gridDim.x;
+    arr_du2         +=  i_v*gridDim.x;
+
+    // blockDim.x must be a power of 2
+    extern __shared__ double sdata[];
+    double *sMin    =   sdata;
+    double *sNum1   =   sdata + blockDim.x;
+    double *sDen1   =   sdata + 2*blockDim.x;
+    double *sNum2   =   sdata + 3*blockDim.x;
+    double *sDen2   =   sdata + 4*blockDim.x;
+
+    int i_n     =   blockIdx.x;
+    int tid     =   threadIdx.x;
+
+    // baseline - min. cost over the finite samples
+    double minCost  =   1.0/0.0;
+    for(int k = tid; k < K; k += blockDim.x)
+    {
+        double stk  =   arr_stk[k];
+        if(isfinite(stk)) minCost = fmin(minCost, stk);
+    }
+    sMin[tid]   =   minCost;
+    __syncthreads();
+    for(int s = blockDim.x/2; s > 0; s >>= 1)
+    {
+        if(tid < s) sMin[tid] = fmin(sMin[tid], sMin[tid + s]);
+        __syncthreads();
+    }
+    minCost     =   sMin[0];
+
+    // weights & weighted perturbations, diverged samples get zero weight
+    double num1 = 0., den1 = 0., num2 = 0., den2 = 0.;
+    for(int k = tid; k < K; k += blockDim.x)
+    {
+        double stk  =   arr_stk[k];
+        if(!isfinite(stk)) continue;
+        double w1   =   exp(-(stk - minCost)/lamb1);
+        double w2   =   exp(-(stk - minCost)/lamb2);
+        num1        +=  w1*arr_delta_u1[k + K*i_n];
+        den1        +=  w1;
+        num2        +=  w2*arr_delta_u2[k + K*i_n];
+        den2        +=  w2;
+    }
+    sNum1[tid] = num1; sDen1[tid] = den1; sNum2[tid] = num2; sDen2[tid] = den2;
+    __syncthreads();
+    for(int s = blockDim.x/2; s > 0; s >>= 1)
+    {
+        if(tid < s)
+        {
+            sNum1[tid] += sNum1[tid + s];
+            sDen1[tid] += sDen1[tid + s];
+            sNum2[tid] += sNum2[tid + s];
+            sDen2[tid] += sDen2[tid + s];
+        }
+        __syncthreads();
+    }
+    if(tid == 0)
+    {
+        arr_du1[i_n]    =   (sDen1[0] > 0.) ? sNum1[0]/sDen1[0] : 0.;
+        arr_du2[i_n]    =   (sDen2[0] > 0.) ? sNum2[0]/sDen2[0] : 0.;
+    }
+}
+"""
+
+#.. kernel source for a rollout precision - the float32 variant is the double source with float types & literals
+def Get_KernelSource(src, Precision='float64'):
+    if Precision == 'float64':
+        return src
+    src     =   src.replace('1e-308', '1e-38')
+    src     =   re.sub(r'\bdouble\b', 'float', src)
+    src     =   re.sub(r'(?<![\w.])(\d+\.\d*(?:[eE][-+]?\d+)?|\d+[eE][-+]?\d+)(?![\w.])', r'\1f', src)
+    return src
+
+class MPPI_CUDA():
+    def __init__(self, DeviceID=0, Precision='float64') -> None:
+        #.. own context - pushed & popped around every call, so the engine can be driven from any thread
+        cuda.init()
+        self.Context        =   cuda.Device(DeviceID).make_context()
+        atexit.register(self.Context.detach)
+
+        #.. compile kernels once per precision - the default one up front
+        self.Kernels        =   {}
+        self.Get_Kernels(Precision)
+        self.BlockSize      =   32
+        self.BlockSizeWeight    =   256
+
+        #.. persistent device buffers - (V, K, N, precision) they were allocated for
+        self.BufSize        =   None
+        self.gpu            =   {}
+        self.res            =   {}
+        self.HostCache      =   {}
+
+        #.. path arrays - (PathIndex, precision) they were uploaded for
+        self.IndexKey       =   None
+        self.gpuIndex       =   {}
+        self.Context.pop()
+        pass
+
+    def Get_Kernels(self, Precision):
+        if Precision not in self.Kernels:
+            ModMain     =   SourceModule(Get_KernelSource(KernelMainCuda, Precision))
+            ModNoise    =   SourceModule(Get_KernelSource(KernelNoise, Precision))
+            ModWeight   =   SourceModule(Get_KernelSource(KernelWeighting, Precision))
+            self.Kernels[Precision] =   {
+                'Mods'      :   (ModMain, ModNoise, ModWeight),
+                'Main'      :   ModMain.get_function("mainCuda"),
+                'Noise'     :   ModNoise.get_function("Noise"),
+                'Weight'    :   ModWeight.get_function("Weighting"),
+            }
+        return self.Kernels[Precision]
+
+    def Alloc_Buffers(self, V, K, N, dtype=np.float64):
+        dtype   =   np.dtype(dtype)
+        if self.BufSize == (V, K, N, dtype):
+            return
+        f8, i4  =   dtype.itemsize, np.dtype(np.int32).itemsize
+        nbytes  =   {
+            'intMPPI'       :   2*i4,
+            'u1_MPPI'       :   V*N*f8,
+            'delta_u1'      :   V*N*K*f8,
+            'u2_MPPI'       :   V*N*f8,
+            'delta_u2'      :   V*N*K*f8,
+            'stk'           :   V*K*f8,
+            'delAccn'       :   V*N*3*f8,
+            'WPParams'      :   V*3*i4,
+            'DistParams'    :   V*2*f8,
+            'ModelParams'   :   V*18*f8,
+            'InitStates'    :   V*9*f8,
+            'du1'           :   V*N*f8,
+            'du2'           :   V*N*f8,
+        }
+        for name in self.gpu:
+            self.gpu[name].free()
+        self.gpu        =   {name: cuda.mem_alloc(nbytes[name]) for name in nbytes}
+        # page-locked host buffers for the results
+        self.res        =   {name: cuda.pagelocked_empty((V, N), dtype) for name in ['du1', 'du2']}
+        self.res['stk'] =   cuda.pagelocked_empty((V, K), dtype)
+        self.HostCache  =   {}
+        self.BufSize    =   (V, K, N, dtype)
+
+    def Upload_Index(self, Index, dtype):
+        # way points & arc length of the concatenated WPs - uploaded only when the path or precision changes
+        if self.IndexKey == (Index, dtype):
+            return
+        for name in self.gpuIndex:
+            self.gpuIndex[name].free()
+        self.gpuIndex   =   {
+            'WPsNED'        :   cuda.to_device(Index.WPs.astype(dtype)),
+            'PathS'         :   cuda.to_device(Index.S.astype(dtype)),
+        }
+        self.IndexKey   =   (Index, dtype)
+
+    def Upload(self, name, arr):
+        # skip the copy when the device buffer already holds the same values
+        prev    =   self.HostCache.get(name)
+        if prev is not None and np.array_equal(prev, arr):
+            return
+        cuda.memcpy_htod(self.gpu[name], arr)
+        self.HostCache[name]    =   arr.copy()
+
+    #.. single vehicle
+    def Rollout(self, MPPIParams:DataMPPI, GCUParams:DataGCU, WPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, Seed, Stream=0, Index=None):
+        du1, du2    =   self.Rollout_Batch(MPPIParams, [GCUParams], [WPs], [Pos], [Vn], [AngEuler], [u1_MPPI], [u2_MPPI], Seed, Stream, Index)
+        return du1[0], du2[0]
+
+    #.. V vehicles in one launch - states (V,3), controls (V,N), one GCUParams & WP list per vehicle
+    #   Index : PathIndex of listWPs built when the path changed (None : built for this call)
+    def Rollout_Batch(self, MPPIParams:DataMPPI, listGCUParams, listWPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, Seed, Stream=0, Index=None):
+        self.Context.push()
+        try:
+            return self.Run_Rollout(MPPIParams, listGCUParams, listWPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, Seed, Stream, Index)
+        finally:
+            self.Context.pop()
+
+    def Run_Rollout(self, MPPIParams:DataMPPI, listGCUParams, listWPs, Pos, Vn, AngEuler, u1_MPPI, u2_MPPI, Seed, Stream=0, Index=None):
+        # MPPI params.
+        V               =   len(listGCUParams)
+        K               =   MPPIParams.K
+        N               =   MPPIParams.N
+        dt              =   MPPIParams.dt_MPPI
+        dtype           =   np.dtype(MPPIParams.Precision)
+        Func            =   self.Get_Kernels(MPPIParams.Precision)
+        est_delAccn     =   np.broadcast_to(np.array(MPPIParams.est_delAccn, dtype=dtype), (V, N, 3))
+
+        # way points - concatenated path index, (prevWPidx, numWPs, offset) per vehicle
+        if Index is None:
+            Index       =   PathIndex(listWPs)
+        numWPs          =   Index.lastWP - Index.firstWP + 1
+        offsetWPs       =   Index.firstWP
+        self.Alloc_Buffers(V, K, N, dtype)
+        self.Upload_Index(Index, dtype)
+        gpu             =   self.gpu
+        gpuIndex        =   self.gpuIndex
+
+        # model & scenario params - one row per vehicle
+        WPParams        =   np.array([[GCUParams.prevWPidx, numWPs[i_v], offsetWPs[i_v]] for i_v, GCUParams in enumerate(listGCUParams)])
+        DistParams      =   np.array([[GCUParams.reachDist, GCUParams.lookAheadDist] for GCUParams in listGCUParams])
+        ModelParams     =   np.array([[dt, GCUParams.desSpd, GCUParams.Kgain_guidPursuit, \
+            GCUParams.tau_control[0], GCUParams.tau_control[1], GCUParams.tau_control[2], \
+            GCUParams.Mass, GCUParams.throttle_Hover, GCUParams.g0, GCUParams.AccLim, GCUParams.Kp_vel, GCUParams.Ki_vel, GCUParams.Kd_vel, \
+            GCUParams.CD_model, GCUParams.Sref, GCUParams.rho, GCUParams.W1_cost, GCUParams.W2_cost] for GCUParams in listGCUParams])
+
+        # params that rarely change - uploaded only when they differ from the device copy
+        self.Upload('intMPPI', np.array([K, N]).astype(np.int32))
+        self.Upload('delAccn', np.ascontiguousarray(est_delAccn))
+        self.Upload('WPParams', WPParams.astype(np.int32))
+        self.Upload('DistParams', DistParams.astype(dtype))
+        self.Upload('ModelParams', ModelParams.astype(dtype))
+
+        # per-call states & controls
+        InitStates      =   np.stack([np.reshape(Pos, (V, 3)), np.reshape(Vn, (V, 3)), np.reshape(AngEuler, (V, 3))], axis=1)
+        cuda.memcpy_htod(gpu['InitStates'], np.ascontiguousarray(InitStates, dtype=dtype))
+        cuda.memcpy_htod(gpu['u1_MPPI'], np.ascontiguousarray(np.reshape(u1_MPPI, (V, N)), dtype=dtype))
+        cuda.memcpy_htod(gpu['u2_MPPI'], np.ascontiguousarray(np.reshape(u2_MPPI, (V, N)), dtype=dtype))
+        cuda.memset_d8(gpu['stk'], 0, V*K*dtype.itemsize)
+
+        # perturbations - sampled on the device from the per-call seed
+        n           =   self.BlockSize
+        blocksz     =   (n, 1, 1)
+        k0, k1      =   Split_Seed(Seed)
+        Func['Noise'](dtype.type(MPPIParams.var1), dtype.type(MPPIParams.var2), k0, k1, np.uint32(Stream), np.int32(K), np.int32(N), \
+            gpu['delta_u1'], gpu['delta_u2'], block=blocksz, grid=(m.ceil(K/n), N, V))
+
+        # rollouts
+        gridsz      =   (m.ceil(K/n), V)
+        Func['Main'](gpu['intMPPI'], gpu['u1_MPPI'], gpu['delta_u1'], gpu['u2_MPPI'], gpu['delta_u2'], gpu['stk'], gpu['delAccn'], \
+            gpu['WPParams'], gpuIndex['WPsNED'], gpu['DistParams'], gpu['ModelParams'], gpu['InitStates'], gpuIndex['PathS'], block=blocksz, grid=gridsz)
+
+        # weighting & reduction - only the two (V,N) updates come back
+        nW          =   self.BlockSizeWeight
+        Func['Weight'](gpu['stk'], gpu['delta_u1'], gpu['delta_u2'], dtype.type(MPPIParams.lamb1), dtype.type(MPPIParams.lamb2), np.int32(K), \
+            gpu['du1'], gpu['du2'], block=(nW, 1, 1), grid=(N, V), shared=5*nW*dtype.itemsize)
+
+        res         =   self.res
+        cuda.memcpy_dtoh(res['du1'], gpu['du1'])
+        cuda.memcpy_dtoh(res['du2'], gpu['du2'])
+
+        return res['du1'].astype(np.float64), res['du2'].astype(np.float64)
+
+    def Get_Cost(self):
+        # sample costs (V,K) of the last rollout, copied back on demand
+        self.Context.push()
+        try:
+            cuda.memcpy_dtoh(self.res['stk'], self.gpu['stk'])
+        finally:
+            self.Context.pop()
+        return self.res['stk'].astype(np.float64)
+
+    def Get_Noise(self):
+        # perturbations (V,N,K) of the last rollout, copied back on demand (debug / regression only)
+        V, K, N, dtype  =   self.BufSize
+        delta_u1    =   np.empty((V, N, K), dtype)
+        delta_u2    =   np.empty((V, N, K), dtype)
+        self.Context.push()
+        try:
+            cuda.memcpy_dtoh(delta_u1, self.gpu['delta_u1'])
+            cuda.memcpy_dtoh(delta_u2, self.gpu['delta_u2'])
+        finally:
+            self.Context.pop()
+        return delta_u1.astype(np.float64), delta_u2.astype(np.float64)
@@ -0,0 +1,53 @@
+# pulbic libs.
+import numpy as np
+
+# private libs.
+
+#.. Philox4x32-10 constants - same as the Noise kernel
+PHILOX_M0   =   np.uint64(0xD2511F53)
+PHILOX_M1   =   np.uint64(0xCD9E8D57)
+PHILOX_W0   =   np.uint32(0x9E3779B9)
+PHILOX_W1   =   np.uint32(0xBB67AE85)
+MASK32      =   np.uint64(0xFFFFFFFF)
+INV32       =   2.3283064365386963e-10
+
+#.. 64-bit seed -> Philox key (k0, k1)
+def Split_Seed(Seed):
+    Seed    =   int(Seed) & 0xFFFFFFFFFFFFFFFF
+    return np.uint32(Seed & 0xFFFFFFFF), np.uint32(Seed >> 32)
+
+#.. batched Philox4x32-10, ctr : list of 4 uint32 arrays of the same shape
+def Philox4x32(ctr, k0, k1):
+    c0, c1, c2, c3  =   [np.asarray(c, dtype=np.uint32) for c in ctr]
+    k0, k1          =   np.uint32(k0), np.uint32(k1)
+    with np.errstate(over='ignore'):
+        for _ in range(10):
+            p0      =   PHILOX_M0 * c0.astype(np.uint64)
+            p1      =   PHILOX_M1 * c2.astype(np.uint64)
+            c0, c1, c2, c3  =   (p1 >> np.uint64(32)).astype(np.uint32) ^ c1 ^ k0, (p1 & MASK32).astype(np.uint32), \
+                (p0 >> np.uint64(32)).astype(np.uint32) ^ c3 ^ k1, (p0 & MASK32).astype(np.uint32)
+            k0      =   k0 + PHILOX_W0
+            k1      =   k1 + PHILOX_W1
+    return c0, c1, c2, c3
+
+#.. MPPI perturbations (N,K) - counter (sample, step, stream, 0), same stream as the Noise kernel
+def Gen_Noise(Seed, N, K, var1, var2, Stream=0):
+    delta_u1, delta_u2  =   Gen_Noise_Batch(Seed, 1, N, K, var1, var2, Stream)
+    return delta_u1[0], delta_u2[0]
+
+#.. MPPI perturbations (V,N,K) - vehicle i_v uses stream word Stream + i_v
+def Gen_Noise_Batch(Seed, V, N, K, var1, var2, Stream=0):
+    k0, k1      =   Split_Seed(Seed)
+    i_v, i_n, idx   =   np.meshgrid(np.arange(V, dtype=np.uint32), np.arange(N, dtype=np.uint32), np.arange(K, dtype=np.uint32), indexing='ij')
+    x0, x1, _, _    =   Philox4x32([idx, i_n, np.uint32(Stream) + i_v, np.zeros_like(idx)], k0, k1)
+
+    # Box-Muller - one normal pair per (sample, step), first for u1 & second for u2
+    r           =   np.sqrt(-2.*np.log((x0.astype(np.float64) + 0.5)*INV32))
+    th          =   2.*np.pi*((x1.astype(np.float64) + 0.5)*INV32)
+    return var1*r*np.cos(th), var2*r*np.sin(th)
+
+#.. per-call seed - random unless a base seed is pinned
+def Get_CallSeed(BaseSeed, count):
+    if BaseSeed is None:
+        return int(np.random.randint(0, 2**63 - 1, dtype=np.int64))
+    return (int(BaseSeed) + int(count)) & 0xFFFFFFFFFFFFFFFF
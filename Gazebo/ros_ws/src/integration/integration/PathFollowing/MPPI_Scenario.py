@@ -0,0 +1,118 @@
+# pulbic libs.
+import numpy as np
+
+# private libs.
+from .ParamsOffBoardCtrl import DataMPPI, DataGCU
+
+#.. DataGCU fields the rollout engines read
+GCU_FIELDS  =   ['prevWPidx', 'reachDist', 'lookAheadDist', 'desSpd', 'Kgain_guidPursuit', 'tau_control', 'Mass', 'throttle_Hover', \
+    'g0', 'AccLim', 'Kp_vel', 'Ki_vel', 'Kd_vel', 'CD_model', 'Sref', 'rho', 'W1_cost', 'W2_cost']
+
+#.. one solver call - everything needed to replay it
+def Get_Scenario(MPPIParams:DataMPPI, GCUParams:DataGCU, WPs, Pos, Vn, AngEuler, Seed):
+    scenario    =   {
+        'WPs'           :   np.array(WPs, dtype=np.float64),
+        'Pos'           :   np.array(Pos, dtype=np.float64),
+        'Vn'            :   np.array(Vn, dtype=np.float64),
+        'AngEuler'      :   np.array(AngEuler, dtype=np.float64),
+        'u1_MPPI'       :   np.array(MPPIParams.u1_MPPI, dtype=np.float64),
+        'u2_MPPI'       :   np.array(MPPIParams.u2_MPPI, dtype=np.float64),
+        'est_delAccn'   :   np.array(MPPIParams.est_delAccn, dtype=np.float64),
+        'Seed'          :   int(Seed),
+    }
+    for name in GCU_FIELDS:
+        scenario['GCU_' + name] =   np.array(getattr(GCUParams, name))
+    return scenario
+
+#.. scenario -> (MPPIParams, GCUParams, WPs, Pos, Vn, AngEuler, Seed), MPPI sizes & weights from DataMPPI
+def Set_Scenario(scenario, Precision='float64'):
+    MPPIParams  =   DataMPPI()
+    MPPIParams.Precision    =   Precision
+    MPPIParams.u1_MPPI      =   scenario['u1_MPPI'].copy()
+    MPPIParams.u2_MPPI      =   scenario['u2_MPPI'].copy()
+    MPPIParams.est_delAccn  =   scenario['est_delAccn'].copy()
+    MPPIParams.N            =   len(MPPIParams.u1_MPPI)
+    GCUParams   =   DataGCU()
+    for name in GCU_FIELDS:
+        val     =   scenario['GCU_' + name]
+        setattr(GCUParams, name, val.copy() if val.ndim > 0 else val.item())
+    return MPPIParams, GCUParams, scenario['WPs'], scenario['Pos'], scenario['Vn'], scenario['AngEuler'], scenario['Seed']
+
+#.. default scenario - designed path of the integration node (Flag_WPtype 1)
+def Scenario_Default():
+    h       =   -5.
+    WPx     =   np.array([0., 1.5, 9.0,  11.9, 16.0, 42.5, 44.0, 44.6, 42.2, 21.0, \
+        17.9, 15.6, 13.9, 13.5, 16.4, 21.0, 28.9, 44.4, 43.8, 40.4, 26.9, -15.0, -25.0, -20.0, -10.0
+        ])
+    WPy     =   np.array([0., 7.7, 44.0, 46.4, 47.0, 46.7, 43.9, 38.1, 35.2, 34.7, \
+        33.4, 29.9, 23.6, 7.9,  5.0,  3.1,  4.3,  25.5, 30.8, 34.3, 38.2, 35.0,  10.0,   0.0, -5.0
+        ])
+    WPs         =   h*np.ones((len(WPx),3))
+    WPs[:,1]    =   WPx
+    WPs[:,0]    =   WPy
+
+    GCUParams   =   DataGCU()
+    GCUParams.prevWPidx =   1
+    Pos         =   np.array([2., 1., h])
+    Vn          =   np.array([2., 0.5, 0.])
+    AngEuler    =   np.array([0., 0., 0.25])
+    return GCUParams, WPs, Pos, Vn, AngEuler
+
+#.. designed path resampled to numWPs way points evenly spaced by arc length (dense planned paths), vehicle at WP prevWPidx
+def Scenario_LongPath(numWPs=5000, prevWPidx=0, Offset=[1., 1., 0.]):
+    GCUParams, WPs, _, _, AngEuler  =   Scenario_Default()
+    S           =   np.concatenate([[0.], np.cumsum(np.linalg.norm(np.diff(WPs, axis=0), axis=1))])
+    s           =   np.linspace(0., S[-1], numWPs)
+    WPs         =   np.stack([np.interp(s, S, WPs[:, i]) for i in range(3)], axis=1)
+    prevWPidx   =   min(prevWPidx, numWPs - 2)
+    vecWP       =   WPs[prevWPidx + 1] - WPs[prevWPidx]
+    GCUParams.prevWPidx =   prevWPidx
+    Pos         =   WPs[prevWPidx] + np.array(Offset)
+    Vn          =   2.*vecWP/max(np.linalg.norm(vecWP), 1e-3)
+    AngEuler    =   np.array([0., 0., np.arctan2(vecWP[1], vecWP[0])])
+    return GCUParams, WPs, Pos, Vn, AngEuler
+
+#.. synthetic scenarios along the designed path - used when no recording is given
+def Scenarios_Default(numScenario=20, seed=0):
+    rng     =   np.random.default_rng(seed)
+    GCUParams, WPs, _, _, _     =   Scenario_Default()
+    MPPIParams  =   DataMPPI()
+    listScenario    =   []
+    for i_s in range(numScenario):
+        prevWPidx   =   int(rng.integers(0, WPs.shape[0] - 2))
+        vecWP       =   WPs[prevWPidx + 1] - WPs[prevWPidx]
+        Pos         =   WPs[prevWPidx] + rng.uniform(0.1, 0.9)*vecWP + np.append(rng.normal(0., 1., 2), 0.)
+        Vn          =   rng.uniform(1., 3.)*vecWP/max(np.linalg.norm(vecWP), 1e-3)
+        AngEuler    =   np.array([0., 0., np.arctan2(vecWP[1], vecWP[0])])
+        GCUParams.prevWPidx =   prevWPidx
+        MPPIParams.u1_MPPI  =   MPPIParams.init_u1_MPPI + rng.normal(0., 0.3, MPPIParams.N)
+        MPPIParams.u2_MPPI  =   MPPIParams.init_u2_MPPI + rng.normal(0., 0.6, MPPIParams.N)
+        listScenario.append(Get_Scenario(MPPIParams, GCUParams, WPs, Pos, Vn, AngEuler, int(rng.integers(0, 2**62))))
+    return listScenario
+
+#.. list of scenarios <-> .npz, way point lists stored once per distinct list
+def Save_Scenarios(fileName, listScenario):
+    data        =   {'numScenario': np.array(len(listScenario))}
+    listWPs     =   []
+    for i_s, scenario in enumerate(listScenario):
+        idxWPs  =   next((i for i, WPs in enumerate(listWPs) if WPs.shape == scenario['WPs'].shape and np.array_equal(WPs, scenario['WPs'])), None)
+        if idxWPs is None:
+            idxWPs  =   len(listWPs)
+            listWPs.append(scenario['WPs'])
+            data['WPs_%d' % idxWPs]     =   scenario['WPs']
+        for name, val in scenario.items():
+            if name != 'WPs':
+                data['%d_%s' % (i_s, name)] =   np.array(val)
+        data['%d_idxWPs' % i_s] =   np.array(idxWPs)
+    np.savez_compressed(fileName, **data)
+
+def Load_Scenarios(fileName):
+    data        =   np.load(fileName)
+    listScenario    =   []
+    for i_s in range(int(data['numScenario'])):
+        prefix      =   '%d_' % i_s
+        scenario    =   {name[len(prefix):]: data[name] for name in data.files if name.startswith(prefix)}
+        scenario['WPs']     =   data['WPs_%d' % int(scenario.pop('idxWPs'))]
+        scenario['Seed']    =   int(scenario['Seed'])
+        listScenario.append(scenario)
+    return listScenario
@@ -0,0 +1,52 @@
+# pulbic libs.
+import numpy as np
+
+# private libs.
+
+#.. first order low-pass filter along the horizon as one matrix - y[0] = x[0], y[n] = (1-a)*y[n-1] + a*x[n], a = dt/tau
+CacheLPF    =   {}
+
+def Get_LPFMatrix(N, alpha):
+    key     =   (N, alpha)
+    if key not in CacheLPF:
+        i_n, i_k    =   np.meshgrid(np.arange(N), np.arange(N), indexing='ij')
+        mat         =   np.where(i_k <= i_n, alpha*(1. - alpha)**np.maximum(i_n - i_k, 0), 0.)
+        mat[:, 0]   =   (1. - alpha)**np.arange(N)
+        CacheLPF[key]   =   mat
+    return CacheLPF[key]
+
+def Filter_Controls(u_MPPI, alpha, FilterType='lpf'):
+    if FilterType == 'none':
+        return u_MPPI
+    elif FilterType != 'lpf':
+        print("Default Flag : MPPI FilterType")
+    N       =   u_MPPI.shape[-1]
+    return u_MPPI @ Get_LPFMatrix(N, alpha).T
+
+#.. shift the sequence numShift steps ahead, (...,N) - the tail is refilled by the shift policy
+#   'midrange' : 0.5*(max + min) of the sequence after every single shift (as the step-by-step loop did)
+#   'hold'     : last value repeated
+#   'init'     : initial value of the sequence
+def Shift_Controls(u_MPPI, numShift, ShiftPolicy='midrange', u_init=0.):
+    N       =   u_MPPI.shape[-1]
+    if numShift <= 0:
+        return u_MPPI
+    if ShiftPolicy == 'hold':
+        fill    =   np.repeat(u_MPPI[..., -1:], numShift, axis=-1)
+    elif ShiftPolicy == 'init':
+        fill    =   np.full(u_MPPI.shape[:-1] + (numShift,), u_init, dtype=u_MPPI.dtype)
+    else:
+        if ShiftPolicy != 'midrange':
+            print("Default Flag : MPPI ShiftPolicy")
+        # suffix max & min of the sequence, then one midrange per shift over what is left of it plus the fills still in the horizon
+        sufMax  =   np.maximum.accumulate(u_MPPI[..., ::-1], axis=-1)[..., ::-1]
+        sufMin  =   np.minimum.accumulate(u_MPPI[..., ::-1], axis=-1)[..., ::-1]
+        fill    =   np.empty(u_MPPI.shape[:-1] + (numShift,), dtype=u_MPPI.dtype)
+        for i_s in range(1, numShift + 1):
+            hi  =   sufMax[..., i_s] if i_s < N else np.full(u_MPPI.shape[:-1], -np.inf)
+            lo  =   sufMin[..., i_s] if i_s < N else np.full(u_MPPI.shape[:-1], np.inf)
+            if i_s > 1:
+                hi  =   np.maximum(hi, np.max(fill[..., max(i_s - N, 0):i_s - 1], axis=-1))
+                lo  =   np.minimum(lo, np.min(fill[..., max(i_s - N, 0):i_s - 1], axis=-1))
+            fill[..., i_s - 1]  =   0.5*(hi + lo)
+    return np.concatenate([u_MPPI, fill], axis=-1)[..., numShift:numShift + N]
@@ -0,0 +1,153 @@
+# pulbic libs.
+import copy
+import time
+import threading
+import numpy as np
+
+# private libs.
+from .ParamsOffBoardCtrl import DataMPPI, DataGCU
+from .Guid_MPPI import MPPI
+
+#.. state snapshot handed to the worker - everything the solve reads, copied at post time
+class MPPI_Snapshot():
+    def __init__(self, MPPIParams:DataMPPI, GCUParams:DataGCU, WPs, Pos, Vn, AngEuler, count, Index=None) -> None:
+        self.MPPIParams =   copy.copy(MPPIParams)
+        self.MPPIParams.u1_MPPI     =   np.array(MPPIParams.u1_MPPI, dtype=np.float64)
+        self.MPPIParams.u2_MPPI     =   np.array(MPPIParams.u2_MPPI, dtype=np.float64)
+        self.MPPIParams.est_delAccn =   np.array(MPPIParams.est_delAccn, dtype=np.float64)
+        self.GCUParams  =   copy.copy(GCUParams)
+        self.WPs        =   WPs
+        self.Index      =   Index
+        self.Pos        =   np.array(Pos, dtype=np.float64)
+        self.Vn         =   np.array(Vn, dtype=np.float64)
+        self.AngEuler   =   np.array(AngEuler, dtype=np.float64)
+        self.count      =   count
+        self.time       =   time.perf_counter()
+        pass
+
+#.. solve result - never modified after it is published
+class MPPI_Result():
+    def __init__(self, seq, u1_MPPI, u2_MPPI, snapshot:MPPI_Snapshot, calcTime) -> None:
+        self.seq        =   seq
+        self.u1_MPPI    =   u1_MPPI
+        self.u2_MPPI    =   u2_MPPI
+        self.count      =   snapshot.count
+        self.Index      =   snapshot.Index
+        self.stateTime  =   snapshot.time
+        self.calcTime   =   calcTime
+        pass
+
+#.. background MPPI solver - latest-snapshot input slot, double-buffered output
+class MPPI_Worker():
+    def __init__(self, solver:MPPI) -> None:
+        self.MPPI       =   solver
+
+        #.. input - single slot, a newer snapshot replaces an unsolved one (swapped under Lock)
+        self.Snapshot   =   None
+        self.Lock       =   threading.Lock()
+        self.Wakeup     =   threading.Event()
+
+        #.. output - double buffer, the writer fills the back slot then flips the front index
+        self.Buffer     =   [None, None]
+        self.Front      =   0
+        self.seq        =   0
+        self.ReadSeq    =   0
+
+        #.. metrics
+        self.numSolved  =   0
+        self.numPosted  =   0
+        self.numDropped =   0
+        self.numSkipped =   0
+        self.calcTime   =   []
+        self.staleTime  =   []
+        self.staleCount =   []
+        self.MaxLog     =   1000
+
+        self.Running    =   False
+        self.Thread     =   None
+        pass
+
+    def Start(self):
+        if self.Running:
+            return
+        self.Running    =   True
+        self.Thread     =   threading.Thread(target=self.Run, name="MPPI_Worker", daemon=True)
+        self.Thread.start()
+
+    def Stop(self, timeout=1.):
+        self.Running    =   False
+        self.Wakeup.set()
+        if self.Thread is not None:
+            self.Thread.join(timeout)
+
+    #.. called from the executor thread - never blocks
+    def Post_State(self, MPPIParams:DataMPPI, GCUParams:DataGCU, WPs, Pos, Vn, AngEuler, count, Index=None):
+        snapshot    =   MPPI_Snapshot(MPPIParams, GCUParams, WPs, Pos, Vn, AngEuler, count, Index)
+        with self.Lock:
+            if self.Snapshot is not None:
+                self.numDropped =   self.numDropped + 1
+            self.Snapshot   =   snapshot
+            self.numPosted  =   self.numPosted + 1
+        self.Wakeup.set()
+
+    #.. called from the executor thread - latest unread result or None, never blocks
+    def Get_Result(self, count=None):
+        res     =   self.Buffer[self.Front]
+        if res is None or res.seq == self.ReadSeq:
+            return None
+        if res.seq > self.ReadSeq + 1:
+            self.numSkipped =   self.numSkipped + res.seq - self.ReadSeq - 1
+        self.ReadSeq    =   res.seq
+        self.Log(self.staleTime, time.perf_counter() - res.stateTime)
+        if count is not None:
+            self.Log(self.staleCount, count - res.count)
+        return res
+
+    def Run(self):
+        while self.Running:
+            self.Wakeup.wait(0.1)
+            self.Wakeup.clear()
+            with self.Lock:
+                snapshot        =   self.Snapshot
+                self.Snapshot   =   None
+            if snapshot is None:
+                continue
+
+            t0      =   time.perf_counter()
+            try:
+                _, u1_MPPI, u2_MPPI =   self.MPPI.Guid_MPPI(snapshot.GCUParams, snapshot.WPs, snapshot.Pos, snapshot.Vn, snapshot.AngEuler, \
+                    MPPIParams=snapshot.MPPIParams, Index=snapshot.Index)
+            except Exception as e:
+                print("MPPI Worker : solve failed,", e)
+                continue
+            calcTime    =   time.perf_counter() - t0
+
+            # publish - back slot first, then flip
+            self.seq    =   self.seq + 1
+            back        =   1 - self.Front
+            self.Buffer[back]   =   MPPI_Result(self.seq, u1_MPPI, u2_MPPI, snapshot, calcTime)
+            self.Front  =   back
+
+            self.numSolved  =   self.numSolved + 1
+            self.Log(self.calcTime, calcTime)
+
+    def Log(self, arr, val):
+        arr.append(val)
+        if len(arr) > self.MaxLog:
+            del arr[0]
+
+    #.. solve latency [s], staleness [s] & [MPPI ticks] when consumed, dropped snapshots / skipped results
+    def Get_Metrics(self):
+        def Stats(arr):
+            if len(arr) == 0:
+                return {'last': 0., 'mean': 0., 'p50': 0., 'max': 0.}
+            return {'last': float(arr[-1]), 'mean': float(np.mean(arr)), 'p50': float(np.percentile(arr, 50)), 'max': float(np.max(arr))}
+        return {
+            'posted'        :   self.numPosted,
+            'solved'        :   self.numSolved,
+            'dropped'       :   self.numDropped,
+            'skipped'       :   self.numSkipped,
+            'latency'       :   Stats(list(self.calcTime)),
+            'stale_time'    :   Stats(list(self.staleTime)),
+            'stale_count'   :   Stats(list(self.staleCount)),
+        }
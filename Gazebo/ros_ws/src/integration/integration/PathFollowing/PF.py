@@ -10,12 +10,13 @@ from .VirtualTarget import Calc_VirTgPos
 from .Kinematics import Kinematics
 from .GCU_Main import Guid_pursuit, SpdCtrller, AccCmdToCtrlCmd
 from .PF_Cost import Calc_PF_cost
+from .PathIndex import PathIndex
 
 class PF():
     def __init__(self, dt, WPs) -> None:
     #.. Parameters
         self.GCUParams  =   DataGCU(dt)
-        self.WPs        =   WPs
+        self.Set_WPs(WPs)
 
     #.. Datalog
         self.datalogFile    =   open("/root/datalog/data/datalog.txt",'w')
@@ -25,6 +26,11 @@ class PF():
         self.total_cost     =   0.
         self.AccCmdw_w_NDO  =   np.zeros(3)
 
+    #.. way points & their path index (built here once per path, shared with MPPI)
+    def Set_WPs(self, WPs):
+        self.WPs        =   WPs
+        self.PathIdx    =   PathIndex([WPs])
+
     def PF_main(self, nextWPidx, Pos, Vn, AngEuler, Acc_disturb):
         
         #.. Virtual Target
@@ -32,7 +38,7 @@ class PF():
             WPs         =   self.WPs
             LAD         =   self.GCUParams.lookAheadDist
             # function & output
-            tgPos       =   Calc_VirTgPos(Pos, nextWPidx, WPs, LAD)
+            tgPos       =   Calc_VirTgPos(Pos, nextWPidx, WPs, LAD, self.PathIdx)
 
 
         #.. Kinematics
@@ -113,7 +119,7 @@ class PF():
             
             if nextWPidx > 2:
                 W1, W2          =   self.GCUParams.W1_cost, self.GCUParams.W2_cost
-                cost, dist_Path =   Calc_PF_cost(W1, W2, nextWPidx, WPs, Pos, Vn, ThrustCmd)
+                cost, dist_Path =   Calc_PF_cost(W1, W2, nextWPidx, WPs, Pos, Vn, ThrustCmd, self.PathIdx)
             else:
                 cost, dist_Path =   0., 0.
 
@@ -11,6 +11,8 @@ class DataMPPI():
     def __init__(self) -> None:
         
         # param - MPPI
+        self.Backend        =   'auto'      # 'cuda', 'cpu', 'auto'
+        self.Precision      =   'float64'   # 'float64', 'float32' - rollout precision (float32 : cuda only, the cpu engine runs float64)
         self.UpdateCycle    =   5
         self.tau_LPF        =   0.4
         self.count          =   0
@@ -24,6 +26,8 @@ class DataMPPI():
         # self.dt_MPPI        =   160. / 1000.        
         
         self.N_tau_LPF      =   ceil(self.tau_LPF/self.dt_MPPI)
+        self.FilterType     =   'lpf'       # 'lpf', 'none' - filter of a solved sequence before it is used
+        self.ShiftPolicy    =   'midrange'  # 'midrange', 'hold', 'init' - refill of the tail when the sequence is shifted
         
         # parameters
         self.K              =   32*2*4      # 128   256
@@ -32,6 +36,7 @@ class DataMPPI():
         self.lamb1          =   0.001         # 0.05
         self.var2           =   0.6        # 0.9
         self.lamb2          =   0.001         # 0.05
+        self.Seed           =   None        # None : random per call, int : reproducible per-call seeds (Seed + call count)
         # variables
         self.est_delAccn    =   zeros((self.N, 3))
         # self.dt_MPPI        =   160. / 1000.
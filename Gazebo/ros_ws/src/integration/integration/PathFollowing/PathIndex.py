@@ -0,0 +1,128 @@
+# pulbic libs.
+import numpy as np
+
+# private libs.
+
+#.. way point path index - segments & cumulative arc length, built once per path (when the path changes)
+#   one or several way point lists (concatenated, one per vehicle), segment i is WPs[i] -> WPs[i+1]
+class PathIndex():
+    def __init__(self, listWPs) -> None:
+        #.. concatenated way points, first & last WP index of every list
+        listWPs         =   [np.array(WPs, dtype=np.float64).reshape(-1, 3) for WPs in listWPs]
+        numWPs          =   np.array([WPs.shape[0] for WPs in listWPs])
+        self.WPs        =   np.concatenate(listWPs)
+        self.firstWP    =   np.concatenate([[0], np.cumsum(numWPs)[:-1]]).astype(np.int64)
+        self.lastWP     =   self.firstWP + numWPs - 1
+
+        #.. segments - the links between two lists are not segments
+        self.SegVec     =   self.WPs[1:] - self.WPs[:-1]
+        self.SegLen2    =   np.sum(self.SegVec*self.SegVec, axis=1)
+        self.SegLen     =   np.sqrt(self.SegLen2)
+        self.SegValid   =   np.ones(len(self.SegLen), dtype=bool)
+        self.SegValid[self.lastWP[:-1]] =   False
+        self.SegLen[~self.SegValid]     =   0.
+
+        #.. cumulative arc length, S[i] - S[j] is the path length between WP j & i of the same list
+        self.S          =   np.concatenate([[0.], np.cumsum(self.SegLen)])
+        pass
+
+    #.. point-segment distance & closest point, seg (...) segment indices, Pos broadcast against them
+    def Seg_Closest(self, Pos, seg):
+        A           =   self.WPs[seg]
+        vec         =   self.SegVec[seg]
+        len2        =   self.SegLen2[seg]
+        rel         =   Pos - A
+        dotRel      =   rel[..., 0]*vec[..., 0] + rel[..., 1]*vec[..., 1] + rel[..., 2]*vec[..., 2]
+        t           =   np.clip(dotRel/np.where(len2 > 0., len2, 1.), 0., 1.)
+        closest     =   A + t[..., None]*vec
+        diff        =   Pos - closest
+        return np.sqrt(diff[..., 0]*diff[..., 0] + diff[..., 1]*diff[..., 1] + diff[..., 2]*diff[..., 2]), closest
+
+    #.. nearest way point - backward scan from prevWPidx, stops at the first WP farther than the one after it (firstWP if none)
+    #   scanned in blocks that double every pass, so a long monotone stretch costs a few passes instead of one per WP
+    def Near_WP(self, Pos, prevWPidx, firstWP):
+        M           =   Pos.shape[0]
+        nearWPidx   =   firstWP.copy()
+        i_wp        =   prevWPidx.copy()
+        d2WP        =   10000.*np.ones(M)
+        pending     =   np.arange(M)
+        Block       =   4
+        while len(pending) > 0:
+            idxWP       =   i_wp[pending, None] - np.arange(Block)
+            inRange     =   idxWP >= firstWP[pending, None]
+            d2WP_tmp    =   np.sqrt(np.sum((self.WPs[np.maximum(idxWP, firstWP[pending, None])] - Pos[pending, None, :])**2, axis=2))
+            d2WP_prev   =   np.concatenate([d2WP[pending, None], d2WP_tmp[:, :-1]], axis=1)
+            stop        =   inRange & (d2WP_tmp > d2WP_prev)
+            flagStop    =   stop.any(axis=1)
+            i_s         =   np.nonzero(flagStop)[0]
+            nearWPidx[pending[i_s]] =   idxWP[i_s, np.argmax(stop[i_s], axis=1)]
+            d2WP[pending]   =   d2WP_tmp[:, -1]
+            i_wp[pending]   =   i_wp[pending] - Block
+            pending     =   pending[~flagStop & inRange[:, -1]]
+            Block       =   min(2*Block, 1024)
+        return nearWPidx
+
+    #.. distance to the path around the vehicle - the 3 segments between WP nearWP-1 & nearWP+2 of its list, nearWP from the backward scan
+    #   a local window, so on a self-crossing or looping path the distance is to the current stretch, not to a crossing one
+    #   non-finite positions (diverged samples) get a nan distance without a scan
+    def Dist_ToPath(self, Pos, prevWPidx, firstWP=0, lastWP=None):
+        Pos         =   np.atleast_2d(np.array(Pos, dtype=np.float64))
+        M           =   Pos.shape[0]
+        if lastWP is None:
+            lastWP  =   self.lastWP[0]
+        prevWPidx   =   np.broadcast_to(prevWPidx, (M,)).astype(np.int64)
+        firstWP     =   np.broadcast_to(firstWP, (M,)).astype(np.int64)
+        lastWP      =   np.broadcast_to(lastWP, (M,)).astype(np.int64)
+        dist        =   np.full(M, np.nan)
+        i_f         =   np.nonzero(np.all(np.isfinite(Pos), axis=1))[0]
+        if len(i_f) == 0:
+            return dist
+        Pos, firstWP, lastWP    =   Pos[i_f], firstWP[i_f], lastWP[i_f]
+        nearWPidx   =   self.Near_WP(Pos, np.clip(prevWPidx[i_f], firstWP, lastWP), firstWP)
+
+        # the 3 segments around it, a degenerate one (both ends clipped to the same WP) is the distance to that WP
+        arrWPidx    =   np.clip(nearWPidx[:, None] + np.array([-1, 0, 1, 2]), firstWP[:, None], lastWP[:, None])
+        prevWP      =   arrWPidx[:, 0:3]
+        arrD2P      =   np.sqrt(np.sum((self.WPs[prevWP] - Pos[:, None, :])**2, axis=2))
+        if len(self.SegLen) > 0:
+            d2Seg, _    =   self.Seg_Closest(Pos[:, None, :], np.minimum(prevWP, len(self.SegLen) - 1))
+            arrD2P      =   np.where(prevWP == arrWPidx[:, 1:4], arrD2P, d2Seg)
+        dist[i_f]   =   np.min(arrD2P, axis=1)
+        return dist
+
+    #.. look ahead target - walk lookAheadDist along the path from closestPos on segment prevWPidx, by arc length search
+    #   tgPosn is kept where the path ends before the look ahead distance is reached (as the step-by-step walk did)
+    def LookAhead(self, prevWPidx, closestPos, dist, lookAheadDist, lastWP, tgPosn):
+        prevWPidx   =   np.asarray(prevWPidx, dtype=np.int64)
+        lastWP      =   np.broadcast_to(lastWP, prevWPidx.shape).astype(np.int64)
+        tgPosn      =   np.array(tgPosn, dtype=closestPos.dtype)
+        flagFar     =   dist >= lookAheadDist
+        tgPosn[flagFar] =   closestPos[flagFar]
+
+        p1          =   np.minimum(prevWPidx + 1, lastWP)
+        walking     =   ~flagFar & (prevWPidx < lastWP)
+        vec1        =   self.WPs[p1] - closestPos
+        len1        =   np.sqrt(np.sum(vec1*vec1, axis=-1))
+        base        =   dist + len1
+
+        # reached on the way to the next WP
+        first       =   walking & (base > lookAheadDist)
+        if first.any():
+            magVec      =   (base - lookAheadDist)[first]
+            tgPosn[first]   =   self.WPs[p1[first]] - magVec[:, None]*vec1[first]/len1[first][:, None]
+
+        # reached on a later segment - first WP j with base + S[j] - S[p1] > lookAheadDist
+        later       =   walking & ~first
+        if later.any():
+            j           =   np.searchsorted(self.S, (lookAheadDist - base + self.S[p1])[later], side='right')
+            reached     =   j <= lastWP[later]
+            i_l         =   np.nonzero(later)[0][reached]
+            j           =   j[reached]
+            sumDist     =   base[i_l] + self.S[j] - self.S[p1[i_l]]
+            vec12       =   self.WPs[j] - self.WPs[j - 1]
+            tgPosn[i_l] =   self.WPs[j] - (sumDist - lookAheadDist[i_l])[:, None]*vec12/self.SegLen[j - 1][:, None]
+
+        # path ends inside the look ahead distance
+        flagEnd     =   walking & (p1 == lastWP) & (base <= lookAheadDist)
+        tgPosn[flagEnd] =   self.WPs[p1[flagEnd]]
+        return tgPosn
@@ -1,12 +1,13 @@
 #.. pulbic libs.
-from numpy import zeros, dot
+from numpy import zeros, dot, array
 from math import sin, cos, pi as PI
 from numpy.linalg import norm
 #.. private libs.
 from .CommonFunctions import GetAngleSndCosLaw
+from .PathIndex import PathIndex
 
-#.. Calc. Virtual Target Position
-def Calc_VirTgPos(Pos, nextWPidx, WPs, lookAheadDist):
+#.. Calc. Virtual Target Position - Index : PathIndex of WPs (None : built for this call)
+def Calc_VirTgPos(Pos, nextWPidx, WPs, lookAheadDist, Index=None):
     minval  =   0.00001
     nWP     =   WPs.shape[0]
     if nextWPidx == nWP:
@@ -42,26 +43,10 @@ def Calc_VirTgPos(Pos, nextWPidx, WPs, lookAheadDist):
         distToPath          =   len2
         closestPosOnPath    =   nextWP
 
-    # target position
-    tgPos       =   zeros(3)
-    if distToPath >= lookAheadDist:
-        tgPos           =   closestPosOnPath
-    else:
-        pos2            =   closestPosOnPath
-        sumDist         =   distToPath
-        for i in range(nextWPidx, nWP):
-            pos1        =   pos2
-            pos2        =   WPs[i, :]
-            dist12      =   norm(pos2-pos1)
-            sumDist     =   sumDist + dist12
-            if sumDist > lookAheadDist: 
-                unitVec =   (pos2-pos1)/dist12
-                magVec  =   sumDist - lookAheadDist
-                tgPos   =   pos2 - magVec * unitVec
-                break
-        if nextWPidx == nWP - 1 and sumDist <= lookAheadDist:
-            tgPos = WPs[nextWPidx, :]
-            
+    # target position - arc length search along the path index
+    if Index is None:
+        Index   =   PathIndex([WPs])
+    tgPos       =   Index.LookAhead([nextWPidx - 1], array([closestPosOnPath]), array([distToPath]), array([lookAheadDist]), nWP - 1, zeros((1, 3)))[0]
     return tgPos
 
 def distToPath(Pos, prevWP, nextWP):
@@ -0,0 +1,133 @@
+import math
+import numpy as np
+import cv2
+
+#.. collision checker on the distance transform of an occupancy grid (Map[y][x], 1 = obstacle)
+#   the transform is computed once per map, then points & whole segments are looked up in one vectorized pass
+#   Segment_Clearance samples segments every Step px, Check_Segments decides them exactly
+class DistanceMap:
+
+    def __init__(self, Map, Margin=0., Step=0.5) :
+        Map = np.asarray(Map)
+        self.Height, self.Width = Map.shape[:2]
+        self.Margin = float(Margin)
+        self.Step = float(Step)
+        # euclidean distance from every cell to the nearest obstacle cell (0 on obstacles)
+        Free = (Map == 0).astype(np.uint8)
+        self.Dist = cv2.distanceTransform(Free, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+        if not np.any(Free == 0) :
+            self.Dist[:] = np.inf
+
+    # new obstacle cells [x, y] and / or filled circles [x, y, r] - the transform is redone only in a window of
+    # Pad cells around them, further away the new obstacles are at least Pad away so distances are capped at Pad there
+    # bounding box (x0, y0, x1, y1) of the new cells returned (None : nothing inside the map)
+    def Update(self, Cells=None, Circles=None, Pad=256) :
+        xs, ys = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        if Cells is not None :
+            Cells = np.reshape(np.asarray(Cells), (-1, 2))
+            xs.append(np.round(Cells[:, 0]).astype(np.int64))
+            ys.append(np.round(Cells[:, 1]).astype(np.int64))
+        if Circles is not None :
+            for cx, cy, r in np.reshape(np.asarray(Circles, dtype=np.float64), (-1, 3)) :
+                gx, gy = np.meshgrid(np.arange(math.floor(cx - r), math.ceil(cx + r) + 1), np.arange(math.floor(cy - r), math.ceil(cy + r) + 1))
+                inCircle = (gx - cx) ** 2 + (gy - cy) ** 2 <= r * r
+                xs.append(gx[inCircle])
+                ys.append(gy[inCircle])
+        xs, ys = np.concatenate(xs), np.concatenate(ys)
+        inside = (xs >= 0) & (xs < self.Width) & (ys >= 0) & (ys < self.Height)
+        xs, ys = xs[inside], ys[inside]
+        if len(xs) == 0 :
+            return None
+        x0, x1, y0, y1 = int(xs.min()), int(xs.max()), int(ys.min()), int(ys.max())
+
+        # exact distance to the new cells inside the window, kept where smaller than the old one
+        wx0, wx1 = max(x0 - Pad, 0), min(x1 + Pad + 1, self.Width)
+        wy0, wy1 = max(y0 - Pad, 0), min(y1 + Pad + 1, self.Height)
+        Free = np.ones((wy1 - wy0, wx1 - wx0), dtype=np.uint8)
+        Free[ys - wy0, xs - wx0] = 0
+        DistNew = cv2.distanceTransform(Free, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+        DistNew = np.minimum(self.Dist[wy0:wy1, wx0:wx1], DistNew)
+        np.minimum(self.Dist, Pad, out=self.Dist)
+        self.Dist[wy0:wy1, wx0:wx1] = DistNew
+        return x0, y0, x1, y1
+
+    # distance to the nearest obstacle of (...,2) points [x, y], -1 outside the map
+    def Clearance(self, pts) :
+        pts = np.asarray(pts, dtype=np.float64)
+        ix = np.round(pts[..., 0]).astype(np.int64)
+        iy = np.round(pts[..., 1]).astype(np.int64)
+        inside = (ix >= 0) & (ix < self.Width) & (iy >= 0) & (iy < self.Height)
+        dist = np.full(ix.shape, -1., dtype=np.float64)
+        dist[inside] = self.Dist[iy[inside], ix[inside]]
+        return dist
+
+    def Check_Point(self, pts, Margin=None) :
+        Margin = self.Margin if Margin is None else Margin
+        return self.Clearance(pts) <= Margin
+
+    # minimum sample clearance of each of the (M,2) -> (M,2) segments
+    def Segment_Clearance(self, From, To) :
+        From = np.reshape(np.asarray(From, dtype=np.float64), (-1, 2))
+        To = np.reshape(np.asarray(To, dtype=np.float64), (-1, 2))
+        if len(From) == 0 :
+            return np.empty(0)
+        length = np.sqrt(np.sum((To - From) ** 2, axis=1))
+        numSample = np.ceil(length / self.Step).astype(np.int64) + 1
+        # all samples of all segments in one flat array, t in [0, 1] along each segment
+        start = np.cumsum(numSample) - numSample
+        i_seg = np.repeat(np.arange(len(numSample)), numSample)
+        t = (np.arange(np.sum(numSample)) - start[i_seg]) / np.maximum(numSample[i_seg] - 1, 1)
+        pts = From[i_seg] + (To - From)[i_seg] * t[:, None]
+        return np.minimum.reduceat(self.Clearance(pts), start)
+
+    # collision flag of every segment (True : collides or leaves the map) - exact for the cell a point rounds to :
+    #   a segment collides if it crosses a cell of clearance <= Margin (an obstacle cell at Margin 0), touching its edge included
+    #   bisection on the distance field - a point within h of the midpoint m is in a cell within h + sqrt(2)/2 of m, m is within
+    #   sqrt(2)/2 of its own cell, so a piece is clear once its midpoint cell clears half length + Margin + sqrt(2)
+    #   pieces of length <= 0.5 (at most 2 x 2 cells) are tested exactly against the squares of the cells they can cross
+    def Check_Segments(self, From, To, Margin=None) :
+        Margin = self.Margin if Margin is None else Margin
+        From = np.reshape(np.asarray(From, dtype=np.float64), (-1, 2))
+        To = np.reshape(np.asarray(To, dtype=np.float64), (-1, 2))
+        flag = (self.Clearance(From) <= Margin) | (self.Clearance(To) <= Margin)
+        seg = np.nonzero(~flag)[0]
+        A, B = From[seg], To[seg]
+        while len(seg) > 0 :
+            mid = 0.5 * (A + B)
+            half = 0.5 * np.sqrt(np.sum((B - A) ** 2, axis=1))
+            clear = self.Clearance(mid)
+            hit = clear <= Margin
+            flag[seg[hit]] = True
+            near = ~hit & (clear <= half + Margin + math.sqrt(2))
+            short = near & (half <= 0.25)
+            if short.any() :
+                flag[seg[short][self.Cross_Cells(A[short], B[short], Margin)]] = True
+            split = near & ~short
+            split = split & ~flag[seg]
+            seg = np.concatenate([seg[split], seg[split]])
+            A, B = np.concatenate([A[split], mid[split]]), np.concatenate([mid[split], B[split]])
+        return flag
+
+    # (M,2) -> (M,2) short segments (extent <= 1 px per axis) against the 2 x 2 cells around them - slab test of the segment
+    # with the square [c - 0.5, c + 0.5] of every cell of clearance <= Margin
+    def Cross_Cells(self, A, B, Margin) :
+        lo = np.round(np.minimum(A, B))
+        flag = np.zeros(len(A), dtype=bool)
+        D = B - A
+        for cx, cy in [(0, 0), (1, 0), (0, 1), (1, 1)] :
+            cell = lo + np.array([cx, cy], dtype=np.float64)
+            blocked = self.Clearance(cell) <= Margin
+            t0, t1 = np.zeros(len(A)), np.ones(len(A))
+            for k in range(2) :
+                with np.errstate(divide='ignore', invalid='ignore') :
+                    ta = (cell[:, k] - 0.5 - A[:, k]) / D[:, k]
+                    tb = (cell[:, k] + 0.5 - A[:, k]) / D[:, k]
+                flat = D[:, k] == 0
+                inSlab = np.abs(A[:, k] - cell[:, k]) <= 0.5
+                t0 = np.where(flat, np.where(inSlab, t0, np.inf), np.maximum(t0, np.minimum(ta, tb)))
+                t1 = np.where(flat, t1, np.minimum(t1, np.maximum(ta, tb)))
+            flag = flag | (blocked & (t0 <= t1))
+        return flag
+
+    def Check_Segment(self, from_wp, to_wp, Margin=None) :
+        return bool(self.Check_Segments(from_wp, to_wp, Margin)[0])
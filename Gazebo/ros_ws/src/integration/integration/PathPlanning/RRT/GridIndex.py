@@ -0,0 +1,88 @@
+import math
+import numpy as np
+
+#.. incremental nearest neighbor index - uniform 2D grid of node indices (dict of cells, so any map size)
+#   nearest : rings of cells around the query until no unscanned cell can hold a closer node
+#   near    : every node inside a radius
+class GridIndex:
+
+    def __init__(self, CellSize) :
+        self.CellSize = float(CellSize)
+        self.Cells = {}
+        self.CellMin = None
+        self.CellMax = None
+
+    def Get_Cell(self, q) :
+        return (math.floor(q[0] / self.CellSize), math.floor(q[1] / self.CellSize))
+
+    def Insert(self, idx, q) :
+        cell = self.Get_Cell(q)
+        if cell in self.Cells :
+            self.Cells[cell].append(idx)
+        else:
+            self.Cells[cell] = [idx]
+        if self.CellMin is None :
+            self.CellMin = list(cell)
+            self.CellMax = list(cell)
+        else:
+            self.CellMin = [min(self.CellMin[0], cell[0]), min(self.CellMin[1], cell[1])]
+            self.CellMax = [max(self.CellMax[0], cell[0]), max(self.CellMax[1], cell[1])]
+
+    # node indices of the cells at chebyshev distance ring from cell
+    def Get_Ring(self, cell, ring) :
+        cx, cy = cell
+        if ring == 0 :
+            return list(self.Cells.get(cell, []))
+        idx = []
+        for dx in range(-ring, ring + 1) :
+            for dy in ((-ring, ring) if abs(dx) < ring else range(-ring, ring + 1)) :
+                idx.extend(self.Cells.get((cx + dx, cy + dy), []))
+        return idx
+
+    # nearest of the first numNodes rows of Coord (lowest index on ties, as a full argmin)
+    def Nearest(self, q, Coord, numNodes) :
+        if self.CellMin is None :
+            return -1, math.inf
+        cell = self.Get_Cell(q)
+        C = self.CellSize
+        # distance from q to the border of its own cell - rings 0..r cover every node closer than r*C + edge
+        edge = min(q[0] - cell[0] * C, (cell[0] + 1) * C - q[0], q[1] - cell[1] * C, (cell[1] + 1) * C - q[1])
+        # no node before the ring that reaches the occupied cells
+        ring = max(self.CellMin[0] - cell[0], cell[0] - self.CellMax[0], self.CellMin[1] - cell[1], cell[1] - self.CellMax[1], 0)
+        ringMax = max(cell[0] - self.CellMin[0], self.CellMax[0] - cell[0], cell[1] - self.CellMin[1], self.CellMax[1] - cell[1])
+
+        best_idx, best_dist = -1, math.inf
+        while ring <= ringMax :
+            # wide empty rings cost more than a full scan
+            if 8 * ring > numNodes :
+                diff = Coord[:numNodes] - q
+                dist = np.sqrt(np.sum(diff * diff, axis=1))
+                idx = int(np.argmin(dist))
+                return idx, dist[idx]
+            cand = self.Get_Ring(cell, ring)
+            if len(cand) > 0 :
+                cand = np.array(cand)
+                diff = Coord[cand] - q
+                dist = np.sqrt(np.sum(diff * diff, axis=1))
+                i_c = np.lexsort((cand, dist))[0]
+                if dist[i_c] < best_dist or (dist[i_c] == best_dist and cand[i_c] < best_idx) :
+                    best_idx, best_dist = int(cand[i_c]), dist[i_c]
+            if best_dist <= ring * C + edge :
+                break
+            ring = ring + 1
+        return best_idx, best_dist
+
+    # indices of the nodes within radius of q, sorted
+    def Near(self, q, radius, Coord) :
+        if self.CellMin is None :
+            return np.array([], dtype=np.int64)
+        cell = self.Get_Cell(q)
+        numRing = int(math.ceil(radius / self.CellSize))
+        cand = []
+        for ring in range(numRing + 1) :
+            cand.extend(self.Get_Ring(cell, ring))
+        cand = np.sort(np.array(cand, dtype=np.int64))
+        if len(cand) == 0 :
+            return cand
+        diff = Coord[cand] - q
+        return cand[np.sum(diff * diff, axis=1) <= radius * radius]
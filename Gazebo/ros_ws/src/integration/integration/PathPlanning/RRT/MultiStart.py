@@ -0,0 +1,106 @@
+import math
+import time
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory, resource_tracker
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from .RRT import RRT
+from .DistanceMap import DistanceMap
+
+#.. worker side - the map of the current request attached from shared memory once per process
+WorkerShm = {'name': None, 'shm': None, 'Map': None}
+
+def Attach_Map(name, shape, dtype) :
+    if WorkerShm['name'] != name :
+        if WorkerShm['shm'] is not None :
+            WorkerShm['Map'] = None
+            WorkerShm['shm'].close()
+        shm = shared_memory.SharedMemory(name=name)
+        WorkerShm['name'], WorkerShm['shm'] = name, shm
+        WorkerShm['Map'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return WorkerShm['Map']
+
+def Path_Length(path_x, path_y) :
+    if len(path_x) < 2 :
+        return math.inf
+    return float(np.sum(np.hypot(np.diff(path_x), np.diff(path_y))))
+
+# one seeded planner instance - (seed, success, path length, path_x, path_y, iterations, time)
+# t_deadline : wall clock time the run has to be done by (None : no limit), runs started past it are skipped
+def Plan_Worker(name, shape, dtype, Seed, Start, Goal, Mode, MaxIter, t_deadline) :
+    t_start = time.perf_counter()
+    TimeBudget = None if t_deadline is None else t_deadline - time.time()
+    if TimeBudget is not None and TimeBudget <= 0 :
+        return Seed, False, math.inf, np.array([]), np.array([]), 0, 0.
+    Map = Attach_Map(name, shape, dtype)
+    np.random.seed(Seed)
+    planner = RRT()
+    path_x, path_y = planner.PathPlanning(Map, Start, Goal, Mode=Mode, MaxIter=MaxIter, TimeBudget=TimeBudget)
+    cost = Path_Length(path_x, path_y) if planner.Success else math.inf
+    return Seed, planner.Success, cost, path_x, path_y, planner.N_Iter, time.perf_counter() - t_start
+
+#.. multi-start planning - independently seeded planners in a process pool, map shared instead of pickled per task
+#   no Deadline : every run finishes, shortest successful path returned
+#   Deadline [s] : first successful path returned (runs are also given what is left of the deadline as their time budget)
+class MultiStartPlanner:
+
+    def __init__(self, numWorkers=None, Mode='connect', MaxIter=None, Context='spawn') :
+        self.numWorkers = multiprocessing.cpu_count() if numWorkers is None else numWorkers
+        self.Mode = Mode
+        self.MaxIter = MaxIter
+        self.Context = Context
+        self.Pool = None
+        # result of the last plan
+        self.Success = False
+        self.Cost = math.inf
+        self.Results = []
+        self.DistMap = None
+
+    def Start_Pool(self) :
+        if self.Pool is None :
+            # one resource tracker shared with the workers, so their attachments are not reported as leaks
+            resource_tracker.ensure_running()
+            self.Pool = ProcessPoolExecutor(max_workers=self.numWorkers, mp_context=multiprocessing.get_context(self.Context))
+
+    def Close(self) :
+        if self.Pool is not None :
+            self.Pool.shutdown(wait=True)
+            self.Pool = None
+
+    def Plan(self, Map, Start, Goal, numStarts=None, Deadline=None, Seed=None) :
+        t_start = time.perf_counter()
+        t_deadline = None if Deadline is None else time.time() + Deadline
+        numStarts = self.numWorkers if numStarts is None else numStarts
+        self.Start_Pool()
+        Map = np.ascontiguousarray(Map)
+        shm = shared_memory.SharedMemory(create=True, size=max(Map.nbytes, 1))
+        try:
+            np.ndarray(Map.shape, dtype=Map.dtype, buffer=shm.buf)[...] = Map
+            seeds = np.random.SeedSequence(Seed).generate_state(numStarts)
+            futures = [self.Pool.submit(Plan_Worker, shm.name, Map.shape, Map.dtype.str, int(seed), Start, Goal, self.Mode, self.MaxIter, t_deadline) for seed in seeds]
+            # distance map for post-processing built here while the workers plan
+            self.DistMap = DistanceMap(Map)
+
+            self.Results = []
+            pending = set(futures)
+            while len(pending) > 0 :
+                timeout = None if Deadline is None else max(Deadline - (time.perf_counter() - t_start), 0.)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                self.Results = self.Results + [f.result() for f in done]
+                if Deadline is not None and (any(res[1] for res in self.Results) or len(done) == 0) :
+                    break
+            for f in pending :
+                f.cancel()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        success = [res for res in self.Results if res[1]]
+        self.Success = len(success) > 0
+        if not self.Success :
+            print("RRT Multi-Start : no path found in", len(self.Results), "finished runs")
+            self.Cost = math.inf
+            return np.array([]), np.array([])
+        best = min(success, key=lambda res: res[2])
+        self.Cost = best[2]
+        return best[3], best[4]
@@ -0,0 +1,88 @@
+import os
+import math
+import numpy as np
+import cv2
+
+#.. shared occupancy map - one uint8 grid in the planner frame (Map[y][x], 1 = obstacle) kept in a .npy file
+#   readers attach it as a read-only memmap (no copy, shared page cache between processes) & hand it to the planners by reference
+#   an update is written to a temp file & swapped in with os.replace, then the version file is bumped - a reader keeps the
+#   grid it attached (the old file stays valid until it lets go) & re-attaches when it sees a new version
+#   the same layout is written by model_spawn (no import of this package there) : <Path> + <Path>.version holding the integer version
+MapDir = "/root/ros_ws/src/integration/integration/PathPlanning/Map"
+
+class OccupancyMap:
+
+    def __init__(self, Path=os.path.join(MapDir, "occupancy.npy"), PngPath=os.path.join(MapDir, "test.png")) :
+        self.Path = Path
+        self.VersionPath = Path + ".version"
+        # legacy map image, converted & published once if no grid was published yet (None : no fallback)
+        self.PngPath = PngPath
+        self.Grid = None
+        self.Version = -1
+
+    # grid of a map image (black = obstacle) drawn by model_spawn, in the planner frame
+    @staticmethod
+    def From_Png(PngPath) :
+        RawImage = cv2.imread(PngPath, cv2.IMREAD_GRAYSCALE)
+        if RawImage is None :
+            return None
+        Image = np.uint8(np.uint8((255 - RawImage) / 255))
+        Image = cv2.flip(Image, 0)
+        return cv2.rotate(Image, cv2.ROTATE_90_CLOCKWISE)
+
+    def Read_Version(self) :
+        try:
+            with open(self.VersionPath, 'r') as f :
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0 if os.path.exists(self.Path) else -1
+
+    # current grid (read-only memmap), re-attached only when a new version was published - None : no map yet
+    def Get(self) :
+        Version = self.Read_Version()
+        if Version < 0 and self.PngPath is not None :
+            Grid = self.From_Png(self.PngPath)
+            if Grid is not None :
+                self.Publish(Grid)
+                Version = self.Read_Version()
+        if Version < 0 :
+            return None
+        if self.Grid is None or Version != self.Version :
+            self.Grid = np.load(self.Path, mmap_mode='r')
+            self.Version = Version
+        return self.Grid
+
+    # new version of the whole grid - returns the version number
+    def Publish(self, Grid) :
+        Grid = np.ascontiguousarray(Grid, dtype=np.uint8)
+        Version = max(self.Read_Version(), self.Version) + 1
+        tmp = self.Path + ".tmp"
+        with open(tmp, 'wb') as f :
+            np.save(f, Grid)
+        os.replace(tmp, self.Path)
+        with open(self.VersionPath + ".tmp", 'w') as f :
+            f.write(str(Version))
+        os.replace(self.VersionPath + ".tmp", self.VersionPath)
+        self.Grid = np.load(self.Path, mmap_mode='r')
+        self.Version = Version
+        return Version
+
+    # copy of the current grid with new obstacle cells [x, y] and / or filled circles [x, y, r] published as the next version
+    # (circles rasterized as in DistanceMap.Update, so both stay in step when a replan gets the same obstacles)
+    def Update(self, Cells=None, Circles=None) :
+        Grid = np.array(self.Get())
+        xs, ys = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        if Cells is not None :
+            Cells = np.reshape(np.asarray(Cells), (-1, 2))
+            xs.append(np.round(Cells[:, 0]).astype(np.int64))
+            ys.append(np.round(Cells[:, 1]).astype(np.int64))
+        if Circles is not None :
+            for cx, cy, r in np.reshape(np.asarray(Circles, dtype=np.float64), (-1, 3)) :
+                gx, gy = np.meshgrid(np.arange(math.floor(cx - r), math.ceil(cx + r) + 1), np.arange(math.floor(cy - r), math.ceil(cy + r) + 1))
+                inCircle = (gx - cx) ** 2 + (gy - cy) ** 2 <= r * r
+                xs.append(gx[inCircle])
+                ys.append(gy[inCircle])
+        xs, ys = np.concatenate(xs), np.concatenate(ys)
+        inside = (xs >= 0) & (xs < Grid.shape[1]) & (ys >= 0) & (ys < Grid.shape[0])
+        Grid[ys[inside], xs[inside]] = 1
+        return self.Publish(Grid)
@@ -0,0 +1,135 @@
+import sys
+import time
+import json
+import argparse
+import tracemalloc
+import numpy as np
+import cv2
+from .RRT import RRT
+from .MapPyramid import CoarseToFine
+
+#.. occupancy map with the obstacle model of model_spawn.KnownObsSpawn - KnownObsNum - 1 circles of radius 40 / 80 / 100 px,
+#   centers on the 10 px grid in [MinBound, MaxBound], obstacles covering Start or Goal drawn again
+def Make_Map(numObs, Seed, MapSize=5000, MinBound=50, MaxBound=4950, Start=(0, 0), Goal=(4999, 4999)) :
+    rng = np.random.default_rng(Seed)
+    Map = np.zeros((MapSize, MapSize), dtype=np.uint8)
+    listRadius = [40, 80, 100]
+    for i in range(numObs - 1) :
+        while True :
+            Center = (int(rng.integers(MinBound // 10, MaxBound // 10 + 1)) * 10, int(rng.integers(MinBound // 10, MaxBound // 10 + 1)) * 10)
+            Radius = listRadius[int(rng.integers(0, 3))]
+            if min(np.hypot(Center[0] - Start[0], Center[1] - Start[1]), np.hypot(Center[0] - Goal[0], Center[1] - Goal[1])) > Radius :
+                break
+        cv2.circle(Map, Center, Radius, 1, -1)
+    return Map
+
+def Path_Length(path_x, path_y) :
+    if len(path_x) < 2 :
+        return 0.
+    return float(np.sum(np.hypot(np.diff(path_x), np.diff(path_y))))
+
+# one planner run - Planner : 'rrt', 'rrtstar', 'informed', 'connect' (RRT modes) or 'sac',
+#                             prefixed with 'c2f-' : planned on the map pyramid, coarse to fine
+def Run_Planner(Planner, Map, Start, Goal, Seed, MaxIter=None, TimeBudget=None) :
+    np.random.seed(Seed)
+    if Planner.startswith('c2f-') :
+        c2f = CoarseToFine(Mode=('connect' if Planner == 'c2f-sac' else Planner[4:]), MaxIter=MaxIter)
+        PlannerCoarse = None
+        if Planner == 'c2f-sac' :
+            from ..SAC.SACOnnx import SACOnnx
+            sac = SACOnnx()
+            PlannerCoarse = lambda M, S, G : sac.PathPlanning(M, S, G, Seed=Seed, FullSize=len(M))
+        t0 = time.perf_counter()
+        path_x, path_y = c2f.Plan(Map, Start, Goal, Planner=PlannerCoarse)
+        t_plan = time.perf_counter() - t0
+        return {'time': t_plan, 'success': bool(c2f.Success), 'nodes': 0, 'iters': 0, 'length': Path_Length(path_x, path_y)}
+    if Planner == 'sac' :
+        from ..SAC.SACOnnx import SACOnnx
+        t0 = time.perf_counter()
+        path_x, path_y = SACOnnx().PathPlanning(Map, Start, Goal)
+        t_plan = time.perf_counter() - t0
+        return {'time': t_plan, 'success': len(path_x) > 0, 'nodes': 0, 'iters': 0, 'length': Path_Length(path_x, path_y)}
+    planner = RRT()
+    t0 = time.perf_counter()
+    path_x, path_y = planner.PathPlanning(Map, Start, Goal, Mode=Planner, MaxIter=MaxIter, TimeBudget=TimeBudget)
+    t_plan = time.perf_counter() - t0
+    return {'time': t_plan, 'success': bool(planner.Success), 'nodes': int(planner.numNodes), 'iters': int(planner.N_Iter), 'length': Path_Length(path_x, path_y)}
+
+#.. every planner over every obstacle count & seed - unavailable planners are reported & skipped
+#   Memory : the run is repeated under tracemalloc for the peak of traced allocations (kept apart from the timing)
+def Bench_Planner_Suite(listPlanner, listObs, listSeed, MaxIter=None, TimeBudget=None, Memory=False, Start=(0, 0), Goal=(4999, 4999)) :
+    Start = np.array(Start, dtype=np.float64)
+    Goal = np.array(Goal, dtype=np.float64)
+    runs = {(planner, numObs): [] for planner in listPlanner for numObs in listObs}
+    skipped = {}
+    for numObs in listObs :
+        for seed in listSeed :
+            Map = Make_Map(numObs, seed, Start=Start, Goal=Goal)
+            for planner in listPlanner :
+                if planner in skipped :
+                    continue
+                try:
+                    res = Run_Planner(planner, Map, Start, Goal, seed, MaxIter, TimeBudget)
+                    if Memory :
+                        tracemalloc.start()
+                        Run_Planner(planner, Map, Start, Goal, seed, MaxIter, TimeBudget)
+                        res['mem_peak_MB'] = tracemalloc.get_traced_memory()[1] / 1e6
+                        tracemalloc.stop()
+                except Exception as e:
+                    if tracemalloc.is_tracing() :
+                        tracemalloc.stop()
+                    skipped[planner] = repr(e)
+                    continue
+                res['seed'] = int(seed)
+                runs[(planner, numObs)].append(res)
+
+    results = []
+    for (planner, numObs), listRun in runs.items() :
+        if planner in skipped :
+            results.append({'Planner': planner, 'numObs': numObs, 'skipped': skipped[planner]})
+            continue
+        t_plan = np.array([run['time'] for run in listRun])
+        success = [run for run in listRun if run['success']]
+        res = {
+            'Planner'       :   planner,
+            'numObs'        :   numObs,
+            'numRuns'       :   len(listRun),
+            'success_rate'  :   len(success) / len(listRun),
+            'time_mean'     :   float(np.mean(t_plan)),
+            'time_p50'      :   float(np.percentile(t_plan, 50)),
+            'time_max'      :   float(np.max(t_plan)),
+            'nodes_mean'    :   float(np.mean([run['nodes'] for run in listRun])),
+            'length_mean'   :   float(np.mean([run['length'] for run in success])) if len(success) > 0 else None,
+            'runs'          :   listRun,
+        }
+        if Memory :
+            res['mem_peak_MB'] = float(np.max([run['mem_peak_MB'] for run in listRun]))
+        results.append(res)
+    return results
+
+def main(args=None) :
+    parser = argparse.ArgumentParser(description='path planner benchmark over generated 5000 x 5000 maps (model_spawn obstacle model)')
+    parser.add_argument('--planners', nargs='+', default=['rrt', 'connect', 'informed'], help='rrt rrtstar informed connect sac, c2f-<planner> : coarse to fine on the map pyramid')
+    parser.add_argument('--obs', nargs='+', type=int, default=[50, 150, 300], help='KnownObsNum of model_spawn')
+    parser.add_argument('--seeds', type=int, default=5)
+    parser.add_argument('--max-iter', type=int, default=None)
+    parser.add_argument('--budget', type=float, default=None, help='time budget per run [s]')
+    parser.add_argument('--memory', action='store_true', help='repeat each run under tracemalloc for the memory peak')
+    parser.add_argument('--json', default=None, help='write the results to this file')
+    opts = parser.parse_args(args)
+
+    results = Bench_Planner_Suite(opts.planners, opts.obs, list(range(opts.seeds)), opts.max_iter, opts.budget, opts.memory)
+    for res in results :
+        if 'skipped' in res :
+            print("%s obs %d : skipped (%s)" % (res['Planner'], res['numObs'], res['skipped']))
+            continue
+        print("%s obs %d : success %.2f, time p50 %.3f s max %.3f s, %.0f nodes, length %s" % (res['Planner'], res['numObs'], \
+            res['success_rate'], res['time_p50'], res['time_max'], res['nodes_mean'], \
+            'n/a' if res['length_mean'] is None else '%.0f px' % res['length_mean']) + \
+            ('' if 'mem_peak_MB' not in res else ', mem peak %.1f MB' % res['mem_peak_MB']))
+    if opts.json is not None :
+        with open(opts.json, 'w') as f :
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__' :
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+import os
+import numpy as np
+import onnx
+import onnxruntime
+
+#.. ONNX Runtime session manager - model loaded, checked & the session built once, then reused across plans
+#   the model file is reloaded only when its mtime changes
+OptLevels = {
+    'disable'   : onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic'     : onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended'  : onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all'       : onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+class OnnxSession:
+
+    def __init__(self, ModelPath, IntraOpThreads=1, InterOpThreads=1, OptLevel='all', Providers=None, Check=True) :
+        self.ModelPath = ModelPath
+        self.IntraOpThreads = IntraOpThreads
+        self.InterOpThreads = InterOpThreads
+        if OptLevel not in OptLevels :
+            print("Default Flag : ONNX OptLevel")
+            OptLevel = 'all'
+        self.OptLevel = OptLevel
+        self.Providers = Providers
+        self.Check = Check
+        self.Session = None
+        self.mtime = None
+        self.numLoad = 0
+
+    def Load(self) :
+        if self.Check :
+            onnx.checker.check_model(onnx.load(self.ModelPath))
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.IntraOpThreads
+        options.inter_op_num_threads = self.InterOpThreads
+        options.graph_optimization_level = OptLevels[self.OptLevel]
+        if self.Providers is None :
+            self.Session = onnxruntime.InferenceSession(self.ModelPath, sess_options=options)
+        else:
+            self.Session = onnxruntime.InferenceSession(self.ModelPath, sess_options=options, providers=self.Providers)
+        self.numLoad = self.numLoad + 1
+
+    # session of the current model file - built on first use & again only if the file changed since
+    def Get_Session(self) :
+        mtime = os.path.getmtime(self.ModelPath)
+        if self.Session is None or mtime != self.mtime :
+            self.Load()
+            self.mtime = mtime
+        return self.Session
+
+    def Run(self, input_mat) :
+        session = self.Get_Session()
+        return session.run(None, {session.get_inputs()[0].name : input_mat})
+
+    # one inference on zeros (dynamic dims set to numBatch) so the first plan does not pay for the lazy init
+    def Warmup(self, numBatch=1) :
+        session = self.Get_Session()
+        shape = [dim if isinstance(dim, int) else numBatch for dim in session.get_inputs()[0].shape]
+        self.Run(np.zeros(shape, dtype=np.float32))
+
+# one manager per model file & options, shared by every planner instance
+CacheSession = {}
+
+def Get_OnnxSession(ModelPath, IntraOpThreads=1, InterOpThreads=1, OptLevel='all', Providers=None, Check=True) :
+    key = (ModelPath, IntraOpThreads, InterOpThreads, OptLevel, None if Providers is None else tuple(Providers), Check)
+    if key not in CacheSession :
+        CacheSession[key] = OnnxSession(ModelPath, IntraOpThreads, InterOpThreads, OptLevel, Providers, Check)
+    return CacheSession[key]
@@ -2,12 +2,12 @@ import matplotlib.pyplot as plt
 import numpy as np
 import collections
 import math
-from .collision_check import collision_check as colli
+from ..RRT.DistanceMap import DistanceMap
+from ..RRT.Raycast import Cast_Rays, Beam_Directions
 from dataclasses import dataclass
 import time
 
-import onnx 
-import onnxruntime
+from .OnnxSession import Get_OnnxSession
 import sys
 
 # Opencv-ROS
@@ -29,115 +29,101 @@ import cv2
 
 class SACOnnx:
 
-    def PathPlanning(self, Image, Start, Goal) :
-
-        onnx_model = onnx.load('/root/ros_ws/src/integration/integration/PathPlanning/SAC/test26.onnx')
-        onnx.checker.check_model(onnx_model)
-        ort_session = onnxruntime.InferenceSession('/root/ros_ws/src/integration/integration/PathPlanning/SAC/test26.onnx')
+    # 모델 로드 / 검증 / 세션 생성은 한 번만 (파일 mtime 이 바뀌면 다시 로드), Warmup : 생성 시 1회 추론
+    def __init__(self, ModelPath='/root/ros_ws/src/integration/integration/PathPlanning/SAC/test26.onnx', \
+        IntraOpThreads=1, InterOpThreads=1, OptLevel='all', Warmup=False) :
+        self.Session = Get_OnnxSession(ModelPath, IntraOpThreads, InterOpThreads, OptLevel)
+        self.Success = False
+        if Warmup :
+            self.Session.Warmup()
+
+    # 관측 (R, 18) - Input 1 : Target 방향 Unit Vector (3 axis), Input 2 : LOS 거리 (3 axis), Input 3 : Lidar 12개 (30도 간격)
+    # State [x, 5, z] 는 Image[x][z] 좌표 - DistanceMap 좌표는 [column z, row x], Beam 방향 (cos, sin) -> [sin, cos]
+    # Lidar : 1 cell 간격 샘플에서 첫 장애물까지 거리, 맵을 벗어나거나 step_num 안에 없으면 step_num * 2
+    # 학습 때 Lidar 는 int() (floor) cell - Cast_Rays 는 반올림 cell 이므로 원점을 0.5 cell 옮김 (floor(p) = round(p - 0.5))
+    def Observe(self, DistMap, State, final, step_num) :
+        LOS = final - State
+        input1_mat = LOS / np.linalg.norm(LOS, axis=1)[:, None]
+        input2_mat = LOS * np.array([1., 0., 1.])
+        input3_mat = Cast_Rays(DistMap, State[:, [2, 0]] - 0.5, Beam_Directions(12)[:, ::-1], MaxRange=step_num, NoHit=step_num * 2)
+        return np.concatenate((input1_mat, input2_mat, input3_mat), axis=1).astype(np.float32)
+
+    ## Closed-loop Rollout - 관측 -> Action -> 적분 을 numRollouts 개 궤적에 대해 동시에 (한 Step 당 ONNX 1회 호출)
+    # 한 Step : Target 방향 1 cell 전진 + Action 첫 번째 값 만큼 좌(+) / 우(-) 수직 이동 (기존 Waypoint 계산과 같은 모델)
+    # 0번 Rollout 은 Policy 그대로, 나머지는 Action 에 N(0, Sigma) 잡음 (Seed 로 재현 가능)
+    # 충돌하거나 맵을 벗어난 Rollout 은 그 자리에서 종료, GoalTol 안에 들어오면 Target 까지 이어서 성공
+    # 반환 : 궤적 (numSteps + 1, R, 3), Rollout 별 길이 (State 수), 성공 여부
+    def Rollout(self, DistMap, init, final, numRollouts, step_num, Sigma, Seed, GoalTol=1.) :
+        rng = np.random.default_rng(Seed)
+        Traj = np.zeros((step_num + 1, numRollouts, 3))
+        Traj[0] = init
+        numState = np.ones(numRollouts, dtype=np.int64)
+        Reached = np.zeros(numRollouts, dtype=bool)
+        active = np.arange(numRollouts)
+        State = Traj[0].copy()
+        for k in range(step_num) :
+            # Target 근처 - 마지막 구간 충돌 확인 후 종료
+            near = np.linalg.norm(final - State, axis=1) <= GoalTol
+            if near.any() :
+                free = ~DistMap.Check_Segments(State[near][:, [2, 0]], np.repeat(final[None, [2, 0]], np.sum(near), axis=0))
+                idx = active[near]
+                Traj[k + 1, idx[free]] = final
+                numState[idx[free]] = k + 2
+                Reached[idx[free]] = True
+                active, State = active[~near], State[~near]
+            if len(active) == 0 :
+                break
+
+            output_mat = self.Session.Run(self.Observe(DistMap, State, final, step_num))
+            Act = np.reshape(output_mat[2], (len(active), -1))[:, 0].astype(np.float64)  # onnx ouput의 2항이 Action
+            noisy = active > 0
+            Act[noisy] = Act[noisy] + Sigma * rng.standard_normal(np.sum(noisy))
+
+            Act_dir_rel = (final - State) / np.linalg.norm(final - State, axis=1)[:, None]  # Target 을 향하는 Unit Vector
+            Act_dir = np.stack([-Act_dir_rel[:, 2], np.zeros(len(active)), Act_dir_rel[:, 0]], axis=1)  # 좌측 수직 방향
+            NextState = State + Act_dir_rel + Act[:, None] * Act_dir
+
+            # 이동 구간 충돌 / 맵 이탈 확인 (Image[x][z] - column z, row x)
+            hit = DistMap.Check_Segments(State[:, [2, 0]], NextState[:, [2, 0]])
+            Traj[k + 1, active] = NextState
+            numState[active] = k + 2
+            active, State = active[~hit], NextState[~hit]
+            if len(active) == 0 :
+                break
+        return Traj, numState, Reached
+
+    # numRollouts 개 Closed-loop Rollout 중 Target 에 도달한 충돌 없는 궤적 중 가장 짧은 것을 경로로 반환 (없으면 빈 배열)
+    # Start / Goal / 경로는 FullSize 맵 기준 좌표 - Image 는 그보다 거친 Pyramid Level 이어도 됨 (FullSize = Image 크기 : Image cell 좌표)
+    def PathPlanning(self, Image, Start, Goal, numRollouts=16, Sigma=0.1, Seed=None, FullSize=5000) :
 
         # 100 x 100 Drone.onnx를 위한 환경
-        # 1. Input Matrix 만들기, 2. Onnx Model에 넣기(맞는 위치에 저장) 3. Output 형식 확인
         step_num = 5000
         Map_Size = Image.shape[0]
-        ScaleFactor = 5000/Map_Size
+        ScaleFactor = FullSize/Map_Size
 
-        #init = np.array([0, 5, 0])
-        #final = np.array([100, 5, 100])  # 수정 예정
-        
+        Start, Goal = np.ravel(Start), np.ravel(Goal)
         init = np.array([Start[0]/ScaleFactor, 5, Start[1]/ScaleFactor], dtype=float)
         final = np.array([Goal[0]/ScaleFactor, 5, Goal[1]/ScaleFactor], dtype=float)
+        final[[0, 2]] = np.clip(final[[0, 2]], 0, Map_Size - 1)  # 축소된 맵에서 Goal 이 마지막 cell 을 넘지 않도록
 
         print(Image.shape[0])
-        #print(Start[0]/ScaleFactor)
-        #print(Goal[0]/ScaleFactor)
         print(init)
         print(final)
 
-        ## Target을 향한 Unit Veoctor로 가고 있다고 가정
-        # Generate Current State Matrix
-        CurrState_mat = np.zeros((step_num,3))
-        CurrState_mat[0] = init
-        CurrState_temp = init
-        for i in range(1,step_num):  # 1부터 시작
-            CurrState_temp = CurrState_temp + (final-CurrState_temp)/np.linalg.norm(final-CurrState_temp)
-            CurrState_mat[i] = CurrState_temp
-
-        ## Input 1 : Target - 현재 위치(3 axis)(Unit Vector), Input 2 : LOS 거리(3 axis), Input 3 : Lidar (12개)
-        input1_mat = np.zeros((step_num,3))
-        input2_mat = np.zeros((step_num,3))
-        input3_mat = np.zeros((step_num,12))
-        for i in range(0,step_num):  # 0 - step_num
-            input1_mat[i] = (final - CurrState_mat[i])/np.linalg.norm(final - CurrState_mat[i])
-            
-            LOS_x = final[0] - CurrState_mat[i][0]
-            LOS_z = final[2] - CurrState_mat[i][2]
-            input2_mat[i] = np.array([LOS_x, 0, LOS_z])
-
-        ## Imput 3 Data 만들기    
-        RawImage = (cv2.imread("/root/ros_ws/src/integration/integration/PathPlanning/Map/test.png", cv2.IMREAD_GRAYSCALE))
-        Image = np.uint8(np.uint8((255 - RawImage)/ 255))
-        Image = cv2.flip(Image,0)
-        Image = cv2.rotate(Image, cv2.ROTATE_90_CLOCKWISE)
-
-        LidarObs = np.zeros((step_num,12))  # (Iteration, Lidar_Index)
-        LidarObs_mat = np.zeros((step_num,1))
-
-        for k in range(0,step_num):  # 0 - (step_num-1)
-    
-            for i in range(0,12):  # 0 - 11
-                CurrState = CurrState_mat[k]
-                LidarState = CurrState
-        
-            for j in range(0,step_num):  # step_num개 (0 - (step_num)))
-                LidarState = LidarState + [np.cos(30*i*np.pi/180), 0, np.sin(30*i*np.pi/180)]  # Radian으로 해야 함
-            
-                # Map Size 넘어갈만큼 진전시켰으면 Data 수집 멈추기
-                if LidarState[0] >= Map_Size:  # 여기는 step_num이 아니라 Map Size로 해야 함
-                    break
-                if LidarState[2] >= Map_Size:
-                    break
-            
-                if Image[ int(LidarState[0]) ][ int(LidarState[2]) ] == 1:
-                    Diff = LidarState - CurrState
-                    LidarObs_mat[j] = np.linalg.norm(Diff)
-                else:
-                    LidarObs_mat[j] = step_num *  2  # 일단 제일 크게
-        
-            LidarObs[k][i] = min(LidarObs_mat)
-
-        input3_mat = LidarObs
-
-        ## Make Observation Matrix and Execute Onnx Model
-        input_mat = np.concatenate((input1_mat,input2_mat), axis=1)
-        input_mat = np.concatenate((input_mat,input3_mat), axis=1)
-        input_mat = input_mat.astype(np.float32)  # Change array type
-
-        output_mat = ort_session.run(None, {ort_session.get_inputs()[0].name : input_mat})
-
-        ## Make Waypoint Matrix
-        Waypoint_mat = np.zeros((step_num,3))
-        Waypoint_mat[0] = CurrState_mat[0]
-        for i in range(1,step_num):
-            Act_mag = abs(output_mat[2][i-1])  # onnx ouput의 2항이 Action 크기
-            Act_dir_rel = (final-CurrState_mat[i-1])/np.linalg.norm(final-CurrState_mat[i-1])  # 매 순간 Target을 향하는 Unit Vector가 Action 상대 방향
-            if output_mat[2][i-1][0] >= 0:  # 일단 고도 일정한 2차원에서만 적용되도록  # (x, 2, y)  # z쪽으로는 상대 단위벡터 없음  # Action 뭔지 확인하기!!(일단 첫번쨰 값으로)
-                Act_dir = np.array([-Act_dir_rel[2],0,Act_dir_rel[0]])  # 매 순간 상대 방향으로 Action 방향 구하기
-            else:
-                Act_dir = np.array([Act_dir_rel[2],0,-Act_dir_rel[0]])
-            
-            Act_temp = Act_mag*Act_dir
-
-            Waypoint_temp = CurrState_mat[i] + Act_temp  # 해당 Step에서 Act_temp 추가시킴
-            Waypoint_mat[i] = Waypoint_temp
-
-        ScaleFactor = 5000/Map_Size
-
-        path_x = np.array([])
-        path_y = np.array([])
-
-        for i in range(0,step_num):
-            path_x = np.append(path_x, Waypoint_mat[i][0] * ScaleFactor)
-            path_y = np.append(path_y, Waypoint_mat[i][2] * ScaleFactor)
-
+        DistMap = DistanceMap(Image)
+        Traj, numState, Reached = self.Rollout(DistMap, init, final, numRollouts, step_num, Sigma, Seed)
+        self.Success = bool(Reached.any())
+        if not self.Success :
+            print("SAC : no collision-free rollout reached the goal,", numRollouts, "rollouts")
+            return np.array([]), np.array([])
+
+        # 성공한 Rollout 중 최단 경로
+        Length = np.array([np.sum(np.linalg.norm(np.diff(Traj[:numState[r], r], axis=0), axis=1)) if Reached[r] else np.inf for r in range(numRollouts)])
+        best = int(np.argmin(Length))
+        Waypoint_mat = Traj[:numState[best], best]
+        print("SAC : rollouts reached", np.sum(Reached), "/", numRollouts, ", best", best, ", length", Length[best])
+
+        path_x = Waypoint_mat[:, 0] * ScaleFactor
+        path_y = Waypoint_mat[:, 2] * ScaleFactor
 
         return path_x, path_y
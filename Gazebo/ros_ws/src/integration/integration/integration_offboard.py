@@ -55,6 +55,12 @@ from .CollisionAvoidance.ArtificialPotentialField import ArtificialPotentialFiel
 ## Path Planning Module
 #  RRT
 from .PathPlanning.RRT import RRT
+from .PathPlanning.RRT.PathSmoothing import Post_Process, Resample_Path
+from .PathPlanning.RRT.MultiStart import MultiStartPlanner
+from .PathPlanning.RRT.Raycast import Cast_Rays, Beam_Directions
+from .PathPlanning.RRT.OccupancyMap import OccupancyMap
+from .PathPlanning.RRT.MapPyramid import CoarseToFine
+from .PathPlanning.RRT.Replanner import Replanner
 from .PathPlanning.SAC import SACOnnx
 
 ## Path Following Module
@@ -63,6 +69,7 @@ from .PathFollowing.PF import PF
 from .PathFollowing.NDO import NDO
 from .PathFollowing.GPR import GPR
 from .PathFollowing.Guid_MPPI import MPPI
+from .PathFollowing.MPPI_Worker import MPPI_Worker
 from .PathFollowing.PF_Cost import Calc_PF_cost
 
 import time
@@ -75,7 +82,9 @@ class IntegrationNode(Node):
         self.t = TicToc()
         # Init PathPlanning Module
         self.RRT = RRT.RRT()
-        self.SAC = SACOnnx.SACOnnx()
+        # SAC_Warmup : ONNX session built & run once here instead of on the first SAC plan
+        self.SAC_Warmup = False
+        self.SAC = SACOnnx.SACOnnx(IntraOpThreads=1, InterOpThreads=1, OptLevel='all', Warmup=self.SAC_Warmup)
 
         # # Init JBNU CA Module
         # self.JBNU = JBNU_Obs.JBNU_Collision()
@@ -202,6 +211,44 @@ class IntegrationNode(Node):
         self.GoalPoint = np.array([[4999], [4999]])
         
         self.PathPlanningInitialize = False
+        # RRT mode - 'rrt' (first feasible path), 'rrtstar' or 'informed' (cost optimized within the budget), 'connect' (bidirectional)
+        self.RRT_Mode = 'rrt'
+        self.RRT_MaxIter = None
+        self.RRT_TimeBudget = None
+        # path post-processing - shortcut & colinear removal, resampled every RRT_Spacing [m] (None : corners only), spline fit
+        self.RRT_PostProcess = True
+        self.RRT_Spacing = None
+        self.RRT_Spline = False
+        # anytime planning ('rrtstar' / 'informed') - fly the first solution found within RRT_FirstBudget [s],
+        # then refine in RRT_SliceTime [s] slices from a timer, the path swapped whenever it gets shorter
+        self.RRT_Anytime = False
+        self.RRT_FirstBudget = 5.0
+        self.RRT_SliceTime = 0.01
+        self.RRT_RefinePeriod = 0.1
+        self.RRT_Cost = np.inf
+        self.RRT_RefineTimer = None
+        # multi-start planning - RRT_numStarts seeded runs of RRT_Mode in a process pool (<= 1 : single run),
+        # shortest path returned, or the first one found when RRT_TimeBudget is set
+        self.RRT_numStarts = 0
+        self.RRT_MultiStart = MultiStartPlanner()
+        # coarse-to-fine planning - RRT_Mode planned on level RRT_CoarseLevel of the max-pooled map pyramid (0 : off),
+        # then refined at full resolution around the coarse path (pyramid kept until the map version changes)
+        self.RRT_CoarseLevel = 0
+        self.RRT_CoarseToFine = CoarseToFine()
+        # shared occupancy map - model_spawn publishes it, planners get the current version by reference
+        self.OccMap = OccupancyMap()
+        # lidar replanning - beams ending RRT_LidarMargin [m] short of the planned map are new obstacles, added as circles of
+        # RRT_LidarRadius [m] & the search tree repaired (RRT_Replan), at most every RRT_LidarPeriod [s]
+        # only when self.RRT holds the tree of the flown path (anytime, or single 'rrtstar' / 'informed' plan)
+        self.RRT_LidarReplan = False
+        self.RRT_LidarMargin = 1.0
+        self.RRT_LidarRadius = 1.0
+        self.RRT_LidarPeriod = 1.0
+        self.RRT_LidarTime = 0.0
+        self.RRT_TreePlan = False
+        # tree repair & map publish on a worker thread (started with the first replan), result polled by RRT_ReplanTimer
+        self.RRT_Replanner = Replanner(self.RRT, self.OccMap)
+        self.RRT_ReplanTimer = None
 
         self.PlannedX = [0.0] * 5000
         self.PlannedY = [0.0] * 5000
@@ -224,6 +271,7 @@ class IntegrationNode(Node):
         self.Flag_CtrlMode          =   1   # 0, 1     | position control PX4 | attitude control with PF module |
         self.Flag_UseMPPI           =   1   # 0, 1     | baseline guidance law only | guid. law with MPPI algorithm |
         self.Flag_UseGPR            =   1   # 0, 1     | don't use GPR | use GPR with MPPI algorithm |
+        self.Flag_AsyncMPPI         =   1   # 0, 1     | MPPI solved in the timer callback | MPPI solved in a background worker thread |
 
         self.Flag_PrintPFtime       =   0   # 0, 1
         self.Flag_PrintMPPItime     =   0   # 0, 1        
@@ -306,6 +354,9 @@ class IntegrationNode(Node):
         MPPIPeriod          =   self.MPPI.MPPIParams.dt_MPPI
         if self.Flag_UseMPPI == 1:
             self.MPPITimer      =   self.create_timer(MPPIPeriod, self.KAIST_MPPI_CallBack)
+            if self.Flag_AsyncMPPI == 1:
+                self.MPPIWorker     =   MPPI_Worker(self.MPPI)
+                self.MPPIWorker.Start()
 
     #.. Gaussian Process Regression (GPR) Module - Disturbance Estimation for Current or Model Predictive States
         self.GPR    =   GPR()
@@ -315,7 +366,6 @@ class IntegrationNode(Node):
             self.GPRTimer      =   self.create_timer(GPRPeriod, self.KAIST_GPR_Update_CallBack)
 
     #.. KAIST PathFollowing Module - NDO, PF, CMD Update Callback
-        self.MPPI   =   MPPI()
         MPPIPeriod          =   self.MPPI.MPPIParams.dt_MPPI
         if self.Flag_UseMPPI == 1:
             self.PFTimer      =   self.create_timer(MPPIPeriod, self.KAIST_PF_Module_Update)
@@ -422,49 +472,32 @@ class IntegrationNode(Node):
                 Vn          =   np.array([self.vx, self.vy, self.vz])
                 AngEuler    =   np.array([self.roll, self.pitch, self.yaw]) * math.pi /180.
                 # function
-                start = time.time()
-                u1, u1_MPPI, u2_MPPI    =   self.MPPI.Guid_MPPI(self.PF.GCUParams, self.PF.WPs, Pos, Vn, AngEuler)
-                if self.Flag_PrintMPPItime == 1 and self.PFmoduleCount < self.Flag_PrintLimitCount:
-                    print("MPPI call. time :", round(self.CurrTime - self.InitTime, 6), ", calc. time :", round(time.time() - start, 4),", PFmoduleCount :", self.PFmoduleCount)
-            
-                #.. Limit
-                Kmin    =   self.MPPI.MPPIParams.u1_min
-                LADmin  =   self.MPPI.MPPIParams.u2_min
-                u1_MPPI     =   np.where(u1_MPPI < Kmin, Kmin, u1_MPPI)
-                u2_MPPI     =   np.where(u2_MPPI < LADmin, LADmin, u2_MPPI)
-
-                # output
-                tau_u       =   self.MPPI.MPPIParams.tau_LPF
-                N_tau_u     =   self.MPPI.MPPIParams.N_tau_LPF
-                
-                for i_u in range(self.MPPI.MPPIParams.N - 1):
-                    du1     =   1/tau_u * (u1_MPPI[i_u + 1] - u1_MPPI[i_u])
-                    u1_MPPI[i_u + 1] = u1_MPPI[i_u] + du1 * self.MPPI.MPPIParams.dt_MPPI
-                    du2     =   1/tau_u * (u2_MPPI[i_u + 1] - u2_MPPI[i_u])
-                    u2_MPPI[i_u + 1] = u2_MPPI[i_u] + du2 * self.MPPI.MPPIParams.dt_MPPI
-                
-                for i_N in range(N_tau_u):
-                    u1_MPPI[0:self.MPPI.MPPIParams.N - 1] = u1_MPPI[1:self.MPPI.MPPIParams.N]
-                    u1_MPPI[self.MPPI.MPPIParams.N - 1]  = 0.5 * (np.max(u1_MPPI) + np.min(u1_MPPI))
-                    u2_MPPI[0:self.MPPI.MPPIParams.N - 1] = u2_MPPI[1:self.MPPI.MPPIParams.N]
-                    u2_MPPI[self.MPPI.MPPIParams.N - 1]  = 0.5 * (np.max(u2_MPPI) + np.min(u2_MPPI))
-
-                self.MPPI.MPPIParams.u1_MPPI = u1_MPPI
-                self.MPPI.MPPIParams.u2_MPPI = u2_MPPI
-
+                if self.Flag_AsyncMPPI == 1:
+                    self.MPPIWorker.Post_State(self.MPPI.MPPIParams, self.PF.GCUParams, self.PF.WPs, Pos, Vn, AngEuler, self.MPPI.MPPIParams.count, self.PF.PathIdx)
+                else:
+                    start = time.time()
+                    u1, u1_MPPI, u2_MPPI    =   self.MPPI.Guid_MPPI(self.PF.GCUParams, self.PF.WPs, Pos, Vn, AngEuler, Index=self.PF.PathIdx)
+                    if self.Flag_PrintMPPItime == 1 and self.PFmoduleCount < self.Flag_PrintLimitCount:
+                        print("MPPI call. time :", round(self.CurrTime - self.InitTime, 6), ", calc. time :", round(time.time() - start, 4),", PFmoduleCount :", self.PFmoduleCount)
+                    self.MPPI.Warm_Start(u1_MPPI, u2_MPPI)
+
+            #.. latest async result - shifted by the MPPI ticks passed since its state snapshot
+            if self.Flag_AsyncMPPI == 1:
+                res     =   self.MPPIWorker.Get_Result(self.MPPI.MPPIParams.count)
+                # solved on a path that has been replaced since
+                if res is not None and res.Index is not self.PF.PathIdx:
+                    res     =   None
+                if res is not None:
+                    if self.Flag_PrintMPPItime == 1 and self.PFmoduleCount < self.Flag_PrintLimitCount:
+                        print("MPPI call. time :", round(self.CurrTime - self.InitTime, 6), ", calc. time :", round(res.calcTime, 4), \
+                            ", stale count :", self.MPPI.MPPIParams.count - res.count, ", PFmoduleCount :", self.PFmoduleCount)
+                    self.MPPI.Warm_Start(res.u1_MPPI, res.u2_MPPI, self.MPPI.MPPIParams.count - res.count)
+
+            #.. direct - one step per tick, in place on the solver's sequences
+            self.MPPI.Shift_Horizon(1)
             u1_MPPI     =   self.MPPI.MPPIParams.u1_MPPI
             u2_MPPI     =   self.MPPI.MPPIParams.u2_MPPI
 
-            #.. direct
-            u1_MPPI[0:self.MPPI.MPPIParams.N - 1] = u1_MPPI[1:self.MPPI.MPPIParams.N]
-            u1_MPPI[self.MPPI.MPPIParams.N - 1]  = 0.5 * (np.max(u1_MPPI) + np.min(u1_MPPI))
-            u2_MPPI[0:self.MPPI.MPPIParams.N - 1] = u2_MPPI[1:self.MPPI.MPPIParams.N]
-            u2_MPPI[self.MPPI.MPPIParams.N - 1]  = 0.5 * (np.max(u2_MPPI) + np.min(u2_MPPI))
-
-            # update
-            self.MPPI.MPPIParams.u1_MPPI     =   u1_MPPI
-            self.MPPI.MPPIParams.u2_MPPI     =   u2_MPPI
-
             # output
             # self.PF.GCUParams.Kgain_guidPursuit    =   u1[1]
             self.PF.GCUParams.desSpd                =   u1_MPPI[0]
@@ -503,24 +536,137 @@ class IntegrationNode(Node):
     def MakeWorldCallback(self, request, response):
         if request.done == 1:
             print("Requset")
-            RawImage = (cv2.imread("/root/ros_ws/src/integration/integration/PathPlanning/Map/test.png", cv2.IMREAD_GRAYSCALE))
-            Image = np.uint8(np.uint8((255 - RawImage)/ 255))
-            Image = cv2.flip(Image, 0)
-            Image = cv2.rotate(Image, cv2.ROTATE_90_CLOCKWISE)
-            
-            Planned = self.RRT.PathPlanning(Image, self.StartPoint, self.GoalPoint)
+            # current shared occupancy grid (read-only, by reference) published by model_spawn
+            # a running repair finishes on the old tree first, its result & the pending obstacles are dropped
+            self.RRT_Replanner.Clear()
+            Image = self.OccMap.Get()
+            if Image is None :
+                print("Occupancy Map : no map published")
+                response.ack = 0
+                return response
+
+            if self.RRT_Anytime :
+                self.RRT.Start_Plan(Image, self.StartPoint, self.GoalPoint, Mode=self.RRT_Mode, MaxIter=self.RRT_MaxIter)
+                t_plan = time.perf_counter()
+                while self.RRT.Step(self.RRT_SliceTime, StopOnSuccess=True) and not self.RRT.Success :
+                    if time.perf_counter() - t_plan > self.RRT_FirstBudget :
+                        break
+                Planned = self.RRT.Best_Path()
+                self.RRT_Cost = self.RRT.Best_Cost()
+            elif self.RRT_CoarseLevel > 0 :
+                self.RRT_CoarseToFine.Level = self.RRT_CoarseLevel
+                self.RRT_CoarseToFine.Mode = self.RRT_Mode
+                self.RRT_CoarseToFine.MaxIter = self.RRT_MaxIter
+                Planned = self.RRT_CoarseToFine.Plan(Image, self.StartPoint, self.GoalPoint)
+            elif self.RRT_numStarts > 1 :
+                self.RRT_MultiStart.Mode = self.RRT_Mode
+                self.RRT_MultiStart.MaxIter = self.RRT_MaxIter
+                Planned = self.RRT_MultiStart.Plan(Image, self.StartPoint, self.GoalPoint, numStarts=self.RRT_numStarts, Deadline=self.RRT_TimeBudget)
+            else:
+                Planned = self.RRT.PathPlanning(Image, self.StartPoint, self.GoalPoint, Mode=self.RRT_Mode, MaxIter=self.RRT_MaxIter, TimeBudget=self.RRT_TimeBudget)
             #Planned = self.SAC.PathPlanning(Image, self.StartPoint, self.GoalPoint)
-            RawImage = cv2.flip(RawImage, 0)
-            cv2.imwrite('rawimage.png',RawImage)
-            self.PlannedX = Planned[0] / 10
-            self.PlannedY = Planned[1] / 10
-            self.MaxPlannnedIndex = len(self.PlannedX) - 1
-            print(len(self.PlannedX))
+            #Planned = self.RRT_CoarseToFine.Plan(Image, self.StartPoint, self.GoalPoint, Planner=lambda M, S, G : self.SAC.PathPlanning(M, S, G, FullSize=len(M)))
+            flag_c2f = self.RRT_CoarseLevel > 0 and not self.RRT_Anytime
+            flag_multi = self.RRT_numStarts > 1 and not self.RRT_Anytime and not flag_c2f
+            if flag_c2f :
+                if not self.RRT_CoarseToFine.Success :
+                    print("RRT : coarse-to-fine planning failed")
+                    response.ack = 0
+                    return response
+            elif not (self.RRT_MultiStart.Success if flag_multi else self.RRT.Success) :
+                print("RRT : goal not reached" if flag_multi else "RRT : goal not reached after %d iterations" %(self.RRT.N_Iter))
+                if len(Planned[0]) == 0 :
+                    response.ack = 0
+                    return response
+            self.RRT_TreePlan = self.RRT_Anytime or (self.RRT_Mode in ('rrtstar', 'informed') and not (flag_c2f or flag_multi))
+            self.Set_PlannedPath(Planned, DistMap=(self.RRT_MultiStart.DistMap if flag_multi else None), Processed=flag_c2f)
+            if self.RRT_Anytime :
+                if self.RRT_RefineTimer is not None :
+                    self.RRT_RefineTimer.cancel()
+                self.RRT_RefineTimer = self.create_timer(self.RRT_RefinePeriod, self.RRT_RefineCallback)
             response.ack = 1
-            time.sleep(25)
             self.PathPlanningInitialize = True
             return response
 
+    # one refinement slice of the anytime plan, the path swapped in when it got shorter
+    # (slice skipped while the replanner repairs the tree)
+    def RRT_RefineCallback(self):
+        if not self.RRT_Replanner.Lock.acquire(blocking=False) :
+            return
+        try:
+            flag_run = self.RRT.Step(self.RRT_SliceTime)
+            if self.RRT.Best_Cost() < self.RRT_Cost :
+                self.RRT_Cost = self.RRT.Best_Cost()
+                self.Set_PlannedPath(self.RRT.Best_Path(), Reindex=True)
+                print("RRT : path refined, cost", self.RRT_Cost, "after", self.RRT.N_Iter, "iterations")
+        finally:
+            self.RRT_Replanner.Lock.release()
+        if not flag_run :
+            self.RRT_RefineTimer.cancel()
+            self.RRT_RefineTimer = None
+
+    # new obstacles on the planned map (Circles [x, y, r] in map cells) - search tree repaired instead of a cold plan,
+    # on the replanner thread (map publish & search off the executor), the path swapped in by RRT_ReplanCallback
+    def RRT_Replan(self, Circles):
+        self.RRT_Replanner.Start()
+        self.RRT_Replanner.Post(Circles, Budget=self.RRT_FirstBudget, MaxIter=self.RRT_MaxIter)
+        if self.RRT_ReplanTimer is None :
+            self.RRT_ReplanTimer = self.create_timer(self.RRT_RefinePeriod, self.RRT_ReplanCallback)
+
+    # repaired path of the replanner (post-processed on its distance map, so not while a next repair runs)
+    def RRT_ReplanCallback(self):
+        if not self.RRT_Replanner.Lock.acquire(blocking=False) :
+            return
+        try:
+            res = self.RRT_Replanner.Get_Result()
+            if res is None :
+                return
+            if not res.Success :
+                print("RRT : no path after replanning,", res.N_Iter, "iterations")
+                return
+            self.RRT_Cost = res.Cost
+            self.Set_PlannedPath((res.path_x, res.path_y), Reindex=True)
+            print("RRT : path repaired around", res.numCircles, "obstacles in", round(res.calcTime, 3), "s")
+        finally:
+            self.RRT_Replanner.Lock.release()
+        if self.RRT_Anytime and self.RRT_RefineTimer is None :
+            self.RRT_RefineTimer = self.create_timer(self.RRT_RefinePeriod, self.RRT_RefineCallback)
+
+    # post-process a planned path (map cells) & hand it to PF / MPPI as waypoints [m]
+    # Reindex : continue from the waypoint after the one closest to the vehicle instead of the start
+    # DistMap : distance map of the planned map (None : the one of the single planner)
+    # Processed : path already shortcut by its planner (coarse-to-fine, no full resolution distance map), only resampled
+    def Set_PlannedPath(self, Planned, Reindex=False, DistMap=None, Processed=False):
+        if self.RRT_PostProcess and Processed :
+            if self.RRT_Spacing is not None :
+                path = Resample_Path(np.stack([Planned[0], Planned[1]], axis=1), self.RRT_Spacing * 10)
+                Planned = (path[:, 0], path[:, 1])
+        elif self.RRT_PostProcess :
+            Spacing = None if self.RRT_Spacing is None else self.RRT_Spacing * 10
+            DistMap = self.RRT.DistMap if DistMap is None else DistMap
+            Planned = Post_Process(Planned[0], Planned[1], DistMap, Spacing=Spacing, Spline=self.RRT_Spline)
+        self.PlannedX = Planned[0] / 10
+        self.PlannedY = Planned[1] / 10
+        self.MaxPlannnedIndex = len(self.PlannedX) - 1
+        if Reindex :
+            idx = int(np.argmin((self.PlannedX - self.x)**2 + (self.PlannedY - self.y)**2))
+            self.PlannnedIndex = min(idx + 1, self.MaxPlannnedIndex)
+        else:
+            self.PlannnedIndex = 0
+        print(len(self.PlannedX))
+        # compact waypoints for PF / MPPI - NED [north, east, down], north = PlannedX (compared with self.x, as the init)
+        WPs         =   -5. * np.ones((len(self.PlannedX), 3))
+        WPs[:,0]    =   self.PlannedX
+        WPs[:,1]    =   self.PlannedY
+        self.PF.Set_WPs(WPs)
+        # current segment on the new path (as PF_main sets it from PlannnedIndex) - the old index may be past its end
+        self.PF.GCUParams.prevWPidx =   max(self.PlannnedIndex - 1, 0)
+        # the PF waypoint nearest to the vehicle has to be the one PlannnedIndex was set from
+        if Reindex :
+            idx_pf = int(np.argmin(np.sum((self.PF.WPs[:, 0:2] - np.array([self.x, self.y]))**2, axis=1)))
+            if idx_pf != idx :
+                print("Set_PlannedPath : PF nearest waypoint", idx_pf, "is not the planned one", idx)
+
     ## KAIST Module Update Functions
     def KAIST_PF_Module_Update(self):
         
@@ -763,16 +909,57 @@ class IntegrationNode(Node):
 
     # Lidar
     def LidarCallback(self, msg):
+        self.LidarAvoidance(msg.ranges)
+        if self.RRT_LidarReplan :
+            self.LidarReplan(msg.ranges)
+
+    # APF avoidance on a 360 beam scan [m] (1 deg per beam) - from the lidar, or cast on the planned map by MapLidarScan
+    def LidarAvoidance(self, Ranges):
         ObsPos = [0.0] * 2
-        ObsDist = min(msg.ranges)
+        ObsDist = min(Ranges)
         self.CollisionAvoidanceFlag = False
         if ObsDist < 10.0:
-            ObsAngle = np.argmin(msg.ranges)
+            ObsAngle = np.argmin(Ranges)
             ObsPos = [ObsDist * math.sin(ObsAngle * math.pi / 180), ObsDist * math.cos(ObsAngle * math.pi / 180)]
             self.CA = self.APF.CalTotalForce([self.Target[0], self.Target[1]], self.AvoidancePos, ObsPos)
             print(ObsAngle)
             self.CollisionAvoidanceFlag = True
 
+    # synthetic 360 beam scan [m] at the vehicle position on a distance map of the planned map (0.1 m cells),
+    # beams laid out as the lidar (ObsPos = [d sin, d cos]) - None before a map was planned on
+    def MapLidarScan(self, DistMap=None, MaxRange=30.0, numBeams=360):
+        DistMap = self.RRT.DistMap if DistMap is None else DistMap
+        if DistMap is None :
+            return None
+        Ranges = Cast_Rays(DistMap, [[self.x * 10, self.y * 10]], Beam_Directions(numBeams)[:, ::-1], MaxRange=MaxRange * 10)
+        return Ranges[0] / 10
+
+    # lidar hits not on the planned map (range shorter than the synthetic scan by RRT_LidarMargin) handed to RRT_Replan
+    # as circles [x, y, r] in map cells - the repaired distance map has them, so the next scans match it again
+    # (scan skipped while a repair runs, its distance map is being updated)
+    def LidarReplan(self, Ranges, MaxRange=30.0):
+        if not (self.PathPlanningInitialize and self.RRT_TreePlan) :
+            return
+        if time.perf_counter() - self.RRT_LidarTime < self.RRT_LidarPeriod :
+            return
+        if not self.RRT_Replanner.Lock.acquire(blocking=False) :
+            return
+        try:
+            Ranges = np.asarray(Ranges, dtype=np.float64)
+            MapRanges = self.MapLidarScan(MaxRange=MaxRange, numBeams=len(Ranges))
+        finally:
+            self.RRT_Replanner.Lock.release()
+        if MapRanges is None :
+            return
+        flag_new = np.isfinite(Ranges) & (Ranges > self.RRT_LidarRadius) & (Ranges < MaxRange) & (Ranges < MapRanges - self.RRT_LidarMargin)
+        if not flag_new.any() :
+            return
+        self.RRT_LidarTime = time.perf_counter()
+        Hits = np.array([self.x, self.y]) + Ranges[flag_new, None] * Beam_Directions(len(Ranges))[flag_new][:, ::-1]
+        Circles = np.concatenate([Hits * 10, np.full((len(Hits), 1), self.RRT_LidarRadius * 10)], axis=1)
+        print("RRT : lidar found", len(Hits), "new obstacle beams, replanning")
+        self.RRT_Replan(Circles)
+
     ## Mathmatics Function
     # Quaternion to Euler
     def Quaternion2Euler(self, w, x, y, z):
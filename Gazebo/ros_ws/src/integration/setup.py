@@ -26,7 +26,10 @@ setup(
     tests_require=['pytest'],
     entry_points={
         'console_scripts': [
-            'IntegrationTest = integration.integration_offboard:main'
+            'IntegrationTest = integration.integration_offboard:main',
+            'MPPIBenchmark = integration.PathFollowing.MPPI_Benchmark:main',
+            'MPPIAccuracy = integration.PathFollowing.MPPI_Accuracy:main',
+            'RRTBenchmark = integration.PathPlanning.RRT.RRT_Benchmark:main'
         ],
     },
 )
@@ -0,0 +1,85 @@
+import numpy as np
+
+from integration.PathPlanning.RRT.DistanceMap import DistanceMap
+
+
+def random_map(rng, shape=(80, 100), density=0.03):
+    return (rng.random(shape) < density).astype(np.uint8)
+
+
+def brute_clearance(Map):
+    obs = np.argwhere(Map > 0)
+    yy, xx = np.mgrid[:Map.shape[0], :Map.shape[1]]
+    cells = np.stack([yy.ravel(), xx.ravel()], axis=1)
+    dist = np.min(np.sqrt(np.sum((cells[:, None, :] - obs[None, :, :]) ** 2, axis=2)), axis=1)
+    return dist.reshape(Map.shape)
+
+
+# reference : dense samples rounded to their cells, True if any of them is an obstacle cell or outside the map
+def dense_collision(Map, A, B, Step=1e-3):
+    flag = np.zeros(len(A), dtype=bool)
+    for i in range(len(A)):
+        n = int(np.ceil(np.linalg.norm(B[i] - A[i]) / Step)) + 1
+        pts = A[i] + (B[i] - A[i]) * np.linspace(0, 1, n)[:, None]
+        ix, iy = np.round(pts[:, 0]).astype(np.int64), np.round(pts[:, 1]).astype(np.int64)
+        inside = (ix >= 0) & (ix < Map.shape[1]) & (iy >= 0) & (iy < Map.shape[0])
+        flag[i] = not inside.all() or Map[iy, ix].any()
+    return flag
+
+
+def test_clearance_matches_brute_force():
+    rng = np.random.default_rng(0)
+    Map = random_map(rng, (40, 60))
+    DistMap = DistanceMap(Map)
+    np.testing.assert_allclose(DistMap.Dist, brute_clearance(Map), atol=1e-5)
+    pts = rng.uniform(-2, 62, (500, 2))
+    ix, iy = np.round(pts[:, 0]).astype(np.int64), np.round(pts[:, 1]).astype(np.int64)
+    inside = (ix >= 0) & (ix < 60) & (iy >= 0) & (iy < 40)
+    clear = DistMap.Clearance(pts)
+    np.testing.assert_array_equal(clear[~inside], -1.)
+    np.testing.assert_array_equal(clear[inside], DistMap.Dist[iy[inside], ix[inside]])
+    np.testing.assert_array_equal(DistMap.Check_Point(pts), clear <= 0.)
+
+
+def test_check_segments_matches_dense_sampling():
+    rng = np.random.default_rng(1)
+    Map = random_map(rng)
+    DistMap = DistanceMap(Map)
+    A = rng.uniform(0, 99, (1500, 2)) * [0.79, 1.]
+    B = np.clip(A + rng.normal(0, 6., A.shape), 0, [99, 79])
+    flag = DistMap.Check_Segments(A, B)
+    ref = dense_collision(Map, A, B)
+    # no collision missed, extra hits only for grazes finer than the reference sampling
+    assert not np.any(ref & ~flag)
+    assert np.sum(flag & ~ref) <= 2
+    assert DistMap.Check_Segment(A[0], B[0]) == flag[0]
+
+
+def test_check_segments_margin():
+    Map = np.zeros((50, 50), dtype=np.uint8)
+    Map[25, 25] = 1
+    DistMap = DistanceMap(Map)
+    # horizontal segments passing 2, 3 & 4 cells from the obstacle
+    A = np.array([[5., 23.], [5., 22.], [5., 21.]])
+    B = np.array([[45., 23.], [45., 22.], [45., 21.]])
+    np.testing.assert_array_equal(DistMap.Check_Segments(A, B), [False, False, False])
+    np.testing.assert_array_equal(DistMap.Check_Segments(A, B, Margin=2.5), [True, False, False])
+    np.testing.assert_array_equal(DistMap.Check_Segments(A, B, Margin=3.), [True, True, False])
+
+
+def test_update_matches_rebuilt_map():
+    rng = np.random.default_rng(2)
+    Map = random_map(rng, (120, 120), 0.005)
+    DistMap = DistanceMap(Map)
+    Cells = np.array([[10, 10], [100, 30]])
+    Circles = np.array([[60., 60., 6.5]])
+    box = DistMap.Update(Cells=Cells, Circles=Circles, Pad=30)
+    assert box == (10, 10, 100, 66)
+
+    Map[Cells[:, 1], Cells[:, 0]] = 1
+    yy, xx = np.mgrid[:120, :120]
+    Map[(xx - 60.) ** 2 + (yy - 60.) ** 2 <= 6.5 ** 2] = 1
+    Dist = DistanceMap(Map).Dist
+    # exact below the pad, never above the rebuilt distance
+    assert np.all(DistMap.Dist <= Dist + 1e-5)
+    np.testing.assert_allclose(DistMap.Dist[Dist < 30], Dist[Dist < 30], atol=1e-5)
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+
+from integration.PathPlanning.RRT.GridIndex import GridIndex
+
+
+def build_index(Coord, CellSize):
+    index = GridIndex(CellSize)
+    for i, q in enumerate(Coord):
+        index.Insert(i, q)
+    return index
+
+
+def test_empty_index():
+    index = GridIndex(1.)
+    assert index.Nearest(np.zeros(2), np.empty((0, 2)), 0) == (-1, math.inf)
+    assert len(index.Near(np.zeros(2), 5., np.empty((0, 2)))) == 0
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(0)
+    # clustered nodes, queries inside, between & far outside the clusters
+    Coord = np.concatenate([rng.normal(c, 4., (300, 2)) for c in [(10., 10.), (80., 30.), (40., 90.)]])
+    index = build_index(Coord, 2.5)
+    for q in np.concatenate([rng.uniform(-20, 120, (300, 2)), rng.uniform(-1000, 1000, (20, 2))]):
+        dist = np.sqrt(np.sum((Coord - q) ** 2, axis=1))
+        idx, val = index.Nearest(q, Coord, len(Coord))
+        assert idx == int(np.argmin(dist))
+        assert val == dist[idx]
+
+
+def test_nearest_ties_lowest_index():
+    # nodes on integer points, duplicates included - the lowest index wins as with a full argmin
+    Coord = np.array([[3., 3.], [1., 1.], [3., 3.], [1., 3.], [3., 1.]])
+    index = build_index(Coord, 1.)
+    assert index.Nearest(np.array([2., 2.]), Coord, len(Coord))[0] == 0
+    assert index.Nearest(np.array([3., 3.]), Coord, len(Coord))[0] == 0
+
+
+def test_near_matches_brute_force():
+    rng = np.random.default_rng(1)
+    Coord = rng.uniform(0, 100, (1000, 2))
+    index = build_index(Coord, 3.)
+    for q, radius in zip(rng.uniform(-10, 110, (200, 2)), rng.uniform(0.5, 20., 200)):
+        dist2 = np.sum((Coord - q) ** 2, axis=1)
+        np.testing.assert_array_equal(index.Near(q, radius, Coord), np.nonzero(dist2 <= radius * radius)[0])
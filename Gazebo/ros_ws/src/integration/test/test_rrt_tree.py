@@ -0,0 +1,77 @@
+import numpy as np
+
+from integration.PathPlanning.RRT.Tree import Tree
+
+
+def random_tree(rng, numNodes, CellSize=None):
+    nodes = Tree(Dim=2, Capacity=4, CellSize=CellSize)
+    nodes.Add_Node(rng.uniform(0, 100, 2), 0., -1)
+    for _ in range(numNodes - 1):
+        parent = int(rng.integers(len(nodes)))
+        coord = rng.uniform(0, 100, 2)
+        nodes.Add_Node(coord, nodes.Cost[parent] + np.linalg.norm(coord - nodes.Coord[parent]), parent)
+    return nodes
+
+
+def path_costs(nodes):
+    n = len(nodes)
+    cost = np.zeros(n)
+    for i in range(n):
+        for a, b in zip(nodes.Get_Branch(i)[:-1], nodes.Get_Branch(i)[1:]):
+            cost[i] = cost[i] + np.linalg.norm(nodes.Coord[a] - nodes.Coord[b])
+    return cost
+
+
+def test_grow_keeps_nodes():
+    rng = np.random.default_rng(0)
+    nodes = random_tree(rng, 100)
+    assert len(nodes) == 100
+    assert len(nodes.Cost) >= 100
+    np.testing.assert_allclose(nodes.Cost[:100], path_costs(nodes))
+
+
+def test_nearest_near_match_brute_force():
+    rng = np.random.default_rng(1)
+    nodes = random_tree(rng, 500, CellSize=3.)
+    for q in rng.uniform(-50, 150, (200, 2)):
+        dist = np.linalg.norm(nodes.Coord[:len(nodes)] - q, axis=1)
+        idx, val = nodes.Nearest(q)
+        assert idx == int(np.argmin(dist))
+        assert val == dist[idx]
+        np.testing.assert_array_equal(nodes.Near(q, 7.5), np.nonzero(dist <= 7.5)[0])
+
+
+def test_rewire_updates_subtree_costs():
+    rng = np.random.default_rng(2)
+    nodes = random_tree(rng, 300)
+    for _ in range(50):
+        idx = int(rng.integers(1, len(nodes)))
+        # new parent outside the subtree of idx
+        subtree = [i for i in range(len(nodes)) if idx in nodes.Get_Branch(i)]
+        parent = int(rng.choice(np.setdiff1d(np.arange(len(nodes)), subtree)))
+        nodes.Rewire(idx, parent, nodes.Cost[parent] + np.linalg.norm(nodes.Coord[idx] - nodes.Coord[parent]))
+        np.testing.assert_allclose(nodes.Cost[:len(nodes)], path_costs(nodes))
+
+
+def test_prune_removes_subtrees_and_keeps_costs():
+    rng = np.random.default_rng(3)
+    nodes = random_tree(rng, 400, CellSize=5.)
+    n = len(nodes)
+    flag = np.zeros(n, dtype=bool)
+    flag[rng.choice(np.arange(1, n), 10, replace=False)] = True
+    removed = np.array([any(flag[j] for j in nodes.Get_Branch(i)) for i in range(n)])
+    Coord, Cost, Parent = nodes.Coord[:n].copy(), nodes.Cost[:n].copy(), nodes.Parent[:n].copy()
+
+    remap = nodes.Prune(flag)
+    keep = np.nonzero(~removed)[0]
+    np.testing.assert_array_equal(remap[removed], -1)
+    np.testing.assert_array_equal(remap[keep], np.arange(len(keep)))
+    assert len(nodes) == len(keep)
+    np.testing.assert_array_equal(nodes.Coord[:len(nodes)], Coord[keep])
+    np.testing.assert_array_equal(nodes.Cost[:len(nodes)], Cost[keep])
+    np.testing.assert_array_equal(nodes.Parent[:len(nodes)], np.where(Parent[keep] >= 0, remap[np.maximum(Parent[keep], 0)], -1))
+    np.testing.assert_allclose(nodes.Cost[:len(nodes)], path_costs(nodes))
+    # grid index rebuilt on the new numbering
+    for q in rng.uniform(0, 100, (50, 2)):
+        dist = np.linalg.norm(nodes.Coord[:len(nodes)] - q, axis=1)
+        assert nodes.Nearest(q)[0] == int(np.argmin(dist))